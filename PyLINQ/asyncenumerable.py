@@ -0,0 +1,170 @@
+import asyncio
+from collections import deque
+from inspect import isawaitable
+from typing import (TYPE_CHECKING, Any, AsyncIterable, AsyncIterator,
+                    Awaitable, Callable, Deque, Generic, Iterable, Optional,
+                    Set, TypeVar, Union)
+
+if TYPE_CHECKING:
+    from PyLINQ.generics import TypedList
+
+T1 = TypeVar("T1")
+TResult = TypeVar("TResult")
+
+
+async def _FromIterable(source: Iterable[Any]) -> AsyncIterator[Any]:
+    for value in source:
+        yield value
+
+
+async def _Where(source: AsyncIterable[Any], fn: Callable[[Any], Any]) -> AsyncIterator[Any]:
+    async for value in source:
+        predicate = fn(value)
+        if isawaitable(predicate):
+            predicate = await predicate
+        if predicate:
+            yield value
+
+
+async def _Select(source: AsyncIterable[Any], fn: Callable[[Any], Any]) -> AsyncIterator[Any]:
+    async for value in source:
+        yield fn(value)
+
+
+async def _Take(source: AsyncIterable[Any], count: int) -> AsyncIterator[Any]:
+    if count <= 0:
+        return
+    taken = 0
+    async for value in source:
+        yield value
+        taken += 1
+        if taken >= count:
+            return
+
+
+async def _SelectAwait(
+    source: AsyncIterable[Any],
+    fn: Callable[[Any], Awaitable[Any]],
+    max_concurrency: int,
+    ordered: bool,
+) -> AsyncIterator[Any]:
+    it = source.__aiter__()
+    exhausted = False
+    # 実行中のタスクは最大 max_concurrency 個
+    pending: Deque["asyncio.Task[Any]"] = deque()
+    running: Set["asyncio.Task[Any]"] = set()
+
+    async def fill(tasks: Union[Deque[Any], Set[Any]]) -> None:
+        nonlocal exhausted
+        while not exhausted and len(tasks) < max_concurrency:
+            try:
+                value = await it.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                return
+            task = asyncio.ensure_future(fn(value))
+            if isinstance(tasks, deque):
+                tasks.append(task)
+            else:
+                tasks.add(task)
+
+    try:
+        if ordered:
+            await fill(pending)
+            while pending:
+                # 先頭が終われば後続を待たずに返す
+                result = await pending.popleft()
+                await fill(pending)
+                yield result
+        else:
+            await fill(running)
+            while running:
+                done, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED)
+                await fill(running)
+                for task in done:
+                    yield task.result()
+    finally:
+        for task in list(pending) + list(running):
+            task.cancel()
+
+
+class AsyncEnumerable(Generic[T1]):
+    """## Lazy query over an asyncio data source like C# IAsyncEnumerable
+    Elements are processed as they arrive.\n
+    Usage:
+    `query = AsyncEnumerable(accessions).SelectAwait(fetch, max_concurrency=8)` \n
+    `async for meta in query.Where(lambda m: m is not None): ...` \n
+    `runs = await query.Take(100).ToListAsync()` \n
+    """
+
+    def __init__(self, source: Union[AsyncIterable[T1], Iterable[T1]] = ()) -> None:
+        """Create a query over `source`.
+        @source: Async iterable or (sync) iterable
+        """
+        if isinstance(source, AsyncIterable):
+            async_source = source
+            self.__factory: Callable[[], AsyncIterable[Any]] = lambda: async_source
+        else:
+            self.__factory = lambda: _FromIterable(source)
+
+    def __Chain(self, factory: Callable[[], AsyncIterable[Any]]) -> "AsyncEnumerable[Any]":
+        query: AsyncEnumerable[Any] = AsyncEnumerable()
+        query.__factory = factory
+        return query
+
+    def __aiter__(self) -> AsyncIterator[T1]:
+        return self.__factory().__aiter__()
+
+    # Deferred operators
+    def Where(self, fn: Callable[[T1], Union[bool, Awaitable[bool]]]) -> "AsyncEnumerable[T1]":
+        """Only the elements whose `fn` condition returns True are extracted.
+        @fn: Predicate (may be a coroutine function)
+        """
+        return self.__Chain(lambda: _Where(self, fn))
+
+    def Select(self, selector: Callable[[T1], TResult]) -> "AsyncEnumerable[TResult]":
+        """Project each element with `selector`."""
+        return self.__Chain(lambda: _Select(self, selector))
+
+    def SelectAwait(
+        self,
+        fn: Callable[[T1], Awaitable[TResult]],
+        max_concurrency: int = 1,
+        ordered: bool = True,
+    ) -> "AsyncEnumerable[TResult]":
+        """Project each element with the coroutine function `fn`.\n
+        Up to `max_concurrency` calls run concurrently to overlap I/O.
+        @fn: Coroutine function
+        @[optional] max_concurrency: Number of calls in flight
+        @[optional] ordered: Keep source order (False yields in completion order)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be 1 or more")
+        return self.__Chain(lambda: _SelectAwait(self, fn, max_concurrency, ordered))
+
+    def Take(self, count: int) -> "AsyncEnumerable[T1]":
+        """Returns the first `count` elements and stops pulling from upstream."""
+        return self.__Chain(lambda: _Take(self, count))
+
+    # Terminal operators
+    async def ToListAsync(self) -> "TypedList[T1]":
+        """Execute the query and collect the result into a new TypedList."""
+        from PyLINQ.generics import TypedList
+        return TypedList([value async for value in self])
+
+    async def FirstAsync(self, fn: Optional[Callable[[T1], bool]] = None) -> T1:
+        """Returns the first element (of which the return value of fn is True).
+        @exception: If there is no such element, IndexError will be raised.
+        """
+        async for value in self:
+            if fn is None or fn(value):
+                return value
+        raise IndexError("Index out of range")
+
+    async def ForEachAsync(self, fn: Callable[[T1], Any]) -> None:
+        """Execute the query and pass each element to `fn` (may be a coroutine function)."""
+        async for value in self:
+            result = fn(value)
+            if isawaitable(result):
+                await result
@@ -1,45 +1,1272 @@
-from typing import Any, Callable, Generic, List, TypeVar, Union
+from __future__ import annotations
+
+import csv
+import json
+import pickle
+import tempfile
+import typing
+from heapq import merge, nlargest, nsmallest
+from itertools import chain, count, dropwhile, islice, takewhile
+from operator import itemgetter, le
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Generic, Iterable,
+                    Iterator, List, Optional, Tuple, TypeVar, Union)
+
+if TYPE_CHECKING:
+    from PyLINQ.generics import DictionaryC, Lookup, TypedList
 
 T1 = TypeVar('T1')
+TKey = TypeVar('TKey')
+TElement = TypeVar('TElement')
+TResult = TypeVar('TResult')
+
+
+class SortStatistics:
+    """Counters reported by `Enumrable.OrderBy`.\n
+    `Elements`: number of sorted elements\n
+    `KeySelectorCalls`: number of times the key selector was invoked
+    """
+
+    def __init__(self) -> None:
+        self.Elements = 0
+        self.KeySelectorCalls = 0
+
+
+def _Counted(selector: Callable[[Any], Any], statistics: SortStatistics) -> Callable[[Any], Any]:
+    # 実際にキーセレクタが呼ばれた回数を数える
+    def counted(value: Any) -> Any:
+        statistics.KeySelectorCalls += 1
+        return selector(value)
+    return counted
+
+
+class EqualityComparer(Generic[T1]):
+    """## Custom equality for set operators like C# IEqualityComparer
+    Lets `Distinct`, `Union`, `Intersect` and `Except` work on unhashable elements.\n
+    Usage:
+    `EqualityComparer(lambda a, b: a["id"] == b["id"], lambda a: hash(a["id"]))` \n
+    """
+
+    def __init__(
+        self,
+        equals: Callable[[T1, T1], bool],
+        hashcode: Callable[[T1], int] = lambda _: 0,
+    ) -> None:
+        """Create a comparer.
+        @equals: Returns whether two elements are equal
+        @[optional] hashcode: Returns a hash that is equal for equal elements.
+        The default puts every element in one bucket (quadratic; give a hash if you can).
+        """
+        self.__equals = equals
+        self.__hashcode = hashcode
+
+    def Equals(self, a: T1, b: T1) -> bool:
+        return self.__equals(a, b)
+
+    def GetHashCode(self, value: T1) -> int:
+        return self.__hashcode(value)
+
+
+class _HashSet:
+    """Set that uses `EqualityComparer` when given, else the built-in hash."""
+
+    def __init__(self, comparer: Optional[EqualityComparer] = None, values: Iterable[Any] = ()) -> None:
+        self.__comparer = comparer
+        self.__set: set = set()
+        self.__buckets: Dict[int, List[Any]] = {}
+        for value in values:
+            self.Add(value)
+
+    def Add(self, value: Any) -> bool:
+        """Add `value` and return True if it was not contained yet."""
+        comparer = self.__comparer
+        if comparer is None:
+            if value in self.__set:
+                return False
+            self.__set.add(value)
+            return True
+        bucket = self.__buckets.setdefault(comparer.GetHashCode(value), [])
+        for other in bucket:
+            if comparer.Equals(other, value):
+                return False
+        bucket.append(value)
+        return True
+
+    def Remove(self, value: Any) -> bool:
+        """Remove `value` and return True if it was contained."""
+        comparer = self.__comparer
+        if comparer is None:
+            if value in self.__set:
+                self.__set.remove(value)
+                return True
+            return False
+        bucket = self.__buckets.get(comparer.GetHashCode(value), [])
+        for i, other in enumerate(bucket):
+            if comparer.Equals(other, value):
+                del bucket[i]
+                return True
+        return False
+
+    def Contains(self, value: Any) -> bool:
+        comparer = self.__comparer
+        if comparer is None:
+            return value in self.__set
+        for other in self.__buckets.get(comparer.GetHashCode(value), ()):
+            if comparer.Equals(other, value):
+                return True
+        return False
+
+
+class _Reverse:
+    """Key wrapper that compares in reverse (descending keys that cannot be negated)."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: "_Reverse") -> bool:
+        return bool(other.value < self.value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reverse) and self.value == other.value
+
+
+# (キーセレクタ, 降順か) の並び。先頭が第 1 キー
+_SortKeys = Tuple[Tuple[Callable[[Any], Any], bool], ...]
+
+
+def _IsNumber(value: Any) -> bool:
+    return isinstance(value, (int, float))
 
 
 class Enumrable(Generic[T1]):
 
     @staticmethod
-    def OrderBy(arr: list, keyselector: Callable[[T1], Union[int, str]]) -> List[Any]:
-        if len(arr) <= 1:
-            return arr
+    def OrderBy(
+        arr: list,
+        keyselector: Callable[[T1], Union[int, str]],
+        statistics: Optional[SortStatistics] = None,
+    ) -> List[Any]:
+        """Returns a new list stably sorted by the key returned by `keyselector`.\n
+        @arr: source list
+        @keyselector: Selector to order
+        @[optional] statistics: Receives the number of key selector calls
+        """
+        return Enumrable.OrderByKeys(arr, ((keyselector, False),), statistics)
+
+    @staticmethod
+    def OrderByKeys(
+        arr: Iterable[Any],
+        keys: _SortKeys,
+        statistics: Optional[SortStatistics] = None,
+    ) -> List[Any]:
+        """Returns a new list stably sorted by several keys in one sort pass.\n
+        Keys of the same direction form a tuple key. With mixed directions,
+        descending numeric keys are negated and other descending keys are
+        wrapped so that they compare in reverse.
+        @arr: source
+        @keys: (key selector, descending) pairs, the first one is the primary key
+        @[optional] statistics: Receives the number of key selector calls
+        """
+        values = arr if isinstance(arr, list) else list(arr)
+        if statistics is not None:
+            keys = tuple((_Counted(selector, statistics), descending)
+                         for selector, descending in keys)
+        # キーは要素ごとに一度だけ計算し (decorate-sort-undecorate)、
+        # C 実装の安定ソートに任せる
+        if len(keys) == 1:
+            selector, descending = keys[0]
+            ordered = sorted(values, key=selector, reverse=descending)
+        elif all(descending == keys[0][1] for _, descending in keys):
+            selectors = tuple(selector for selector, _ in keys)
+            ordered = sorted(values, key=lambda val: tuple(f(val) for f in selectors),
+                             reverse=keys[0][1])
+        else:
+            columns: List[Iterable[Any]] = []
+            for selector, descending in keys:
+                column = list(map(selector, values))
+                if descending:
+                    if all(map(_IsNumber, column)):
+                        column = [-key for key in column]
+                    else:
+                        column = list(map(_Reverse, column))
+                columns.append(column)
+            composite = list(zip(*columns))
+            ordered = [values[i] for i in sorted(range(len(values)), key=composite.__getitem__)]
+        if statistics is not None:
+            statistics.Elements += len(ordered)
+        return ordered
+
+    @staticmethod
+    def OrderByExternal(
+        source: Iterable[Any],
+        keyselector: Callable[[Any], Any],
+        run_size: int = 1 << 20,
+        temp_dir: Optional[str] = None,
+        descending: bool = False,
+    ) -> Iterator[Any]:
+        """Lazily yields `source` stably sorted, keeping at most `run_size` elements in memory.\n
+        Runs of `run_size` elements are sorted in memory, pickled to temporary
+        files and merged with a k-way heap merge while iterating.
+        Input that fits in one run is sorted in memory without temporary files.
+        Keys and elements must be picklable.
+        @source: Any iterable
+        @keyselector: Selector to order
+        @[optional] run_size: Elements per in-memory run (the memory budget)
+        @[optional] temp_dir: Directory of the temporary files (default: system temp dir)
+        @[optional] descending: Sort descending (equal keys keep their source order)
+        """
+        if run_size < 1:
+            raise ValueError("run_size should be 1 or more")
+        return _OrderByExternal(source, keyselector, run_size, temp_dir, descending)
+
+    @staticmethod
+    def TopBy(
+        source: Iterable[Any],
+        count: int,
+        keyselector: Callable[[Any], Any],
+        descending: bool = True,
+    ) -> List[Any]:
+        """Returns the `count` elements with the largest (or smallest) keys, in order.\n
+        Uses a bounded heap: O(n log k) time and O(k) memory. Equal keys keep
+        their source order, the same as a stable sort followed by a slice.
+        @source: Any iterable
+        @count: Number of elements
+        @keyselector: Selector to order
+        @[optional] descending: Largest keys first (False: smallest keys first)
+        """
+        return _TopByKeys(source, count, ((keyselector, descending),))
+
+    @staticmethod
+    def Join(
+        outer: Iterable[Any],
+        inner: Iterable[Any],
+        outerKey: Callable[[Any], Any],
+        innerKey: Callable[[Any], Any],
+        result: Callable[[Any, Any], Any],
+    ) -> Iterator[Any]:
+        """Inner equi-join in outer order, then inner order. `None` keys never match.\n
+        Sized outer (e.g. list): sort-merge join when both key sequences are
+        already sorted and share one key type, otherwise a hash join built on
+        the smaller side.
+        Unsized outer: streamed against a hash table of the inner side.
+        """
+        return _Join(outer, inner, outerKey, innerKey, result)
+
+    @staticmethod
+    def GroupJoin(
+        outer: Iterable[Any],
+        inner: Iterable[Any],
+        outerKey: Callable[[Any], Any],
+        innerKey: Callable[[Any], Any],
+        result: Callable[[Any, Any], Any],
+    ) -> Iterator[Any]:
+        """Pairs each outer element with the TypedList of its inner matches."""
+        return _GroupJoin(outer, inner, outerKey, innerKey, result)
+
+    @staticmethod
+    def Chunk(source: Iterable[Any], size: int) -> Iterator[List[Any]]:
+        """Split `source` into lists of `size` elements (the last one may be shorter)."""
+        if size < 1:
+            raise ValueError("size should be 1 or more")
+        if isinstance(source, list):
+            return (source[i:i + size] for i in range(0, len(source), size))
+        it = iter(source)
+        return iter(lambda: list(islice(it, size)), [])
+
+
+def _NotNone(it: Iterator[Any]) -> Iterator[Any]:
+    for value in it:
+        if value is not None:
+            yield value
+
+
+def _OrderBy(it: Iterator[Any], keys: _SortKeys) -> Iterator[Any]:
+    yield from Enumrable.OrderByKeys(list(it), keys)
+
+
+# 一時ファイルへ 1 回の pickle で書き出すペア数
+_SPILL_BLOCK = 4096
+# 一度にマージする一時ファイルの最大数 (超えたら多段マージ)
+_MERGE_FANIN = 128
+
+
+def _Spill(pairs: Iterable[Tuple[Any, Any]], temp_dir: Optional[str]) -> Any:
+    f = tempfile.TemporaryFile(dir=temp_dir)
+    for block in Enumrable.Chunk(pairs, _SPILL_BLOCK):
+        pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _ReadRun(f: Any) -> Iterator[Tuple[Any, Any]]:
+    while True:
+        try:
+            block = pickle.load(f)
+        except EOFError:
+            return
+        yield from block
+
+
+def _OrderByExternal(
+    source: Iterable[Any],
+    selector: Callable[[Any], Any],
+    run_size: int,
+    temp_dir: Optional[str],
+    descending: bool,
+) -> Iterator[Any]:
+    key = itemgetter(0)
+    runs: List[Any] = []
+    try:
+        for chunk in Enumrable.Chunk(source, run_size):
+            # キーは要素ごとに一度だけ計算し、ペアのまま書き出す
+            pairs = sorted(zip(map(selector, chunk), chunk), key=key, reverse=descending)
+            if not runs and len(chunk) < run_size:
+                # 1 ラン分に収まる入力は一時ファイルを使わない
+                yield from map(itemgetter(1), pairs)
+                return
+            runs.append(_Spill(pairs, temp_dir))
+        while len(runs) > _MERGE_FANIN:
+            # 同時に開くファイル数を抑えるため、隣り合うランをまとめる (並びを保つので安定)
+            merged: List[Any] = []
+            for i in range(0, len(runs), _MERGE_FANIN):
+                group = runs[i:i + _MERGE_FANIN]
+                merged.append(
+                    _Spill(merge(*map(_ReadRun, group), key=key, reverse=descending), temp_dir))
+                for f in group:
+                    f.close()
+            runs = merged
+        # heapq.merge は同じキーなら先に渡した入力を優先するので安定
+        for _, value in merge(*map(_ReadRun, runs), key=key, reverse=descending):
+            yield value
+    finally:
+        for f in runs:
+            f.close()
+
+
+def _TopByKeys(source: Iterable[Any], count: int, keys: _SortKeys) -> List[Any]:
+    if count <= 0:
+        return []
+    descending = keys[0][1]
+    if len(keys) == 1:
+        key = keys[0][0]
+    elif all(desc == descending for _, desc in keys):
+        selectors = tuple(selector for selector, _ in keys)
+        def key(val): return tuple(f(val) for f in selectors)
+    else:
+        # ストリームなので列ごとの判定はできず、降順キーは常にラップする
+        descending = False
+        def key(val): return tuple(
+            _Reverse(f(val)) if desc else f(val) for f, desc in keys)
+    if descending:
+        return nlargest(count, source, key=key)
+    return nsmallest(count, source, key=key)
+
+
+def _TopBy(it: Iterator[Any], arg: Tuple[_SortKeys, int]) -> Iterator[Any]:
+    keys, n = arg
+    yield from _TopByKeys(it, n, keys)
+
+
+def _IsSorted(keys: List[Any]) -> bool:
+    try:
+        return all(map(le, keys, islice(keys, 1, None)))
+    except TypeError:
+        return False
+
+
+def _KeyTypeCount(*keys: List[Any]) -> int:
+    # 型の違うキー同士は < で比べられないので、マージ結合は 1 種類のときだけ使う
+    return len({type(k) for side in keys for k in side if k is not None})
+
+
+def _Join(
+    outer: Iterable[Any],
+    inner: Iterable[Any],
+    outerKey: Callable[[Any], Any],
+    innerKey: Callable[[Any], Any],
+    result: Callable[[Any, Any], Any],
+) -> Iterator[Any]:
+    inner_items = list(inner)
+    inner_keys = list(map(innerKey, inner_items))
+    if hasattr(outer, "__len__"):
+        outer_items = list(outer)
+        outer_keys = list(map(outerKey, outer_items))
+        if (_KeyTypeCount(outer_keys, inner_keys) == 1
+                and _IsSorted(outer_keys) and _IsSorted(inner_keys)):
+            yield from _MergeJoin(outer_items, outer_keys, inner_items, inner_keys, result)
+            return
+        if len(outer_items) < len(inner_items):
+            # 小さい外側でハッシュ表を作り、結果は外側の順に並べ直す
+            positions: Dict[Any, List[int]] = {}
+            for i, k in enumerate(outer_keys):
+                if k is not None:
+                    positions.setdefault(k, []).append(i)
+            matches: List[List[Any]] = [[] for _ in outer_items]
+            for k, val in zip(inner_keys, inner_items):
+                for i in positions.get(k, ()):
+                    matches[i].append(val)
+            for val, found in zip(outer_items, matches):
+                for other in found:
+                    yield result(val, other)
+            return
+        pairs: Iterable[Tuple[Any, Any]] = zip(outer_keys, outer_items)
+    else:
+        pairs = ((outerKey(val), val) for val in outer)
+    table: Dict[Any, List[Any]] = {}
+    for k, val in zip(inner_keys, inner_items):
+        if k is not None:
+            table.setdefault(k, []).append(val)
+    for k, val in pairs:
+        for other in table.get(k, ()) if k is not None else ():
+            yield result(val, other)
+
+
+def _MergeJoin(
+    outer_items: List[Any],
+    outer_keys: List[Any],
+    inner_items: List[Any],
+    inner_keys: List[Any],
+    result: Callable[[Any, Any], Any],
+) -> Iterator[Any]:
+    o, i = 0, 0
+    while o < len(outer_keys) and i < len(inner_keys):
+        ok, ik = outer_keys[o], inner_keys[i]
+        if ok is None:
+            o += 1
+        elif ik is None or ik < ok:
+            i += 1
+        elif ok < ik:
+            o += 1
+        else:
+            # 同じキーの内側の連続区間を、同じキーの外側それぞれと組み合わせる
+            end = i
+            while end < len(inner_keys) and inner_keys[end] == ok:
+                end += 1
+            while o < len(outer_keys) and outer_keys[o] == ok:
+                for j in range(i, end):
+                    yield result(outer_items[o], inner_items[j])
+                o += 1
+            i = end
+
+
+def _GroupJoin(
+    outer: Iterable[Any],
+    inner: Iterable[Any],
+    outerKey: Callable[[Any], Any],
+    innerKey: Callable[[Any], Any],
+    result: Callable[[Any, Any], Any],
+) -> Iterator[Any]:
+    from PyLINQ.generics import TypedList
+    table: Dict[Any, List[Any]] = {}
+    for val in inner:
+        k = innerKey(val)
+        if k is not None:
+            table.setdefault(k, []).append(val)
+    for val in outer:
+        k = outerKey(val)
+        yield result(val, TypedList(table.get(k, ()) if k is not None else ()))
+
+
+def _Distinct(
+    it: Iterator[Any],
+    arg: Tuple[Optional[Callable[[Any], Any]], Optional[EqualityComparer]],
+) -> Iterator[Any]:
+    key, comparer = arg
+    if key is None and comparer is None:
+        seen: set = set()
+        for value in it:
+            if value not in seen:
+                seen.add(value)
+                yield value
+        return
+    hashset = _HashSet(comparer)
+    for value in it:
+        if hashset.Add(value if key is None else key(value)):
+            yield value
+
+
+def _Intersect(
+    it: Iterator[Any],
+    arg: Tuple[Iterable[Any], Optional[Callable[[Any], Any]], Optional[EqualityComparer]],
+) -> Iterator[Any]:
+    second, key, comparer = arg
+    hashset = _HashSet(comparer, second)
+    for value in it:
+        # 一度返した要素は集合から外して重複を防ぐ
+        if hashset.Remove(value if key is None else key(value)):
+            yield value
+
+
+def _Except(
+    it: Iterator[Any],
+    arg: Tuple[Iterable[Any], Optional[Callable[[Any], Any]], Optional[EqualityComparer]],
+) -> Iterator[Any]:
+    second, key, comparer = arg
+    hashset = _HashSet(comparer, second)
+    for value in it:
+        if hashset.Add(value if key is None else key(value)):
+            yield value
+
+
+def _AsBatch(chunk: List[Any], as_array: bool) -> Any:
+    if not as_array:
+        return chunk
+    import numpy as np
+    return np.asarray(chunk)
+
+
+def _SelectBatch(it: Iterator[Any], arg: Tuple[Callable[[Any], Iterable[Any]], int, bool]) -> Iterator[Any]:
+    fn, size, as_array = arg
+    for chunk in Enumrable.Chunk(it, size):
+        results = fn(_AsBatch(chunk, as_array))
+        if hasattr(results, "tolist"):
+            # ndarray はPythonのスカラーに戻して返す
+            results = results.tolist()
+        yield from results
+
+
+# ファイル読み込みのバッファサイズ
+_READ_BUFFER = 1 << 20
+
+
+def _ReadJsonLines(path: str, encoding: str) -> Iterator[Any]:
+    with open(path, "r", encoding=encoding, buffering=_READ_BUFFER) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _ReadCsv(path: str, header: bool, delimiter: str, encoding: str) -> Iterator[Any]:
+    with open(path, "r", encoding=encoding, newline="", buffering=_READ_BUFFER) as f:
+        if header:
+            yield from csv.DictReader(f, delimiter=delimiter)
+        else:
+            yield from csv.reader(f, delimiter=delimiter)
+
+
+def _ReadParquetBatches(path: str, batch_size: int, columns: Optional[List[str]]) -> Iterator[Any]:
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+    try:
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+            yield from batch.to_pylist()
+    finally:
+        parquet.close()
+
+
+# 各ステージは上流のイテレータを受け取り、下流のイテレータを返す
+_STAGES: Dict[str, Callable[[Iterator[Any], Any], Iterator[Any]]] = {
+    "where": lambda it, fn: filter(fn, it),
+    "select": lambda it, fn: map(fn, it),
+    "notnone": lambda it, _: _NotNone(it),
+    "set": lambda it, fn: map(fn, it, count()),
+    "orderby": _OrderBy,
+    "topby": _TopBy,
+    "orderbyexternal": lambda it, arg: Enumrable.OrderByExternal(it, *arg),
+    "take": lambda it, n: islice(it, max(n, 0)),
+    "skip": lambda it, n: islice(it, max(n, 0), None),
+    "takewhile": lambda it, fn: takewhile(fn, it),
+    "skipwhile": lambda it, fn: dropwhile(fn, it),
+    "chunk": lambda it, size: Enumrable.Chunk(it, size),
+    "selectbatch": _SelectBatch,
+    "distinct": _Distinct,
+    "intersect": _Intersect,
+    "except": _Except,
+}
+
+# 1 つのループに融合できるステージ
+_FUSIBLE = frozenset(("where", "select", "notnone"))
+
+# 融合済みループのキャッシュ (パイプラインの形 -> 生成した関数)
+_FUSED: Dict[Tuple[str, ...], Callable[..., Iterator[Any]]] = {}
+
+
+def _Fuse(shape: Tuple[str, ...]) -> Callable[..., Iterator[Any]]:
+    """Returns a function that runs the stages of `shape` in one generator expression.\n
+    `("where", "select", "where")` becomes
+    `(x1 for x0 in it if f0(x0) if f2(x1 := f1(x0)))`
+    """
+    cached = _FUSED.get(shape)
+    if cached is not None:
+        return cached
+    current = "x0"
+    bound = 0
+    conditions: List[str] = []
+    for i, op in enumerate(shape):
+        if op == "select":
+            # 射影は次のフィルタまで入れ子の呼び出しとして遅延させる
+            current = f"f{i}({current})"
+            continue
+        if current != f"x{bound}":
+            bound += 1
+            current = f"(x{bound} := {current})"
+        if op == "where":
+            conditions.append(f"f{i}({current})")
+        else:
+            conditions.append(f"{current} is not None")
+        current = f"x{bound}"
+    params = "".join(f", f{i}" for i in range(len(shape)))
+    clauses = "".join(f" if {condition}" for condition in conditions)
+    source = f"def fused(it{params}):\n    return ({current} for x0 in it{clauses})\n"
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    fused: Callable[..., Iterator[Any]] = namespace["fused"]
+    _FUSED[shape] = fused
+    return fused
+
+
+_WindowBounds = Tuple[int, Optional[int]]
+
+
+def _TopK(plan: Tuple[Tuple[str, Any], ...]) -> Tuple[Tuple[str, Any], ...]:
+    """Rewrites `OrderBy(...).Take(k)` into one `topby` stage."""
+    rewritten: List[Tuple[str, Any]] = []
+    for op, arg in plan:
+        if op == "take" and rewritten and rewritten[-1][0] == "orderby":
+            op, arg = "topby", (rewritten.pop()[1], max(arg, 0))
+        rewritten.append((op, arg))
+    return tuple(rewritten)
+
+
+def _Bind(stage: Callable[..., Iterator[Any]], *args: Any) -> Callable[[Iterator[Any]], Iterator[Any]]:
+    return lambda it: stage(it, *args)
+
+
+def _Compile(
+    plan: Tuple[Tuple[str, Any], ...]
+) -> Tuple[_WindowBounds, List[Callable[[Iterator[Any]], Iterator[Any]]]]:
+    """Plan the stages.\n
+    Leading Skip/Take are folded into a (start, stop) window on the source.
+    OrderBy followed by Take becomes a bounded heap (top-k) instead of a full sort.
+    Runs of two or more Where/Select/NotNone are fused into one loop.
+    """
+    start, stop = 0, None
+    i = 0
+    while i < len(plan) and plan[i][0] in ("skip", "take"):
+        op, n = plan[i]
+        n = max(n, 0)
+        if op == "skip":
+            start = start + n if stop is None else min(stop, start + n)
+        else:
+            stop = start + n if stop is None else min(stop, start + n)
+        i += 1
+    compiled: List[Callable[[Iterator[Any]], Iterator[Any]]] = []
+    plan = _TopK(plan)
+    while i < len(plan):
+        j = i
+        while j < len(plan) and plan[j][0] in _FUSIBLE:
+            j += 1
+        if j - i >= 2:
+            fused = _Fuse(tuple(op for op, _ in plan[i:j]))
+            args = tuple(arg for _, arg in plan[i:j])
+            compiled.append(_Bind(fused, *args))
+            i = j
+            continue
+        op, arg = plan[i]
+        stage = _STAGES[op]
+        compiled.append(_Bind(stage, arg))
+        i += 1
+    return (start, stop), compiled
+
+
+def _Window(source: Iterable[Any], window: _WindowBounds) -> Iterator[Any]:
+    start, stop = window
+    if start == 0 and stop is None:
+        return iter(source)
+    if isinstance(source, (list, tuple, range)):
+        # 添字アクセスできるソースは読み飛ばさずにページの要素だけを読む
+        stop = len(source) if stop is None else min(stop, len(source))
+        return map(source.__getitem__, range(min(start, stop), stop))
+    return islice(source, start, stop)
+
+
+class Enumerable(Generic[T1]):
+    """## Lazy, deferred-execution query like C# IEnumerable
+    Operators only build a plan. The plan is executed once at a terminal call
+    (`ToList`, `First`, `Sum`, iteration ...), streaming one element at a time.\n
+    Usage:
+    `query = li.AsEnumerable().Where(lambda x: x > 0).Select(lambda x: x * 2)` Build plan \n
+    `query.ToList()` Execute plan \n
+    """
+
+    def __init__(self, source: Iterable[T1] = ()) -> None:
+        """Create a query over `source`.
+        @source: Any iterable. It is iterated again on every execution.
+        """
+        self.__factory: Callable[[], Iterable[Any]] = lambda: source
+        self.__plan: Tuple[Tuple[str, Any], ...] = ()
+        self.__compiled: Optional[Tuple[_WindowBounds, List[Callable[[Iterator[Any]], Iterator[Any]]]]] = None
+
+    @staticmethod
+    def Defer(factory: Callable[[], Iterable[T1]]) -> "Enumerable[T1]":
+        """Create a query whose source is resolved by `factory` at execution time.
+        @factory: Function that returns the source iterable
+        """
+        query: Enumerable[T1] = Enumerable()
+        query.__factory = factory
+        return query
+
+    @staticmethod
+    def FromJsonLines(path: str, encoding: str = "utf-8") -> "Enumerable[Any]":
+        """Stream the objects of a JSON Lines file (one JSON document per line).\n
+        The file is read through a buffer when the query is executed; blank lines are skipped.
+        @path: File path
+        @[optional] encoding: Text encoding
+        """
+        return Enumerable.Defer(lambda: _ReadJsonLines(path, encoding))
+
+    @staticmethod
+    def FromCsv(
+        path: str, header: bool = True, delimiter: str = ",", encoding: str = "utf-8"
+    ) -> "Enumerable[Any]":
+        """Stream the rows of a CSV file.\n
+        @path: File path
+        @[optional] header: Use the first row as keys and yield dicts (False yields lists)
+        @[optional] delimiter: Field delimiter (e.g. "\\t" for TSV)
+        @[optional] encoding: Text encoding
+        """
+        return Enumerable.Defer(lambda: _ReadCsv(path, header, delimiter, encoding))
+
+    @staticmethod
+    def FromParquetBatches(
+        path: str, batch_size: int = 65536, columns: Optional[List[str]] = None
+    ) -> "Enumerable[Dict[str, Any]]":
+        """Stream the rows of a Parquet file as dicts, decoding `batch_size` rows at a time.\n
+        Memory stays bounded by one batch. (Requires pyarrow)
+        @path: File path
+        @[optional] batch_size: Rows per decoded batch
+        @[optional] columns: Columns to read (default: all)
+        """
+        return Enumerable.Defer(lambda: _ReadParquetBatches(path, batch_size, columns))
+
+    def __iter__(self) -> Iterator[T1]:
+        if self.__compiled is None:
+            self.__compiled = _Compile(self.__plan)
+        window, stages = self.__compiled
+        it = _Window(self.__factory(), window)
+        for stage in stages:
+            it = stage(it)
+        return it
+
+    def __Chain(self, op: str, arg: Any) -> "Enumerable[Any]":
+        query: Enumerable[Any] = Enumerable()
+        query.__factory = self.__factory
+        query.__plan = self.__plan + ((op, arg),)
+        return query
+
+    # Deferred operators
+    def Where(self, fn: Callable[[T1], bool]) -> "Enumerable[T1]":
+        """Only the elements whose `fn` condition returns True are extracted."""
+        return self.__Chain("where", fn)
+
+    def Select(self, selector: Callable[[T1], TResult]) -> "Enumerable[TResult]":
+        """Project each element with `selector`.
+        @selector: Anonymous function to get
+        """
+        return self.__Chain("select", selector)
+
+    def NotNone(self) -> "Enumerable[T1]":
+        """Skip the element of `None`."""
+        return self.__Chain("notnone", None)
+
+    def Set(self, fn: Callable[[T1, int], T1]) -> "Enumerable[T1]":
+        """Replace each element with the value returned by `fn`.
+        @fn: p0>Iterated object, p1>index
+        """
+        return self.__Chain("set", fn)
+
+    def OrderBy(self, selector: Callable[[T1], typing.Union[int, str]]) -> "Enumerable[T1]":
+        """Sort by the int or str returned by `selector`.\n
+        ** Buffers the upstream elements when executed **
+        """
+        return self.__Chain("orderby", ((selector, False),))
+
+    def OrderByDescending(self, selector: Callable[[T1], typing.Union[int, str]]) -> "Enumerable[T1]":
+        """Sort descending by the int or str returned by `selector`.\n
+        ** Buffers the upstream elements when executed **
+        """
+        return self.__Chain("orderby", ((selector, True),))
+
+    def ThenBy(self, selector: Callable[[T1], Any]) -> "Enumerable[T1]":
+        """Subsequent ascending key for the preceding OrderBy (one composite-key sort)."""
+        return self.__ThenBy(selector, False)
+
+    def ThenByDescending(self, selector: Callable[[T1], Any]) -> "Enumerable[T1]":
+        """Subsequent descending key for the preceding OrderBy (one composite-key sort)."""
+        return self.__ThenBy(selector, True)
+
+    def __ThenBy(self, selector: Callable[[T1], Any], descending: bool) -> "Enumerable[T1]":
+        if not self.__plan or self.__plan[-1][0] != "orderby":
+            raise TypeError("ThenBy should follow OrderBy or OrderByDescending")
+        query: Enumerable[T1] = Enumerable()
+        query.__factory = self.__factory
+        keys = self.__plan[-1][1] + ((selector, descending),)
+        query.__plan = self.__plan[:-1] + (("orderby", keys),)
+        return query
+
+    def OrderByExternal(
+        self,
+        selector: Callable[[T1], Any],
+        run_size: int = 1 << 20,
+        temp_dir: Optional[str] = None,
+        descending: bool = False,
+    ) -> "Enumerable[T1]":
+        """Stable sort that spills sorted runs to temporary files (for input larger than memory).\n
+        At most `run_size` elements are held in memory; the runs are merged lazily.
+        @selector: Selector to order (keys and elements must be picklable)
+        @[optional] run_size: Elements per in-memory run
+        @[optional] temp_dir: Directory of the temporary files
+        @[optional] descending: Sort descending
+        """
+        if run_size < 1:
+            raise ValueError("run_size should be 1 or more")
+        return self.__Chain("orderbyexternal", (selector, run_size, temp_dir, descending))
+
+    def Take(self, count: int) -> "Enumerable[T1]":
+        """Returns the first `count` elements and stops pulling from upstream.\n
+        Directly after OrderBy/OrderByDescending, only `count` elements are kept in a heap.
+        """
+        return self.__Chain("take", count)
+
+    def TopBy(self, count: int, selector: Callable[[T1], Any]) -> "Enumerable[T1]":
+        """The `count` elements with the largest keys, largest first (O(n log k)).\n
+        Equal keys keep their source order.
+        """
+        return self.__Chain("topby", (((selector, True),), count))
+
+    def BottomBy(self, count: int, selector: Callable[[T1], Any]) -> "Enumerable[T1]":
+        """The `count` elements with the smallest keys, smallest first (O(n log k)).\n
+        Equal keys keep their source order.
+        """
+        return self.__Chain("topby", (((selector, False),), count))
+
+    def Skip(self, count: int) -> "Enumerable[T1]":
+        """Skip the first `count` elements.\n
+        On a list source a leading Skip/Take reads only the requested page.
+        """
+        return self.__Chain("skip", count)
 
-        mid = len(arr) // 2
-        # ここで分割を行う
-        left = arr[:mid]
-        right = arr[mid:]
+    def TakeWhile(self, fn: Callable[[T1], bool]) -> "Enumerable[T1]":
+        """Returns the elements until `fn` returns False for the first time."""
+        return self.__Chain("takewhile", fn)
 
-        # 再帰的に分割を行う
-        left = Enumrable.OrderBy(left, keyselector)
-        right = Enumrable.OrderBy(right, keyselector)
+    def SkipWhile(self, fn: Callable[[T1], bool]) -> "Enumerable[T1]":
+        """Skip the elements until `fn` returns False for the first time."""
+        return self.__Chain("skipwhile", fn)
 
-        # returnが返ってきたら、結合を行い、結合したものを次に渡す
-        return Enumrable.__merge(left, right, keyselector)
+    def Chunk(self, size: int) -> "Enumerable[List[T1]]":
+        """Group the elements into lists of `size` elements (the last one may be shorter)."""
+        if size < 1:
+            raise ValueError("size should be 1 or more")
+        return self.__Chain("chunk", size)
+
+    def SelectBatch(
+        self,
+        fn: Callable[[Any], Iterable[TResult]],
+        size: int = 4096,
+        as_array: bool = False,
+    ) -> "Enumerable[TResult]":
+        """Project the elements `size` at a time with one call of `fn` per batch.\n
+        `fn` receives a list (or a NumPy array when `as_array`) and returns one result per element.
+        @fn: Batch selector
+        @[optional] size: Elements per batch
+        @[optional] as_array: Pass batches as NumPy arrays (requires numpy)\n
+        [Usage]\n
+        `query.SelectBatch(lambda xs: xs * 2, as_array=True)`
+        """
+        if size < 1:
+            raise ValueError("size should be 1 or more")
+        return self.__Chain("selectbatch", (fn, size, as_array))
+
+    def Distinct(self, comparer: Optional[EqualityComparer[T1]] = None) -> "Enumerable[T1]":
+        """Skip repeated elements, keeping the first occurrence (single hash pass).
+        @[optional] comparer: EqualityComparer for unhashable elements
+        """
+        return self.__Chain("distinct", (None, comparer))
+
+    def DistinctBy(
+        self,
+        key: Callable[[T1], TKey],
+        comparer: Optional[EqualityComparer[TKey]] = None,
+    ) -> "Enumerable[T1]":
+        """Skip elements whose key returned by `key` was already seen.
+        @key: Key selector
+        @[optional] comparer: EqualityComparer for unhashable keys
+        """
+        return self.__Chain("distinct", (key, comparer))
+
+    def Union(
+        self,
+        second: Iterable[T1],
+        comparer: Optional[EqualityComparer[T1]] = None,
+    ) -> "Enumerable[T1]":
+        """Distinct elements of this query followed by the new ones of `second`.
+        @second: Sequence to add
+        @[optional] comparer: EqualityComparer for unhashable elements
+        """
+        return Enumerable.Defer(
+            lambda: _Distinct(chain(self, second), (None, comparer)))
+
+    def Intersect(
+        self,
+        second: Iterable[T1],
+        comparer: Optional[EqualityComparer[T1]] = None,
+    ) -> "Enumerable[T1]":
+        """Distinct elements of this query that are also contained in `second`.
+        @second: Sequence to intersect
+        @[optional] comparer: EqualityComparer for unhashable elements
+        """
+        return self.__Chain("intersect", (second, None, comparer))
+
+    def Except(
+        self,
+        second: Iterable[T1],
+        comparer: Optional[EqualityComparer[T1]] = None,
+    ) -> "Enumerable[T1]":
+        """Distinct elements of this query that are not contained in `second`.
+        @second: Sequence to except
+        @[optional] comparer: EqualityComparer for unhashable elements
+        """
+        return self.__Chain("except", (second, None, comparer))
+
+    def ExceptBy(
+        self,
+        second: Iterable[TKey],
+        key: Callable[[T1], TKey],
+        comparer: Optional[EqualityComparer[TKey]] = None,
+    ) -> "Enumerable[T1]":
+        """Elements whose key is not contained in `second`, one per key.
+        @second: Keys to except
+        @key: Key selector
+        @[optional] comparer: EqualityComparer for unhashable keys
+        """
+        return self.__Chain("except", (second, key, comparer))
+
+    # Terminal operators
+    def ToList(self) -> "TypedList[T1]":
+        """Execute the query and collect the result into a new TypedList."""
+        from PyLINQ.generics import TypedList
+        return TypedList(self)
+
+    def AllOf(self, fn: Callable[[T1], bool]) -> bool:
+        """Returns True if all `fn` returns True.
+        @fn: Function to decide
+        """
+        return all(map(fn, self))
+
+    def AnyOf(self, fn: Callable[[T1], bool]) -> bool:
+        """Returns True if any of `fn` returns True.
+        @fn: Function to decide
+        """
+        return any(map(fn, self))
+
+    def Average(self, selector: Optional[Callable[[T1], int]] = None):
+        """Averages the numbers returned by `selector`.
+        @[optional] selector: Anonymous function that returns a number
+        @exception: If the number of elements is 0, ZeroDivisionError will be raised.
+        """
+        total: Any = 0
+        counter = 0
+        for val in self if selector is None else map(selector, self):
+            total += val
+            counter += 1
+        if counter == 0:
+            raise ZeroDivisionError
+        return total / counter
+
+    def Count(self) -> int:
+        """Returns the number of elements."""
+        counter = 0
+        for _ in self:
+            counter += 1
+        return counter
+
+    def CountOfOn(self, fn: Callable[[T1], bool]) -> int:
+        """Counts and returns the number of `True` returned in the anonymous function `fn`."""
+        counter = 0
+        for _ in filter(fn, self):
+            counter += 1
+        return counter
+
+    def First(self) -> T1:
+        """Returns the first element."""
+        for val in self:
+            return val
+        raise IndexError("Index out of range")
+
+    def FirstOn(self, fn: Callable[[T1], bool]) -> Optional[T1]:
+        """Returns the first element of which the return value of fn is True."""
+        for val in filter(fn, self):
+            return val
+        return None
+
+    def Last(self) -> Optional[T1]:
+        """Get the last element."""
+        last = None
+        for last in self:
+            pass
+        return last
+
+    def LastOn(self, fn: Callable[[T1], bool]) -> Optional[T1]:
+        """The last element in the condition that True is returned by `fn`"""
+        last = None
+        for last in filter(fn, self):
+            pass
+        return last
+
+    def Max(self, selector: Optional[Callable[[T1], int]] = None):
+        """Returns max value of int selector.\n
+        @[optional] selector: Selector to set int value
+        """
+        values: Iterable[Any] = self if selector is None else map(selector, self)
+        return max(values)
+
+    def Min(self, selector: Optional[Callable[[T1], int]] = None):
+        """Returns min value of int selector.\n
+        @[optional] selector: Selector to set int value
+        """
+        values: Iterable[Any] = self if selector is None else map(selector, self)
+        return min(values)
+
+    def MaxBy(self, selector: Callable[[T1], Any]) -> T1:
+        """Returns the (first) element with the largest key.
+        @exception: If there are no elements, ValueError will be raised.
+        """
+        return max(self, key=selector)
+
+    def MinBy(self, selector: Callable[[T1], Any]) -> T1:
+        """Returns the (first) element with the smallest key.
+        @exception: If there are no elements, ValueError will be raised.
+        """
+        return min(self, key=selector)
+
+    def Sum(self, fn: Optional[Callable[[T1], int]] = None):
+        """Sum the ints returned by `fn`.
+        @[optional] fn: Anonymous function that specifies a int
+        """
+        return sum(self if fn is None else map(fn, self))
+
+    def ForEach(self, fn: Callable[[T1], Optional[Any]]) -> None:
+        """Execute the query and pass each element to `fn`."""
+        for val in self:
+            fn(val)
+
+    def ForEachBatch(self, fn: Callable[[Any], Any], size: int = 4096, as_array: bool = False) -> None:
+        """Execute the query and pass the elements to `fn` `size` at a time (bulk sinks).
+        @fn: Receives a list (or a NumPy array when `as_array`)
+        @[optional] size: Elements per batch
+        @[optional] as_array: Pass batches as NumPy arrays (requires numpy)
+        """
+        for chunk in Enumrable.Chunk(self, size):
+            fn(_AsBatch(chunk, as_array))
+
+    def ToJsonLines(
+        self,
+        path: str,
+        selector: Optional[Callable[[T1], Any]] = None,
+        size: int = 4096,
+        encoding: str = "utf-8",
+    ) -> None:
+        """Execute the query and write one JSON document per element to `path`.
+        @path: File path
+        @[optional] selector: Converts an element to a JSON serializable value
+        @[optional] size: Elements written per batch
+        """
+        with open(path, "w", encoding=encoding, buffering=_READ_BUFFER) as f:
+            source = self if selector is None else map(selector, self)
+            for chunk in Enumrable.Chunk(source, size):
+                f.writelines([json.dumps(val) + "\n" for val in chunk])
+
+    def Join(
+        self,
+        inner: Iterable[TElement],
+        outerKey: Callable[[T1], TKey],
+        innerKey: Callable[[TElement], TKey],
+        resultSelector: Callable[[T1, TElement], TResult],
+    ) -> "Enumerable[TResult]":
+        """Correlate the elements of this query and `inner` by equal keys (hash join).\n
+        The outer elements are streamed against a hash table of `inner`.
+        Results keep the outer order, then the inner order.
+        @inner: Sequence to join
+        @outerKey: Key selector of this query
+        @innerKey: Key selector of `inner`
+        @resultSelector: Function that builds a result from a matching pair
+        """
+        return Enumerable.Defer(
+            lambda: Enumrable.Join(self, inner, outerKey, innerKey, resultSelector))
+
+    def GroupJoin(
+        self,
+        inner: Iterable[TElement],
+        outerKey: Callable[[T1], TKey],
+        innerKey: Callable[[TElement], TKey],
+        resultSelector: Callable[[T1, "TypedList[TElement]"], TResult],
+    ) -> "Enumerable[TResult]":
+        """Correlate each element with the List of matching `inner` elements.\n
+        Every outer element produces one result, even without a match.
+        @inner: Sequence to join
+        @outerKey: Key selector of this query
+        @innerKey: Key selector of `inner`
+        @resultSelector: Function that builds a result from an element and its matches
+        """
+        return Enumerable.Defer(
+            lambda: Enumrable.GroupJoin(self, inner, outerKey, innerKey, resultSelector))
+
+    def GroupBy(
+        self,
+        key: Callable[[T1], TKey],
+        element: Optional[Callable[[T1], TElement]] = None,
+        result: Optional[Callable[[TKey, "TypedList[TElement]"], TResult]] = None,
+    ) -> Any:
+        """Group the elements by the key returned by `key` in a single hash pass.
+        @key: Key selector
+        @[optional] element: Element selector applied to each grouped element
+        @[optional] result: Function that builds one result from a key and its group
+        @returns: GroupedEnumerable, or Enumerable of results when `result` is given
+        [Usage]\n
+        `query.GroupBy(lambda run: run.species).Sum(lambda run: run.size)`
+        """
+        grouped = GroupedEnumerable(self, key, element)
+        if result is None:
+            return grouped
+        return Enumerable.Defer(
+            lambda: (result(group.Key, group) for group in grouped.ToLookup()))
+
+    def ToLookup(
+        self,
+        key: Callable[[T1], TKey],
+        element: Optional[Callable[[T1], TElement]] = None,
+    ) -> "Lookup[TKey, TElement]":
+        """Execute the query and group the elements into a Lookup.
+        @key: Key selector
+        @[optional] element: Element selector
+        """
+        return GroupedEnumerable(self, key, element).ToLookup()
+
+    def ToDictionary(
+        self,
+        key: Callable[[T1], TKey],
+        element: Optional[Callable[[T1], TElement]] = None,
+    ) -> "DictionaryC[TKey, TElement]":
+        """Execute the query and collect the elements into a DictionaryC.
+        @key: Key selector
+        @[optional] element: Value selector
+        A None key is kept like any other key.
+        @exception: If two elements have the same key, KeyError will be raised.
+        """
+        from PyLINQ.generics import DictionaryC
+        table: Dict[Any, Any] = {}
+        for val in self:
+            k = key(val)
+            if k in table:
+                raise KeyError(
+                    "An element with the same key already exists: " + repr(k))
+            table[k] = val if element is None else element(val)
+        return DictionaryC._FromDict(table)
+
+
+class GroupedEnumerable(Generic[TKey, TElement]):
+    """## Deferred grouping returned by `GroupBy`
+    Per-group aggregates (`Count`, `Sum`, `Average`, `Max`, `Min`) are computed
+    in one hash pass without building the list of each group.
+    Key access and iteration build a Lookup, reused while a TypedList source is
+    unchanged (its `Version`); other sources are grouped again on each access.\n
+    Usage:
+    `grouped = li.GroupBy(lambda run: run.species)` \n
+    `grouped.Count()["human"]` Number of elements per key \n
+    `grouped["human"]` Elements of one key \n
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        key: Callable[[Any], TKey],
+        element: Optional[Callable[[Any], TElement]] = None,
+    ) -> None:
+        self.__source = source
+        self.__key = key
+        self.__element = element
+        # (source.Version, Lookup)
+        self.__lookup: Optional[Tuple[int, "Lookup[TKey, TElement]"]] = None
+
+    def __Pairs(self) -> Iterator[Tuple[TKey, TElement]]:
+        key = self.__key
+        element = self.__element
+        if element is None:
+            return ((key(val), val) for val in self.__source)
+        return ((key(val), element(val)) for val in self.__source)
 
     @staticmethod
-    def __merge(left: List, right: List, keyselector: Callable[[T1], Any]):
-        merged = []
-        l_i, r_i = 0, 0
+    def __ToDictionaryC(table: Dict[Any, Any]) -> "DictionaryC[TKey, Any]":
+        from PyLINQ.generics import DictionaryC
+        return DictionaryC._FromDict(table)
+
+    def __getitem__(self, key: TKey) -> "TypedList[TElement]":
+        return self.ToLookup()[key]
+
+    def __iter__(self):
+        return iter(self.ToLookup())
+
+    def ToLookup(self) -> "Lookup[TKey, TElement]":
+        """Build and return the Lookup of this grouping."""
+        from PyLINQ.generics import Lookup
+        version: Optional[int] = getattr(self.__source, "Version", None)
+        if version is not None and self.__lookup is not None and self.__lookup[0] == version:
+            return self.__lookup[1]
+        groups: Dict[Any, List[Any]] = {}
+        for k, e in self.__Pairs():
+            group = groups.get(k)
+            if group is None:
+                groups[k] = [e]
+            else:
+                group.append(e)
+        lookup = Lookup(groups)
+        if version is not None:
+            self.__lookup = (version, lookup)
+        return lookup
+
+    def Count(self) -> "DictionaryC[TKey, int]":
+        """Returns the number of elements per key."""
+        counts: Dict[Any, int] = {}
+        for k, _ in self.__Pairs():
+            counts[k] = counts.get(k, 0) + 1
+        return GroupedEnumerable.__ToDictionaryC(counts)
+
+    def Sum(self, selector: Optional[Callable[[TElement], Any]] = None) -> "DictionaryC[TKey, Any]":
+        """Sum the numbers returned by `selector` per key."""
+        totals: Dict[Any, Any] = {}
+        for k, e in self.__Pairs():
+            totals[k] = totals.get(k, 0) + (e if selector is None else selector(e))
+        return GroupedEnumerable.__ToDictionaryC(totals)
 
-        #   ソート済み配列をマージするため、それぞれ左から見ていくだけで良い
-        while l_i < len(left) and r_i < len(right):
-            # ここで=をつけることで安定性を保っている
-            if keyselector(left[l_i]) <= keyselector(right[r_i]):
-                merged.append(left[l_i])
-                l_i += 1
+    def Average(self, selector: Optional[Callable[[TElement], Any]] = None) -> "DictionaryC[TKey, float]":
+        """Averages the numbers returned by `selector` per key."""
+        totals: Dict[Any, List[Any]] = {}
+        for k, e in self.__Pairs():
+            value = e if selector is None else selector(e)
+            acc = totals.get(k)
+            if acc is None:
+                totals[k] = [value, 1]
             else:
-                merged.append(right[r_i])
-                r_i += 1
-
-        # 上のwhile文のどちらかがFalseになった場合終了するため、あまりをextendする
-        if l_i < len(left):
-            merged.extend(left[l_i:])
-        if r_i < len(right):
-            merged.extend(right[r_i:])
-        return merged
+                acc[0] += value
+                acc[1] += 1
+        return GroupedEnumerable.__ToDictionaryC(
+            {k: total / counter for k, (total, counter) in totals.items()})
+
+    def Max(self, selector: Optional[Callable[[TElement], Any]] = None) -> "DictionaryC[TKey, Any]":
+        """Returns the max value of `selector` per key."""
+        best: Dict[Any, Any] = {}
+        for k, e in self.__Pairs():
+            value = e if selector is None else selector(e)
+            if k not in best or best[k] < value:
+                best[k] = value
+        return GroupedEnumerable.__ToDictionaryC(best)
+
+    def Min(self, selector: Optional[Callable[[TElement], Any]] = None) -> "DictionaryC[TKey, Any]":
+        """Returns the min value of `selector` per key."""
+        best: Dict[Any, Any] = {}
+        for k, e in self.__Pairs():
+            value = e if selector is None else selector(e)
+            if k not in best or value < best[k]:
+                best[k] = value
+        return GroupedEnumerable.__ToDictionaryC(best)
@@ -1,12 +1,23 @@
+from __future__ import annotations
+
 import json
+import typing
+from bisect import bisect_left
+from collections import OrderedDict
+from weakref import WeakSet
+from itertools import dropwhile, islice, takewhile
 from json.decoder import JSONDecodeError
-from typing import (Any, Callable, Generic, List, Optional, TypeVar, Union,
-                    overload)
+from typing import (Any, Callable, Dict, Generic, Iterable, Iterator, List,
+                    Optional, Tuple, TypeVar, Union)
 
-from PyLINQ.enumrable import Enumrable
+from PyLINQ.enumrable import (EqualityComparer, Enumerable, Enumrable,
+                               GroupedEnumerable)
+from PyLINQ.parallel import ParallelEnumerable
 
 T1 = TypeVar("T1")
 T2 = TypeVar("T2")
+TKey = TypeVar("TKey")
+TElement = TypeVar("TElement")
 TResult = TypeVar("TResult")
 
 
@@ -19,6 +30,14 @@ class TypedList(Generic[T1]):
 
     __value: List[Any] = []
     __excludes: List[Any] = []
+    # 派生値キャッシュの最大件数 (LRU)
+    CacheCapacity: int = 32
+    # Materialize されたビュー (無ければ None)
+    __views: Optional[WeakSet[Any]] = None
+    # 直前の OrderBy/ThenBy のキー (ThenBy 用、並べ替えた時点の版数と組)
+    __sortkeys: Optional[Tuple[int, Tuple[Tuple[Callable[[Any], Any], bool], ...]]] = None
+    # CreateIndex された索引 (キーセレクタ -> HashIndex、無ければ None)
+    __indexes: Optional[Dict[Any, HashIndex[Any, Any]]] = None
 
     @staticmethod
     def Range(count: int, fn: Callable[[int], T1]):
@@ -35,30 +54,39 @@ class TypedList(Generic[T1]):
             raise je
         instance = TypedList[T1]()
         instance.__value = li
+        instance.__version += 1
         return instance
 
     @staticmethod
     def FromString(src: str, devider: str):
         return TypedList(src.split(devider))
 
-    def __init__(self, other: List[T1] = []) -> None:
+    @staticmethod
+    def FromArrow(array: Any):
+        """Create a List from a pyarrow Array or ChunkedArray (one bulk conversion).\n
+        For numeric columns without nulls, `TypedArray.FromArrow` shares the buffer instead.
+        """
+        return TypedList(array.to_pylist())
+
+    @staticmethod
+    def FromPolars(series: Any):
+        """Create a List from a polars Series (one bulk conversion).\n
+        For numeric columns without nulls, `TypedArray.FromPolars` shares the buffer instead.
+        """
+        return TypedList(series.to_list())
+
+    def __init__(self, other: Iterable[T1] = ()) -> None:
         """Create a given type List.
         @other: Other built-in-list
         """
-        self.__i = 0
-        self.__value = []
-        for arg in other:
-            self.__value.append(arg)
+        self.__value = list(other)
+        # 変更のたびに増える。キャッシュはこの値で検証する
+        self.__version = 0
+        self.__cache: OrderedDict[Any, Tuple[int, Any]] = OrderedDict()
 
-    def __iter__(self):
-        return self
-
-    def __next__(self) -> T1:
-        if self.__i == len(self.__value):
-            raise StopIteration()
-        value = self.__value[self.__i]
-        self.__i += 1
-        return value
+    def __iter__(self) -> Iterator[T1]:
+        # 呼び出しごとに独立した C 実装の list イテレータを返す
+        return iter(self.__value)
 
     def __getitem__(self, index: int):
         if index >= self.Length:
@@ -73,6 +101,11 @@ class TypedList(Generic[T1]):
         `instance.Add(MyClass())`
         """
         self.__value.append(value)
+        self.__version += 1
+        if self.__views:
+            self.__Notify((value,), False)
+        if self.__indexes:
+            self.__Index((value,))
         return self
 
     def AddOn(self, fn: Callable[[], T1]):
@@ -92,6 +125,11 @@ class TypedList(Generic[T1]):
         """
         for value in values:
             self.__value.append(value)
+        self.__version += 1
+        if self.__views:
+            self.__Notify(values, False)
+        if self.__indexes:
+            self.__Index(values)
         return self
 
     def AddRangeOn(self, fn: Callable[[], List[T1]]):
@@ -110,6 +148,7 @@ class TypedList(Generic[T1]):
         `instance.Clear()`
         """
         self.__value = []
+        self.__version += 1
         return self
 
     def Contains(self, value: T1):
@@ -119,6 +158,9 @@ class TypedList(Generic[T1]):
         [Usage]\n
         `instance.Conatins(myclass)`
         """
+        index = self.__Identity()
+        if index is not None:
+            return index.Contains(value)
         return self.__value.__contains__(value)
 
     def CountOf(self, value: T1):
@@ -128,6 +170,9 @@ class TypedList(Generic[T1]):
         [Usage]\n
         `instance.Conatins(myclass)`
         """
+        index = self.__Identity()
+        if index is not None:
+            return index.CountOf(value)
         return self.__value.count(value)
 
     def CountOfOn(self, fn: Callable[[T1], bool]):
@@ -163,39 +208,105 @@ class TypedList(Generic[T1]):
         """
         if type(other) is TypedList:
             other.__value = self.__value.copy()
+            other.__version += 1
         else:
             raise TypeError(
                 "You cannot copy to this type of " + str(type(other)))
         return self
 
-    def Except(self, *second: T1):
+    def Except(self, *second: T1, comparer: Optional[EqualityComparer[T1]] = None):
         """Except given object\n
+        Keeps the distinct elements that are not equal to any of `second`.\n
         @*second: except target\n
+        @[optional] comparer: EqualityComparer for unhashable elements\n
         @returns: self\n
         [Usage]\n
         `instance.Except(1, 100)` // Except 1 and 100 from TypedList\n
         If you except on lamda function, please use `instance.Where()` instead.
         """
-        for value in second:
-            self.__value.remove(value)
+        self.__value = list(self.AsEnumerable().Except(second, comparer))
+        self.__version += 1
         return self
 
-    def IndexOf(self, value: T1, start: int = 0, end: int = ...):
-        """Returns the index that contains value.\n
+    def ExceptBy(
+        self,
+        second: Iterable[TKey],
+        key: Callable[[T1], TKey],
+        comparer: Optional[EqualityComparer[TKey]] = None,
+    ):
+        """Keeps one element per key, except the keys contained in `second`.\n
+        @second: Keys to except
+        @key: Key selector
+        @[optional] comparer: EqualityComparer for unhashable keys\n
+        @returns: self
+        """
+        self.__value = list(self.AsEnumerable().ExceptBy(second, key, comparer))
+        self.__version += 1
+        return self
+
+    def Distinct(self, comparer: Optional[EqualityComparer[T1]] = None):
+        """Delete repeated elements, keeping the first occurrence.\n
+        @[optional] comparer: EqualityComparer for unhashable elements\n
+        @returns: self
+        """
+        if comparer is None:
+            self.__value = list(dict.fromkeys(self.__value))
+        else:
+            self.__value = list(self.AsEnumerable().Distinct(comparer))
+        self.__version += 1
+        return self
+
+    def DistinctBy(
+        self,
+        key: Callable[[T1], TKey],
+        comparer: Optional[EqualityComparer[TKey]] = None,
+    ):
+        """Delete elements whose key returned by `key` was already seen.\n
+        @key: Key selector
+        @[optional] comparer: EqualityComparer for unhashable keys\n
+        @returns: self
+        """
+        self.__value = list(self.AsEnumerable().DistinctBy(key, comparer))
+        self.__version += 1
+        return self
+
+    def Union(self, second: Iterable[T1], comparer: Optional[EqualityComparer[T1]] = None):
+        """Distinct elements of this List followed by the new ones of `second`.\n
+        @second: Sequence to add
+        @[optional] comparer: EqualityComparer for unhashable elements\n
+        @returns: self
+        """
+        self.__value = list(self.AsEnumerable().Union(second, comparer))
+        self.__version += 1
+        return self
+
+    def Intersect(self, second: Iterable[T1], comparer: Optional[EqualityComparer[T1]] = None):
+        """Distinct elements of this List that are also contained in `second`.\n
+        @second: Sequence to intersect
+        @[optional] comparer: EqualityComparer for unhashable elements\n
+        @returns: self
+        """
+        self.__value = list(self.AsEnumerable().Intersect(second, comparer))
+        self.__version += 1
+        return self
+
+    def IndexOf(self, value: T1, start: int = 0, end: Optional[int] = None):
+        """Returns the first index that contains value.\n
         @value: search target\n
         @[optional] start index\n
-        @[optional] end index\n
+        @[optional] end index (exclusive)\n
         @returns: Index (If the element isn't contained, returns -1)\n
         [Usage]\n
         `instance.IndexOf(1, 100)` // Except 1 and 100 from TypedList
         """
-        if self.Contains(value) == False:
+        stop = len(self.__value) if end is None else end
+        index = self.__Identity()
+        if index is not None:
+            return index.IndexOf(value, start, stop)
+        try:
+            return self.__value.index(value, start, stop)
+        except ValueError:
             return -1
-        index = -1
-        for i in range(len(self.__value)):
-            if self.__value[i] == value:
-                index = i
-        return index
 
     def IndexOfOn(self, fn: Callable[[T1], bool]):
         """Returns the index that contains value.\n
@@ -217,51 +328,110 @@ class TypedList(Generic[T1]):
         @index: insert index\n
         @value: insert value\n
         """
+        # 挿入された要素は元の長さで正規化した位置から連続して並ぶ
+        length = len(self.__value)
+        start = min(max(index + length if index < 0 else index, 0), length)
         for value in values:
             self.__value.insert(index, value)
-
-    def LastIndexOf(self, value: T1, start: int = 0, end: int = ...):
-        """Returns the Index when counting from the back.
+        self.__version += 1
+        if self.__views:
+            self.__Notify(values, False)
+        for hash_index in self.__Indexes():
+            hash_index._Insert(self.__value[start:start + len(values)], start,
+                               self.__version - 1, self.__version)
+
+    def LastIndexOf(self, value: T1, start: int = 0, end: Optional[int] = None):
+        """Returns the last index that contains value.
         @value: search target
         @[Optional] start: start index
-        @[Optional] end: end index
+        @[Optional] end: end index (exclusive)
+        @returns: Index (If the element isn't contained, returns -1)
         """
-        if self.Contains(value) is False:
-            return -1
-        clone = self.__value.copy()
-        clone.reverse()
-        return clone.index(value, start, end)
+        stop = len(self.__value) if end is None else end
+        index = self.__Identity()
+        if index is not None:
+            return index.LastIndexOf(value, start, stop)
+        values = self.__value
+        for i in reversed(range(*slice(start, stop).indices(len(values)))):
+            if values[i] == value:
+                return i
+        return -1
 
     def Max(self, selector: Callable[[T1], int]):
         """Returns max value of int selector.\n
+        Memoized per `selector` until this List is modified.
         @selector: Selector to set int value
         """
-        li = []
-        for value in self.__value:
-            li.append(selector(value))
-        return max(li)
+        return self.__Memoize(("Max", selector), lambda: max(map(selector, self.__value)))
 
     def Min(self, selector: Callable[[T1], int]):
         """Returns min value of int selector.\n
+        Memoized per `selector` until this List is modified.
         @selector: Selector to set int value
         """
-        li = []
-        for value in self.__value:
-            li.append(selector(value))
-        return min(li)
+        return self.__Memoize(("Min", selector), lambda: min(map(selector, self.__value)))
 
-    def OrderBy(self, selector: Callable[[T1], Union[int, str]]):
-        """Explicitly sort by the int or str returned by `fn`.\n
-        @selector: Selector to order
+    def MaxBy(self, selector: Callable[[T1], Any]):
+        """Returns the (first) element with the largest key returned by `selector`."""
+        return max(self.__value, key=selector)
+
+    def MinBy(self, selector: Callable[[T1], Any]):
+        """Returns the (first) element with the smallest key returned by `selector`."""
+        return min(self.__value, key=selector)
+
+    def TopBy(self, count: int, selector: Callable[[T1], Any]):
+        """Keep only the `count` elements with the largest keys, largest first.\n
+        Same result as `OrderByDescending(selector).Take(count)` (equal keys keep
+        their order) but in O(n log k) with a bounded heap.\n
+        @returns: self
+        """
+        self.__value = Enumrable.TopBy(self.__value, count, selector, True)
+        self.__version += 1
+        return self
+
+    def BottomBy(self, count: int, selector: Callable[[T1], Any]):
+        """Keep only the `count` elements with the smallest keys, smallest first.\n
+        Same result as `OrderBy(selector).Take(count)` but in O(n log k).\n
+        @returns: self
         """
-        self.__value = Enumrable.OrderBy(self.__value, selector)
+        self.__value = Enumrable.TopBy(self.__value, count, selector, False)
+        self.__version += 1
         return self
 
-    def OrderByDescending(self, selector: Callable[[T1], Union[int, str]]):
+    def OrderBy(self, selector: Callable[[T1], typing.Union[int, str]]):
         """Explicitly sort by the int or str returned by `fn`.\n
         @selector: Selector to order
         """
-        self.OrderBy(selector).__value.reverse()
+        return self.__Sort(((selector, False),))
+
+    def OrderByDescending(self, selector: Callable[[T1], typing.Union[int, str]]):
+        """Explicitly sort descending by the int or str returned by `fn`.\n
+        Elements with equal keys keep their order.
+        @selector: Selector to order
+        """
+        return self.__Sort(((selector, True),))
+
+    def ThenBy(self, selector: Callable[[T1], Any]):
+        """Sort the elements with equal keys of the preceding OrderBy by `selector`.\n
+        All keys are sorted again as one composite key in a single stable pass.
+        [Usage]\n
+        `instance.OrderBy(lambda run: run.species).ThenByDescending(lambda run: run.size)`
+        """
+        return self.__ThenBy(selector, False)
+
+    def ThenByDescending(self, selector: Callable[[T1], Any]):
+        """Sort the elements with equal keys of the preceding OrderBy descending by `selector`."""
+        return self.__ThenBy(selector, True)
+
+    def __ThenBy(self, selector: Callable[[T1], Any], descending: bool):
+        if self.__sortkeys is None or self.__sortkeys[0] != self.__version:
+            raise TypeError("ThenBy should follow OrderBy or OrderByDescending")
+        return self.__Sort(self.__sortkeys[1] + ((selector, descending),))
+
+    def __Sort(self, keys: Tuple[Tuple[Callable[[Any], Any], bool], ...]):
+        self.__value = Enumrable.OrderByKeys(self.__value, keys)
+        self.__version += 1
+        self.__sortkeys = (self.__version, keys)
         return self
 
     def Remove(self, value: T1):
@@ -270,37 +440,56 @@ class TypedList(Generic[T1]):
         ** The value of the object is rewritten directly **
         """
 
+        if self.__views or self.__indexes:
+            # 等しいだけの引数ではなく実際に削除した要素を通知する
+            self.RemoveAt(self.__value.index(value))
+            return
         self.__value.remove(value)
+        self.__version += 1
 
     def RemoveOn(self, fn: Callable[[T1], bool]):
         """Delete only the elements that returned True with `fn`
         @fn: decides remove target\n
         ** The value of the object is rewritten directly **
         """
+        removed: List[Tuple[int, T1]] = []
         for i in reversed(range(len(self.__value))):
             if fn(self.__value[i]):
-                self.__value.pop(i)
+                removed.append((i, self.__value.pop(i)))
+        self.__version += 1
+        self.__Unindex(removed)
 
     def RemoveAt(self, index: int):
         """Delete only the elements that have designated index
         @index: index\n
         ** The value of the object is rewritten directly **
         """
-        self.__value.pop(index)
-
-    def RemoveRange(self, start: int = 0, end: int = ...):
+        removed = self.__value.pop(index)
+        self.__version += 1
+        if self.__views:
+            self.__Notify((removed,), True)
+        if self.__indexes:
+            position = index if index >= 0 else index + len(self.__value) + 1
+            self.__Unindex([(position, removed)])
+
+    def RemoveRange(self, start: int = 0, end: Optional[int] = None):
         """Delete only the elements that have designated index range
         @start: start index
-        @end: end index\n
+        @end: end index (inclusive, default: the last element)\n
         ** The value of the object is rewritten directly **
         """
+        last = len(self.__value) - 1 if end is None else end
+        removed: List[Tuple[int, T1]] = []
         for i in reversed(range(len(self.__value))):
-            if start <= i and i <= end:
-                self.__value.pop(i)
+            if start <= i and i <= last:
+                removed.append((i, self.__value.pop(i)))
+        self.__version += 1
+        self.__Unindex(removed)
 
     def Reverse(self):
         """Reverse the elements"""
         self.__value.reverse()
+        self.__version += 1
 
     @property
     def Length(self):
@@ -310,36 +499,199 @@ class TypedList(Generic[T1]):
     @property
     def Values(self):
         """Convert value to list[T1]"""
-        data = list()
-        for val in self.__value:
-            data.append(val)
-        return data
+        return self.__value.copy()
+
+    def Snapshot(self) -> Iterator[T1]:
+        """Returns an iterator over a copy of the current elements.\n
+        Safe to use while another thread adds or removes elements.\n
+        [Usage]\n
+        `for val in instance.Snapshot(): ...`
+        """
+        return iter(self.__value.copy())
 
     @property
     def Unique(self) -> List[T1]:
-        """Get unique value"""
-        return list(set(self.__value))
+        """Get unique value (in order of first appearance)"""
+        return list(self.__Memoize("Unique", lambda: tuple(dict.fromkeys(self.__value))))
+
+    @property
+    def Version(self) -> int:
+        """Number of modifications made to this List (used to validate cached results)."""
+        return self.__version
+
+    def __Memoize(self, key: Any, compute: Callable[[], TResult]) -> TResult:
+        cache = self.__cache
+        entry = cache.get(key)
+        if entry is not None and entry[0] == self.__version:
+            cache.move_to_end(key)
+            cached: TResult = entry[1]
+            return cached
+        version = self.__version
+        value = compute()
+        # 計算中に変更された場合は保存しない
+        if version == self.__version and self.CacheCapacity > 0:
+            cache[key] = (version, value)
+            cache.move_to_end(key)
+            while len(cache) > self.CacheCapacity:
+                cache.popitem(last=False)
+        return value
+
+    def Cached(self, name: str, query: Callable[[TypedList[T1]], TResult]) -> TResult:
+        """Returns the result of `query(self)`, memoized under `name` until this List is modified.\n
+        Selectors are compared by identity, so reuse the same function object
+        (Max/Min/Sum) or name to hit the cache. Changes made inside the elements
+        themselves are not detected.\n
+        [Usage]\n
+        `runs.Cached("human", lambda li: li.AsEnumerable().Where(is_human).Sum(size))`
+        """
+        return self.__Memoize(("Cached", name), lambda: query(self))
+
+    def Materialize(self, query: Callable[[Any], Any]):
+        """Returns an aggregate view that is updated incrementally as this List changes.\n
+        `Add`/`AddRange`/`Insert`/`Remove`/`RemoveAt` update the view in O(1) per element;
+        other modifications make it recompute once when it is read next.
+        @query: `lambda q: q[.Where()][.Select()][.GroupBy()].Count()/Sum()/Average()/Max()/Min()`\n
+        [Usage]\n
+        `sizes = runs.Materialize(lambda q: q.GroupBy(lambda r: r.species).Sum(lambda r: r.size))`\n
+        `sizes["human"]`
+        """
+        from PyLINQ.materialized import MaterializedView
+        view: MaterializedView[Any, Any] = MaterializedView(self, query)
+        if self.__views is None:
+            self.__views = WeakSet()
+        self.__views.add(view)
+        return view
+
+    def Dematerialize(self, view: Any):
+        """Stop updating `view` (returned by `Materialize`)."""
+        if self.__views is not None:
+            self.__views.discard(view)
+        return self
+
+    def __Notify(self, values: Iterable[Any], remove: bool):
+        for view in list(self.__views):  # type: ignore
+            view._Update(values, remove, self.__version - 1, self.__version)
+
+    def CreateIndex(self, keySelector: Optional[Callable[[T1], TKey]] = None) -> HashIndex[T1, TKey]:
+        """Create (or get) a hash index from the key returned by `keySelector` to the positions.\n
+        `Add`/`AddRange`/`Insert`/`Remove`/`RemoveAt`/`RemoveOn`/`RemoveRange`/`Set`
+        update the index in place; after other modifications lookups scan the List
+        until the index is rebuilt. Without `keySelector` the elements themselves
+        are indexed and `Contains`/`IndexOf`/`LastIndexOf`/`CountOf` use it.\n
+        [Usage]\n
+        `species = runs.CreateIndex(lambda run: run.species)`\n
+        `species.Where("human")` // O(k)
+        """
+        if self.__indexes is None:
+            self.__indexes = {}
+        index = self.__indexes.get(keySelector)
+        if index is None:
+            index = self.__indexes[keySelector] = HashIndex(self, keySelector)
+        return index
+
+    def DropIndex(self, keySelector: Optional[Callable[[T1], TKey]] = None):
+        """Delete the index created with `keySelector`."""
+        if self.__indexes is not None:
+            self.__indexes.pop(keySelector, None)
+        return self
+
+    def WhereEquals(self, key: TKey, keySelector: Optional[Callable[[T1], TKey]] = None):
+        """Only the elements whose key equals `key` are extracted.\n
+        Uses the index of `keySelector` when it was created (O(k)), otherwise scans.
+        @returns: self
+        """
+        index = self.__indexes.get(keySelector) if self.__indexes else None
+        if index is not None:
+            self.__value = index.Where(key).__value
+        elif keySelector is None:
+            self.__value = [val for val in self.__value if val == key]
+        else:
+            self.__value = [val for val in self.__value if keySelector(val) == key]
+        self.__version += 1
+        return self
+
+    def __Identity(self) -> Optional[HashIndex[T1, T1]]:
+        if self.__indexes:
+            return self.__indexes.get(None)
+        return None
+
+    def __Indexes(self) -> List[HashIndex[T1, Any]]:
+        return list(self.__indexes.values()) if self.__indexes else []
+
+    def __Index(self, values: Tuple[Any, ...]):
+        start = len(self.__value) - len(values)
+        for index in self.__Indexes():
+            index._Append(values, start, self.__version - 1, self.__version)
+
+    def __Unindex(self, removed: List[Tuple[int, T1]]):
+        # removed は削除した (位置, 要素)。位置は削除前の添字
+        if not removed or not self.__indexes:
+            return
+        removed.sort(key=lambda item: item[0])
+        for index in self.__Indexes():
+            index._Remove(removed, self.__version - 1, self.__version)
+
+    def ClearCache(self):
+        """Discard the memoized results."""
+        self.__cache.clear()
+        return self
 
     # Extended Methods
+    def AsEnumerable(self) -> Enumerable[T1]:
+        """Returns a lazy query over this List.\n
+        Chained operators only build a plan, which runs once at a terminal call.
+        The List is read when the query is executed, not when it is built.\n
+        [Usage]\n
+        `instance.AsEnumerable().Where(lambda x: x > 0).Select(str).ToList()`
+        """
+        return Enumerable.Defer(lambda: self.__value)
+
+    def AsAsyncEnumerable(self):
+        """Returns an AsyncEnumerable over this List (for `async for` pipelines).\n
+        [Usage]\n
+        `await accessions.AsAsyncEnumerable().SelectAwait(fetch, max_concurrency=8).ToListAsync()`
+        """
+        from PyLINQ.asyncenumerable import AsyncEnumerable
+        return AsyncEnumerable(self)
+
+    def AsArray(self, dtype: Any = None):
+        """Returns a NumPy-backed TypedArray with the elements of this List.\n
+        Only int, float and bool elements are supported. (Requires numpy)\n
+        [Usage]\n
+        `instance.AsArray().Where(lambda x: x > 0).Sum()`
+        """
+        from PyLINQ.typedarray import TypedArray
+        return TypedArray(self.__value, dtype)
+
+    def AsParallel(
+        self, executor: str = "process", degree: Optional[int] = None, chunksize: int = 0
+    ) -> ParallelEnumerable[T1]:
+        """Returns a parallel query over this List.\n
+        @[optional] executor: "process" or "thread"
+        @[optional] degree: Number of workers (default: number of CPUs)
+        @[optional] chunksize: Elements per batch
+        [Usage]\n
+        `instance.AsParallel(degree=8).Where(lambda x: x > 0).Sum(lambda x: x * 2)`
+        """
+        return ParallelEnumerable(self, executor, degree, chunksize)
+
     def AllOf(self, fn: Callable[[T1], bool]):
         """Returns True if all `fn` returns True.
         @fn: Function to decide
         """
-        predicate = True
         for val in self.__value:
             if fn(val) is False:
-                predicate = False
-        return predicate
+                return False
+        return True
 
     def AnyOf(self, fn: Callable[[T1], bool]):
         """Returns True if any of `fn` returns True.
         @fn: Function to decide
         """
-        predicate = False
         for val in self.__value:
             if fn(val):
-                predicate = True
-        return predicate
+                return True
+        return False
 
     def Average(self, selector: Callable[[T1], int]):
         """Averages the numbers returned by `selector`.
@@ -372,11 +724,12 @@ class TypedList(Generic[T1]):
     def NotNone(self):
         """Delete the element of `None`.\n"""
         self.__value = [x for x in self.__value if x is not None]
+        self.__version += 1
         return self
 
     def Last(self):
         """Get the last element."""
-        if self.Length > 0:
+        if self.Length == 0:
             return None
         else:
             obj: T1 = self.__value[self.Length - 1]
@@ -384,30 +737,58 @@ class TypedList(Generic[T1]):
 
     def LastOn(self, fn: Callable[[T1], bool]):
         """The last element in the condition that True is returned by `fn`"""
-        if self.Length <= 0:
-            return None
-        result = {}
-        count = 0
-        for val in self.__value:
+        for val in reversed(self.__value):
             if fn(val):
                 ret: T1 = val
-                result[count] = ret
-                count = count + 1
-        if len(result) == 0:
-            return None
+                return ret
+        return None
+
+    def Take(self, count: int):
+        """Keep only the first `count` elements.\n
+        @returns: self
+        """
+        self.__value = self.__value[:max(count, 0)]
+        self.__version += 1
+        return self
+
+    def Skip(self, count: int):
+        """Delete the first `count` elements.\n
+        @returns: self
+        """
+        self.__value = self.__value[max(count, 0):]
+        self.__version += 1
+        return self
 
-        result_conv: T1 = result[len(result) - 1]
-        return result_conv
+    def TakeWhile(self, fn: Callable[[T1], bool]):
+        """Keep the elements until `fn` returns False for the first time.\n
+        @returns: self
+        """
+        self.__value = list(takewhile(fn, self.__value))
+        self.__version += 1
+        return self
+
+    def SkipWhile(self, fn: Callable[[T1], bool]):
+        """Delete the elements until `fn` returns False for the first time.\n
+        @returns: self
+        """
+        self.__value = list(dropwhile(fn, self.__value))
+        self.__version += 1
+        return self
+
+    def Page(self, index: int, size: int) -> TypedList[T1]:
+        """Returns the `index`-th page (0 origin) of `size` elements as a new List.\n
+        Only the elements of the page are read.
+        """
+        start = max(index, 0) * size
+        return TypedList(self.__value[start:start + size])
 
     def Where(self, fn: Callable[[T1], bool]):
         """Only the elements whose `fn` condition returns True are extracted."""
-        self.__value = self.__value.copy()
-        for i in reversed(range(len(self.__value))):
-            if fn(self.__value[i]) is False:
-                del self.__value[i]
+        self.__value = [val for val in self.__value if fn(val) is not False]
+        self.__version += 1
         return self
 
-    def ForEach(self, fn: Callable[[T1], Union[Any, None]]):
+    def ForEach(self, fn: Callable[[T1], Optional[Any]]):
         """Extract the element.
         @fn: p0> Iterated object
         """
@@ -419,7 +800,7 @@ class TypedList(Generic[T1]):
     def ForEachIf(
         self,
         onNotNone: Callable[[T1], Optional[Any]],
-        onNone: Callable[[], Optional[Any]] = None,
+        onNone: Optional[Callable[[], Optional[Any]]] = None,
     ):
         """Branches depending on whether the element is None or not, and extracts the element."""
         for val in self.__value:
@@ -431,52 +812,189 @@ class TypedList(Generic[T1]):
 
     def Sum(self, fn: Callable[[T1], int]):
         """Sum the ints returned by `fn`.
+        Memoized per `fn` until this List is modified.
         @fn: Anonymous function that specifies a int
         """
-        sum = 0
-        for val in self.__value:
-            sum += fn(val)
-        return sum
+        return self.__Memoize(("Sum", fn), lambda: sum(map(fn, self.__value), 0))
 
-    def Join(self, fn: Callable[[T1], str], combiner: str = ""):
+    def StringJoin(self, fn: Callable[[T1], str], combiner: str = ""):
         """Combine str.
         @fn: Anonymous function that specifies a string
         @[optional] combiner: A string between elements
         """
-        joined: str = ""
-        for i in range(self.Length):
-            joined += fn(self.__value[i])
-            if i != self.Length - 1:
-                joined += combiner
-        return joined
+        return combiner.join(map(fn, self.__value))
+
+    def Join(
+        self,
+        inner: Iterable[TElement],
+        outerKey: Callable[[T1], TKey],
+        innerKey: Callable[[TElement], TKey],
+        resultSelector: Callable[[T1, TElement], TResult],
+    ) -> "TypedList[TResult]":
+        """Correlate the elements of this List and `inner` by equal keys.\n
+        Uses a sort-merge join when both sides are already sorted by keys of
+        one type, otherwise a hash join built on the smaller side.
+        Results keep the order of this List, then the order of `inner`.
+        @inner: Sequence to join
+        @outerKey: Key selector of this List
+        @innerKey: Key selector of `inner`
+        @resultSelector: Function that builds a result from a matching pair\n
+        [Usage]\n
+        `gsms.Join(srrs, lambda gsm: gsm.id, lambda srr: srr.gsm_id, lambda gsm, srr: (gsm, srr))`
+        """
+        return TypedList(
+            Enumrable.Join(self.__value, inner, outerKey, innerKey, resultSelector))
+
+    def GroupJoin(
+        self,
+        inner: Iterable[TElement],
+        outerKey: Callable[[T1], TKey],
+        innerKey: Callable[[TElement], TKey],
+        resultSelector: Callable[[T1, "TypedList[TElement]"], TResult],
+    ) -> "TypedList[TResult]":
+        """Correlate each element with the List of matching `inner` elements.
+        @inner: Sequence to join
+        @outerKey: Key selector of this List
+        @innerKey: Key selector of `inner`
+        @resultSelector: Function that builds a result from an element and its matches
+        """
+        return TypedList(
+            Enumrable.GroupJoin(self.__value, inner, outerKey, innerKey, resultSelector))
 
     def Select(self, selector: Callable[[T1], TResult]):
         """Specify a variable with fn from the element and return a new List.
         @selector: Anonymous function to get
         """
-        li: TypedList[TResult] = TypedList()
-        for val in self.__value:
-            li.Add(selector(val))
+        li: TypedList[TResult] = TypedList(map(selector, self.__value))
         return li
 
     def Set(self, fn: Callable[[T1, int], T1]):
         """Set object value and return
         @fn: p0>Iterated object, p1>index
         """
+        if not self.__indexes:
+            for i in range(len(self.__value)):
+                self.__value[i] = fn(self.__value[i], i)
+            self.__version += 1
+            return self
+        changes: List[Tuple[int, T1, T1]] = []
         for i in range(len(self.__value)):
-            self.__value[i] = fn(self.__value[i], i)
+            old = self.__value[i]
+            self.__value[i] = fn(old, i)
+            changes.append((i, old, self.__value[i]))
+        self.__version += 1
+        for hash_index in self.__Indexes():
+            hash_index._Replace(changes, self.__version - 1, self.__version)
+        return self
+
+    def GroupBy(
+        self,
+        key: Callable[[T1], TKey],
+        element: Optional[Callable[[T1], TElement]] = None,
+        result: Optional[Callable[[TKey, "TypedList[TElement]"], TResult]] = None,
+    ):
+        """Group the elements by the key returned by `key` in a single hash pass.
+        @key: Key selector
+        @[optional] element: Element selector applied to each grouped element
+        @[optional] result: Function that builds one result from a key and its group
+        @returns: GroupedEnumerable (O(1) key access and per-key aggregates),
+        or a new List of results when `result` is given\n
+        [Usage]\n
+        `instance.GroupBy(lambda run: run.species).Sum(lambda run: run.size)["human"]`
+        """
+        if result is None:
+            return GroupedEnumerable(self, key, element)
+        return self.AsEnumerable().GroupBy(key, element, result).ToList()
+
+    def ToLookup(
+        self,
+        key: Callable[[T1], TKey],
+        element: Optional[Callable[[T1], TElement]] = None,
+    ) -> "Lookup[TKey, TElement]":
+        """Group the elements into a Lookup with O(1) key access.
+        @key: Key selector
+        @[optional] element: Element selector
+        """
+        return self.AsEnumerable().ToLookup(key, element)
+
+    def ToDictionary(
+        self,
+        key: Callable[[T1], TKey],
+        element: Optional[Callable[[T1], TElement]] = None,
+    ) -> "DictionaryC[TKey, TElement]":
+        """Collect the elements into a DictionaryC.
+        @key: Key selector
+        @[optional] element: Value selector
+        A None key is kept like any other key.
+        @exception: If two elements have the same key, KeyError will be raised.
+        """
+        return self.AsEnumerable().ToDictionary(key, element)
+
+    def Chunk(self, size: int) -> TypedList[List[T1]]:
+        """Split into lists of `size` elements (the last one may be shorter).\n
+        @size: Elements per chunk
+        """
+        return TypedList(Enumrable.Chunk(self.__value, size))
+
+    def SelectBatch(
+        self,
+        fn: Callable[[Any], Iterable[TResult]],
+        size: int = 4096,
+        as_array: bool = False,
+    ) -> TypedList[TResult]:
+        """Project the elements `size` at a time with one call of `fn` per batch.\n
+        `fn` receives a list (or a NumPy array when `as_array`) and returns one result per element.
+        @fn: Batch selector
+        @[optional] size: Elements per batch
+        @[optional] as_array: Pass batches as NumPy arrays (requires numpy)\n
+        [Usage]\n
+        `instance.SelectBatch(lambda xs: xs * 2, as_array=True)`
+        """
+        return self.AsEnumerable().SelectBatch(fn, size, as_array).ToList()
+
+    def ForEachBatch(self, fn: Callable[[Any], Any], size: int = 4096, as_array: bool = False):
+        """Pass the elements to `fn` `size` at a time (e.g. bulk database writes).
+        @fn: Receives a list (or a NumPy array when `as_array`)
+        @[optional] size: Elements per batch
+        @[optional] as_array: Pass batches as NumPy arrays (requires numpy)
+        """
+        self.AsEnumerable().ForEachBatch(fn, size, as_array)
         return self
 
     # Serialize Util
 
     def ToJson(
-        self, selector: Callable[[T1], Union[bool, int, float, complex, str, bytes]]
+        self, selector: Callable[[T1], typing.Union[bool, int, float, complex, str, bytes]]
     ):
         li = list()
         for val in self.__value:
             li.append(selector(val))
         return json.dumps(li)
 
+    def ToArrow(self, type: Any = None):
+        """Convert to a pyarrow Array. (Requires pyarrow)
+        @[optional] type: pyarrow DataType (default: inferred)
+        """
+        import pyarrow as pa
+        return pa.array(self.__value, type=type)
+
+    def ToPolars(self, name: str = ""):
+        """Convert to a polars Series. (Requires polars)
+        @[optional] name: Series name
+        """
+        import polars as pl
+        return pl.Series(name, self.__value)
+
+    def ToJsonLines(
+        self, path: str, selector: Optional[Callable[[T1], Any]] = None, size: int = 4096
+    ):
+        """Write one JSON document per element to `path`, `size` elements at a time.
+        @path: File path
+        @[optional] selector: Converts an element to a JSON serializable value
+        """
+        self.AsEnumerable().ToJsonLines(path, selector, size)
+        return self
+
 
 class KeyValuePair(Generic[T1, T2]):
     __key: T1
@@ -499,16 +1017,233 @@ class KeyValuePair(Generic[T1, T2]):
     def Value(self):
         return self.__value
 
+    @Value.setter
+    def Value(self, value: T2):
+        self.__value = value
+        return
+
     @property
     def ValueNotNone(self):
         if self.__value is None:
             raise NotImplementedError("value is None")
         return self.__value
 
-    @Value.setter
-    def Value(self, value: T2):
-        self.__value = value
-        return
+
+class Grouping(TypedList[T2], Generic[T1, T2]):
+    """## List of the elements that share a key like C# IGrouping"""
+
+    def __init__(self, key: T1, other: Iterable[T2] = ()) -> None:
+        super().__init__(other)
+        self.__key = key
+
+    @property
+    def Key(self) -> T1:
+        return self.__key
+
+
+class Lookup(Generic[T1, T2]):
+    """## Read-only map from a key to its elements like C# ILookup
+    #### Usage:
+    `lookup = li.ToLookup(lambda run: run.species)` \n
+    `lookup["human"]` Elements of the key (empty when the key is missing) \n
+    """
+
+    def __init__(self, groups: Dict[T1, List[T2]] = {}) -> None:
+        """Create a Lookup from a dict of key -> elements."""
+        self.__groups: Dict[T1, Grouping[T1, T2]] = {
+            key: Grouping(key, elements) for key, elements in groups.items()
+        }
+
+    def __getitem__(self, key: T1) -> Grouping[T1, T2]:
+        group = self.__groups.get(key)
+        if group is None:
+            return Grouping(key)
+        return group
+
+    def __iter__(self) -> Iterator[Grouping[T1, T2]]:
+        return iter(self.__groups.values())
+
+    def ContainsKey(self, key: T1):
+        """Returns where `key` is contained on the Lookup"""
+        return key in self.__groups
+
+    @property
+    def Length(self):
+        """The number of keys"""
+        return len(self.__groups)
+
+    @property
+    def Keys(self):
+        """Get keys"""
+        return TypedList(self.__groups.keys())
+
+    def AsEnumerable(self) -> Enumerable[Grouping[T1, T2]]:
+        """Returns a lazy query over the groups of this Lookup."""
+        return Enumerable.Defer(lambda: self.__groups.values())
+
+
+class HashIndex(Generic[T1, TKey]):
+    """## Hash index from a key to the positions of the elements of a TypedList
+    Created by `TypedList.CreateIndex`. Lookups are O(1) and `Where` is O(k).
+    `Add`/`AddRange`/`Insert`/`Remove`/`RemoveAt`/`RemoveOn`/`RemoveRange`/`Set`
+    update the index in place. After any other modification (sorting, filtering...)
+    lookups scan the List, and the index is rebuilt when the List is looked up
+    twice without changing in between.\n
+    Usage:
+    `index = runs.CreateIndex(lambda run: run.species)` \n
+    `index.CountOf("human")` \n
+    """
+
+    def __init__(self, source: TypedList[T1], key: Optional[Callable[[T1], TKey]] = None) -> None:
+        self.__source = source
+        self.__key = key
+        self.__positions: Dict[Any, List[int]] = {}
+        # 同期済みの source.Version (-1 は未構築)
+        self.__version = -1
+        # 同期していない状態で走査した source.Version
+        self.__scanned = -1
+
+    def __KeyOf(self, value: T1) -> Any:
+        return value if self.__key is None else self.__key(value)
+
+    def __Add(self, key: Any, position: int) -> None:
+        found = self.__positions.get(key)
+        if found is None:
+            self.__positions[key] = [position]
+        elif found[-1] < position:
+            found.append(position)
+        else:
+            found.insert(bisect_left(found, position), position)
+
+    def __Discard(self, key: Any, position: int) -> None:
+        found = self.__positions[key]
+        del found[bisect_left(found, position)]
+        if len(found) == 0:
+            del self.__positions[key]
+
+    def __Shift(self, start: int, delta: int) -> None:
+        # start 以降の位置をすべて delta だけずらす
+        for found in self.__positions.values():
+            last = found[-1]
+            if last < start:
+                continue
+            if len(found) == 1:
+                found[0] = last + delta
+                continue
+            for j in range(bisect_left(found, start), len(found)):
+                found[j] += delta
+
+    def _Append(self, values: Iterable[T1], start: int, before: int, after: int) -> None:
+        if self.__version != before:
+            return
+        for i, value in enumerate(values, start):
+            self.__Add(self.__KeyOf(value), i)
+        self.__version = after
+
+    def _Insert(self, values: List[T1], start: int, before: int, after: int) -> None:
+        """`values` were inserted at [`start`, `start + len(values)`)."""
+        if self.__version != before:
+            return
+        count = len(values)
+        if count and start < self.__source.Length - count:
+            # 挿入位置以降の要素を後ろへずらす
+            self.__Shift(start, count)
+        for i, value in enumerate(values, start):
+            self.__Add(self.__KeyOf(value), i)
+        self.__version = after
+
+    def _Remove(self, removed: List[Tuple[int, T1]], before: int, after: int) -> None:
+        """`removed` are the (position, element) pairs that were deleted, in ascending order."""
+        if self.__version != before:
+            return
+        for i, value in removed:
+            self.__Discard(self.__KeyOf(value), i)
+        first = removed[0][0]
+        if first < self.__source.Length:
+            # 末尾以外の削除は、後ろの位置を削除した数だけ前へ詰める
+            if len(removed) == 1:
+                self.__Shift(first, -1)
+            else:
+                points = [i for i, _ in removed]
+                for found in self.__positions.values():
+                    for j in range(bisect_left(found, first), len(found)):
+                        found[j] -= bisect_left(points, found[j])
+        self.__version = after
+
+    def _Replace(self, changes: List[Tuple[int, T1, T1]], before: int, after: int) -> None:
+        """`changes` are the (position, old, new) elements that were overwritten."""
+        if self.__version != before:
+            return
+        for i, old, new in changes:
+            old_key = self.__KeyOf(old)
+            new_key = self.__KeyOf(new)
+            if old_key is not new_key and old_key != new_key:
+                self.__Discard(old_key, i)
+                self.__Add(new_key, i)
+        self.__version = after
+
+    def Rebuild(self) -> HashIndex[T1, TKey]:
+        """Rebuild the index from the whole List."""
+        self.__positions = {}
+        self.__version = -1
+        self._Append(self.__source, 0, -1, self.__source.Version)
+        return self
+
+    def __Positions(self, key: TKey) -> List[int]:
+        version = self.__source.Version
+        if self.__version != version:
+            if self.__version != -1 and self.__scanned != version:
+                # 変更の直後は 1 回の走査で答え、続けて参照されたら作り直す
+                self.__scanned = version
+                return [i for i, value in enumerate(self.__source) if self.__KeyOf(value) == key]
+            self.Rebuild()
+        return self.__positions.get(key, [])
+
+    def Positions(self, key: TKey) -> List[int]:
+        """Returns the indexes of the elements of `key` in ascending order."""
+        return list(self.__Positions(key))
+
+    def Contains(self, key: TKey):
+        """Returns where an element of `key` is contained (O(1))"""
+        return len(self.__Positions(key)) > 0
+
+    def CountOf(self, key: TKey):
+        """Returns the number of elements of `key` (O(1))"""
+        return len(self.__Positions(key))
+
+    def IndexOf(self, key: TKey, start: int = 0, end: Optional[int] = None):
+        """Returns the first index of `key` in [`start`, `end`) (-1 when not contained).\n
+        Negative `start`/`end` count from the end like slices.
+        """
+        positions = self.__Positions(key)
+        start, stop, _ = slice(start, end).indices(self.__source.Length)
+        i = bisect_left(positions, start)
+        if i < len(positions) and positions[i] < stop:
+            return positions[i]
+        return -1
+
+    def LastIndexOf(self, key: TKey, start: int = 0, end: Optional[int] = None):
+        """Returns the last index of `key` in [`start`, `end`) (-1 when not contained).\n
+        Negative `start`/`end` count from the end like slices.
+        """
+        positions = self.__Positions(key)
+        start, stop, _ = slice(start, end).indices(self.__source.Length)
+        i = bisect_left(positions, stop)
+        if i > 0 and positions[i - 1] >= start:
+            return positions[i - 1]
+        return -1
+
+    def Where(self, key: TKey) -> TypedList[T1]:
+        """Returns the elements of `key` as a new List (O(k))."""
+        source = self.__source
+        return TypedList([source[i] for i in self.__Positions(key)])
+
+    @property
+    def Keys(self) -> TypedList[TKey]:
+        """Get the indexed keys"""
+        if self.__version != self.__source.Version:
+            self.Rebuild()
+        return TypedList(self.__positions.keys())
 
 
 class DictionaryC(Generic[T1, T2]):
@@ -518,22 +1253,31 @@ class DictionaryC(Generic[T1, T2]):
     `li.Add(obj)` Example: Add element \n
     """
 
-    __kp: TypedList[KeyValuePair[T1, T2]] = TypedList[KeyValuePair[T1, T2]]([])
-    __keys: TypedList[T1] = TypedList([])
-    __values: TypedList[T2] = TypedList([])
-
     A = TypeVar("A")
 
     def __init__(self) -> None:
         """Create a given type Dictionary."""
+        # 挿入順を保持するハッシュテーブル (key -> KeyValuePair)
+        self.__table: Dict[T1, KeyValuePair[T1, T2]] = {}
+        # (PairList を作った時点の list.Version, PairList)
+        self.__pairs: Optional[Tuple[int, TypedList[KeyValuePair[T1, T2]]]] = None
 
     def __getitem__(self, key: T1):
-        if self.__keys.Length == 0:
-            return None
-        index = self.__keys.IndexOf(key)
-        if index == -1:
+        kp = self.__table.get(key)
+        if kp is None:
             return None
-        return self.__values[index]
+        return kp.Value
+
+    @staticmethod
+    def _FromDict(table: Dict[T1, T2]) -> DictionaryC[T1, T2]:
+        # Add と違い None のキーも落とさない (GroupBy の None グループ等)
+        dictionary = DictionaryC[T1, T2]()
+        dictionary.__table = {k: KeyValuePair(k, v) for k, v in table.items()}
+        return dictionary
+
+    def __Rebuild(self, pairs: Iterable[Tuple[T1, KeyValuePair[T1, T2]]]):
+        self.__table = dict(pairs)
+        self.__pairs = None
 
     def Add(self, key: T1, value: T2):
         """Add value to self object  \n
@@ -543,11 +1287,10 @@ class DictionaryC(Generic[T1, T2]):
         """
         if key is None:
             return self
-        if self.ContainsKey(key):
+        if key in self.__table:
             return self
-        self.__keys.Add(key)
-        self.__values.Add(value)
-        self.__kp.Add(KeyValuePair(key, value))
+        self.__table[key] = KeyValuePair(key, value)
+        self.__pairs = None
         return self
 
     def AddKP(self, kp: KeyValuePair[T1, T2]):
@@ -555,11 +1298,10 @@ class DictionaryC(Generic[T1, T2]):
             return self
         if kp.Key is None:
             return self
-        if self.ContainsKey(kp.Key):
+        if kp.Key in self.__table:
             return self
-        self.__keys.Add(kp.Key)
-        self.__values.Add(kp.Value)
-        self.__kp.Add(kp)
+        self.__table[kp.Key] = kp
+        self.__pairs = None
 
     def AddOn(self, selector: Callable[[], KeyValuePair[T1, T2]]):
         result = selector()
@@ -580,40 +1322,53 @@ class DictionaryC(Generic[T1, T2]):
 
     @property
     def PairList(self) -> TypedList[KeyValuePair[T1, T2]]:
-        """Convert to a list of KeyValuePair."""
-        return self.__kp
+        """Convert to a list of KeyValuePair.\n
+        The list shares the KeyValuePair objects of the Dictionary and is reused until
+        the Dictionary or the list itself is modified (e.g. by `PairList.Where`).
+        """
+        if self.__pairs is not None and self.__pairs[1].Version == self.__pairs[0]:
+            return self.__pairs[1]
+        pairs = TypedList(self.__table.values())
+        self.__pairs = (pairs.Version, pairs)
+        return pairs
 
     def Clear(self):
         """Clear all values from the Dictionary \n
         ** The value of the object is rewritten directly **
         """
-        self.__keys.Clear()
-        self.__values.Clear()
-        self.__kp.Clear()
+        self.__table = {}
+        self.__pairs = None
 
     def ContainsKey(self, key: T1):
         """Returns where `key` is contained on the Dictionary
         @returns: Contains?
         """
-        return self.__keys.Contains(key)
+        return key in self.__table
 
     def ContainsValue(self, value: T2):
         """Returns where `value` is contained on the Dictionary
         @returns: Contains?
         """
-        return self.__values.Contains(value)
+        for kp in self.__table.values():
+            if kp.Value == value:
+                return True
+        return False
 
     def CountKeyOf(self, key: T1):
         """Returns the number of `key` contained in the Dictionary
         @returns: Count
         """
-        return self.__keys.CountOf(key)
+        return 1 if key in self.__table else 0
 
     def CountValueOf(self, value: T2):
         """Returns the number of `value` contained in the Dictionary
         @returns: Count
         """
-        return self.__values.CountOf(value)
+        counter = 0
+        for kp in self.__table.values():
+            if kp.Value == value:
+                counter += 1
+        return counter
 
     def CountOfOn(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
         """Counts and returns the number of `True` returned in the anonymous function `fn`.
@@ -622,37 +1377,45 @@ class DictionaryC(Generic[T1, T2]):
         `lambda T1Obj: (func: bool)`
         @returns: Count
         """
-        return self.PairList.CountOfOn(fn)
+        counter = 0
+        for kp in self.__table.values():
+            if fn(kp):
+                counter += 1
+        return counter
 
     def Copy(self):
         """Copy this object."""
         newobj = DictionaryC[T1, T2]()
-        newobj.__keys = self.__keys.Copy()
-        newobj.__values = self.__values.Copy()
-        newobj.__kp = self.__kp.Copy()
+        newobj.__table = {k: KeyValuePair(k, kp.Value) for k, kp in self.__table.items()}
         return newobj
 
     def KeyIndexOf(self, key: T1, start: int = 0, end: int = 0):
         """Returns the index that contains given key.
         @key: search target
         @[optional] start index
-        @[optional] end index
+        @[optional] end index (0 searches to the end)
         @returns: Index (If the element isn't contained, returns -1)
         """
-        if self.ContainsKey(key) is False:
+        if key not in self.__table:
             return -1
-        return self.__keys.IndexOf(key, start, end)
+        stop = end if end > 0 else None
+        for i, k in enumerate(islice(self.__table, start, stop), start):
+            if k == key:
+                return i
+        return -1
 
     def ValueIndexOf(self, value: T2, start: int = 0, end: int = 0):
         """Returns the index that contains given value.
         @value: search target
         @[optional] start index
-        @[optional] end index
+        @[optional] end index (0 searches to the end)
         @returns: Index (If the element isn't contained, returns -1)
         """
-        if self.ContainsValue(value) is False:
-            return -1
-        return self.__values.IndexOf(value, start, end)
+        stop = end if end > 0 else None
+        for i, kp in enumerate(islice(self.__table.values(), start, stop), start):
+            if kp.Value == value:
+                return i
+        return -1
 
     def IndexOfOn(self, fn: Callable[[KeyValuePair], bool]):
         """Returns the index that contains value.
@@ -661,7 +1424,7 @@ class DictionaryC(Generic[T1, T2]):
         """
         counter = 0
         index = -1
-        for kp in self.__kp:
+        for kp in self.__table.values():
             if kp.Value is not None:
                 if fn(kp):
                     index = counter
@@ -673,97 +1436,114 @@ class DictionaryC(Generic[T1, T2]):
         @index: insert index
         @value: insert value
         """
-        self.__keys.Insert(index, key)
-        self.__values.Insert(index, value)
-        self.__kp.Insert(index, KeyValuePair(key, value))
+        if key is None or key in self.__table:
+            return
+        items = list(self.__table.items())
+        items.insert(index, (key, KeyValuePair(key, value)))
+        self.__Rebuild(items)
 
     def Remove(self, key: T1):
         """Remove the element that matches `value`.
         @value: remove target
         """
-        index = self.__keys.IndexOf(key)
-        if index == -1:
-            return
-        self.__keys.RemoveAt(index)
-        self.__values.RemoveAt(index)
-        self.__kp.RemoveAt(index)
+        if self.__table.pop(key, None) is not None:
+            self.__pairs = None
 
     def RemoveOn(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
         """Delete only the elements that returned True with `fn`
         @fn: decides remove target\n
         """
-        for val in self.PairList:
-            if fn(val):
-                self.Remove(val.Key)
+        self.__Rebuild(
+            (key, kp) for key, kp in self.__table.items() if not fn(kp))
 
     def RemoveAt(self, index: int):
         """Delete only the elements that have designated index\n
         @index: index
         """
         if 0 <= index < self.Length:
-            self.__keys.RemoveAt(index)
-            self.__values.RemoveAt(index)
-            self.__kp.RemoveAt(index)
+            del self.__table[next(islice(self.__table, index, None))]
+            self.__pairs = None
 
     def RemoveRange(self, start: int, end: int):
         """Delete only the elements that have designated index range
         @start: start index
         @end: end index
         """
-        for i in reversed(range(self.__keys.Length)):
-            if start <= i and i <= end:
-                self.__keys.RemoveAt(i)
-                self.__values.RemoveAt(i)
-                self.__kp.RemoveAt(i)
+        self.__Rebuild(
+            item
+            for i, item in enumerate(self.__table.items())
+            if not (start <= i and i <= end)
+        )
 
     def Reverse(self):
         """Reverse the elements\n
         ** The value of the object is rewritten directly **
         """
-        self.__keys.Reverse()
-        self.__values.Reverse()
-        self.__kp.Reverse()
+        self.__Rebuild(reversed(self.__table.items()))
 
     @property
     def Length(self):
         """The length of List"""
-        return self.__keys.Length
+        return len(self.__table)
 
     @property
     def Keys(self):
         """Get keys"""
-        return self.__keys
+        return TypedList(self.__table.keys())
 
     @property
     def Values(self):
         """Get values"""
-        return self.__values
+        return TypedList([kp.Value for kp in self.__table.values()])
 
     @property
     def KeyValuePairs(self):
         """Get key value pairs"""
-        return self.__kp
+        return self.PairList
+
+    def ToPolarsFrame(self, key: str = "Key", value: str = "Value"):
+        """Convert to a polars DataFrame with a key column and a value column. (Requires polars)
+        @[optional] key: Name of the key column
+        @[optional] value: Name of the value column
+        """
+        import polars as pl
+        return pl.DataFrame({
+            key: list(self.__table.keys()),
+            value: [kp.Value for kp in self.__table.values()],
+        })
 
     # Extended Methods
+    def AsEnumerable(self) -> Enumerable[KeyValuePair[T1, T2]]:
+        """Returns a lazy query over the KeyValuePairs of this Dictionary."""
+        return Enumerable.Defer(lambda: self.__table.values())
+
+    def AsParallel(
+        self, executor: str = "process", degree: Optional[int] = None, chunksize: int = 0
+    ) -> ParallelEnumerable[KeyValuePair[T1, T2]]:
+        """Returns a parallel query over the KeyValuePairs of this Dictionary.\n
+        @[optional] executor: "process" or "thread"
+        @[optional] degree: Number of workers (default: number of CPUs)
+        @[optional] chunksize: Elements per batch
+        """
+        return ParallelEnumerable(list(self.__table.values()), executor, degree, chunksize)
+
     def AllOf(self, fn: Callable[[KeyValuePair], bool]):
         """Returns True if all `fn` returns True.
         @fn: Function to decide
         """
-        predicate = True
-        for val in self.PairList:
+        for val in self.__table.values():
             if fn(val) is False:
-                predicate = False
-        return predicate
+                return False
+        return True
 
     def AnyOf(self, fn: Callable[[KeyValuePair], bool]):
         """Returns True if any of `fn` returns True.
         @fn: Function to decide
         """
-        predicate = False
-        for val in self.PairList:
+        for val in self.__table.values():
             if fn(val):
-                predicate = True
-        return predicate
+                return True
+        return False
 
     def Average(self, fn: Callable[[KeyValuePair], int]):
         """Averages the numbers returned by fn.
@@ -773,63 +1553,57 @@ class DictionaryC(Generic[T1, T2]):
         if self.Length == 0:
             raise ZeroDivisionError
         sum = 0
-        for val in self.PairList:
+        for val in self.__table.values():
             sum += fn(val)
         return sum / self.Length
 
     def First(self):
         """Returns the first element."""
-        if self.Length == 0:
-            return None
-        return self.PairList.First()
+        return next(iter(self.__table.values()), None)
 
     def FirstOn(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
         """Returns the first element of which the return value of fn is True."""
-        for val in self.PairList:
+        for val in self.__table.values():
             if fn(val):
                 return val
         return None
 
     def NotNone(self):
         """Delete the element of `None`."""
-        for i in reversed(range(self.__keys.Length)):
-            if self.__values[i] is None:
-                self.RemoveAt(i)
+        self.__Rebuild(
+            (key, kp) for key, kp in self.__table.items() if kp.Value is not None)
         return self
 
     def Last(self):
         """Get the last element."""
-        if self.Length == 0:
-            return None
-        return self.PairList[self.Length - 1]
+        return next(reversed(self.__table.values()), None)
 
     def LastOn(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
         """The last element in the condition that True is returned by `fn`"""
-        return self.Copy().Where(lambda el: fn(el)).Last()
+        for val in reversed(self.__table.values()):
+            if fn(val):
+                return val
+        return None
 
     def Where(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
         """Only the elements whose `fn` condition returns True are extracted."""
-        li = self.PairList
-        for i in reversed(range(self.Length)):
-            kp = li[i]
-            if kp is not None:
-                if fn(kp) is False:
-                    self.RemoveAt(i)
+        self.__Rebuild(
+            (key, kp) for key, kp in self.__table.items() if fn(kp) is not False)
         return self
 
     def ForEach(self, fn: Callable[[KeyValuePair[T1, T2]], Union[None, Any]]):
         """Extract the element."""
-        for val in self.PairList:
+        for val in self.__table.values():
             fn(val)
         return self
 
     def ForEachIf(
         self,
         onNotNone: Callable[[KeyValuePair[T1, T2]], Union[None, Any]],
-        onNone: Callable[[], Union[None, Any]] = None,
+        onNone: Optional[Callable[[], Union[None, Any]]] = None,
     ):
         """Branches depending on whether the element is None or not, and extracts the element."""
-        for val in self.PairList:
+        for val in self.__table.values():
             if (val is None) and (onNone is not None):
                 onNone()
             else:
@@ -841,28 +1615,19 @@ class DictionaryC(Generic[T1, T2]):
         @fn: Anonymous function that specifies a int
         """
         sum = 0
-        for val in self.PairList:
+        for val in self.__table.values():
             sum += fn(val)
         return sum
 
-    def Join(self, fn: Callable[[KeyValuePair[T1, T2]], str], combiner: str = ""):
+    def StringJoin(self, fn: Callable[[KeyValuePair[T1, T2]], str], combiner: str = ""):
         """Combine str.
         @fn: Anonymous function that specifies a string
         @[optional] combiner: A string between elements
         """
-        joined: str = ""
-        counter = 0
-        for val in self.PairList:
-            joined += fn(val)
-            if counter < self.Length:
-                joined += combiner
-        return joined
+        return combiner.join(map(fn, self.__table.values()))
 
     def Select(self, fn: Callable[[KeyValuePair[T1, T2]], TResult]):
         """Specify a variable with fn from the element and return a new List.
         @fn: Anonymous function to get
         """
-        li: TypedList[TResult] = TypedList()
-        for val in self.__kp:
-            li.Add(fn(val))
-        return li
+        return TypedList([fn(val) for val in self.__table.values()])
@@ -0,0 +1,287 @@
+from heapq import heappop, heappush
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Generic, Iterable,
+                    List, Optional, Tuple, TypeVar)
+
+if TYPE_CHECKING:
+    from PyLINQ.generics import TypedList
+
+TKey = TypeVar("TKey")
+TResult = TypeVar("TResult")
+
+# GroupBy を使わないビューの唯一のグループ
+_ALL = object()
+
+
+class _Count:
+    __slots__ = ("count",)
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def Add(self, value: Any) -> None:
+        self.count += 1
+
+    def Remove(self, value: Any) -> None:
+        self.count -= 1
+
+    def Result(self) -> Any:
+        return self.count
+
+
+class _Sum(_Count):
+    __slots__ = ("total",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.total = 0
+
+    def Add(self, value: Any) -> None:
+        self.count += 1
+        self.total += value
+
+    def Remove(self, value: Any) -> None:
+        self.count -= 1
+        self.total -= value
+
+    def Result(self) -> Any:
+        return self.total
+
+
+class _Average(_Sum):
+    __slots__ = ()
+
+    def Result(self) -> Any:
+        if self.count == 0:
+            raise ZeroDivisionError
+        return self.total / self.count
+
+
+class _Descending:
+    """Reverses the order of `value` so that heapq pops the max first."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return bool(other.value < self.value)
+
+
+class _Min(_Count):
+    """Heap with lazy deletion: removed values are dropped when they reach the top."""
+    __slots__ = ("heap", "removed")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.heap: List[Any] = []
+        self.removed: Dict[Any, int] = {}
+
+    def _Wrap(self, value: Any) -> Any:
+        return value
+
+    def _Unwrap(self, item: Any) -> Any:
+        return item
+
+    def Add(self, value: Any) -> None:
+        self.count += 1
+        pending = self.removed.get(value)
+        if pending:
+            # 削除待ちの同値を復活させる (ヒープは伸ばさない)
+            if pending == 1:
+                del self.removed[value]
+            else:
+                self.removed[value] = pending - 1
+            return
+        heappush(self.heap, self._Wrap(value))
+
+    def Remove(self, value: Any) -> None:
+        self.count -= 1
+        self.removed[value] = self.removed.get(value, 0) + 1
+
+    def Result(self) -> Any:
+        heap = self.heap
+        removed = self.removed
+        while heap:
+            top = self._Unwrap(heap[0])
+            pending = removed.get(top)
+            if not pending:
+                return top
+            heappop(heap)
+            if pending == 1:
+                del removed[top]
+            else:
+                removed[top] = pending - 1
+        raise ValueError("the view is empty")
+
+
+class _Max(_Min):
+    __slots__ = ()
+
+    def _Wrap(self, value: Any) -> Any:
+        return _Descending(value)
+
+    def _Unwrap(self, item: Any) -> Any:
+        return item.value
+
+
+_AGGREGATES: Dict[str, Callable[[], _Count]] = {
+    "count": _Count,
+    "sum": _Sum,
+    "average": _Average,
+    "max": _Max,
+    "min": _Min,
+}
+
+_Spec = Tuple[Tuple[Tuple[str, Callable[[Any], Any]], ...], Optional[Callable[[Any], Any]], str,
+              Optional[Callable[[Any], Any]]]
+
+
+class _ViewBuilder:
+    """Records the query passed to `TypedList.Materialize`."""
+
+    def __init__(self, stages: Tuple[Tuple[str, Callable[[Any], Any]], ...] = (),
+                 key: Optional[Callable[[Any], Any]] = None) -> None:
+        self.__stages = stages
+        self.__key = key
+
+    def Where(self, fn: Callable[[Any], bool]) -> "_ViewBuilder":
+        if self.__key is not None:
+            raise TypeError("Where after GroupBy cannot be materialized")
+        return _ViewBuilder(self.__stages + (("where", fn),))
+
+    def Select(self, selector: Callable[[Any], Any]) -> "_ViewBuilder":
+        if self.__key is not None:
+            raise TypeError("Select after GroupBy cannot be materialized")
+        return _ViewBuilder(self.__stages + (("select", selector),))
+
+    def GroupBy(self, key: Callable[[Any], Any],
+                element: Optional[Callable[[Any], Any]] = None) -> "_ViewBuilder":
+        if self.__key is not None:
+            raise TypeError("GroupBy can be used only once")
+        stages = self.__stages
+        if element is not None:
+            return _ViewBuilder(stages + (("element", element),), key)
+        return _ViewBuilder(stages, key)
+
+    def __Aggregate(self, name: str, selector: Optional[Callable[[Any], Any]]) -> _Spec:
+        return (self.__stages, self.__key, name, selector)
+
+    def Count(self) -> _Spec:
+        return self.__Aggregate("count", None)
+
+    def Sum(self, selector: Optional[Callable[[Any], Any]] = None) -> _Spec:
+        return self.__Aggregate("sum", selector)
+
+    def Average(self, selector: Optional[Callable[[Any], Any]] = None) -> _Spec:
+        return self.__Aggregate("average", selector)
+
+    def Max(self, selector: Optional[Callable[[Any], Any]] = None) -> _Spec:
+        return self.__Aggregate("max", selector)
+
+    def Min(self, selector: Optional[Callable[[Any], Any]] = None) -> _Spec:
+        return self.__Aggregate("min", selector)
+
+
+class MaterializedView(Generic[TKey, TResult]):
+    """## Aggregate of a TypedList kept up to date incrementally
+    `Add` / `AddRange` / `Insert` / `Remove` / `RemoveAt` update the view in O(1)
+    (O(log n) for Max/Min). Any other modification marks the view stale and it
+    is recomputed with one scan when it is read next.\n
+    Usage:
+    `sizes = runs.Materialize(lambda q: q.GroupBy(lambda r: r.species).Sum(lambda r: r.size))` \n
+    `sizes["human"]` \n
+    `sizes.Value` DictionaryC of all keys \n
+    """
+
+    def __init__(self, source: "TypedList[Any]", query: Callable[[Any], Any]) -> None:
+        """Create a view over `source`.
+        @source: TypedList to follow
+        @query: `lambda q: q[.Where()][.Select()][.GroupBy()].Count()/Sum()/Average()/Max()/Min()`
+        """
+        spec = query(_ViewBuilder())
+        if not isinstance(spec, tuple) or len(spec) != 4:
+            raise TypeError("query should end with Count, Sum, Average, Max or Min")
+        self.__stages, self.__key, name, self.__selector = spec
+        self.__factory = _AGGREGATES[name]
+        self.__source = source
+        self.__groups: Dict[Any, _Count] = {}
+        # 同期済みの source.Version (-1 は未計算)
+        self.__version = -1
+
+    def __Apply(self, values: Iterable[Any], remove: bool) -> None:
+        groups = self.__groups
+        key = self.__key
+        selector = self.__selector
+        for value in values:
+            group_key: Any = _ALL
+            skip = False
+            for op, fn in self.__stages:
+                if op == "where":
+                    if not fn(value):
+                        skip = True
+                        break
+                else:
+                    if op == "element":
+                        # キーは element 適用前の要素から取る
+                        group_key = key(value)  # type: ignore
+                    value = fn(value)
+            if skip:
+                continue
+            if key is not None and group_key is _ALL:
+                group_key = key(value)
+            if selector is not None:
+                value = selector(value)
+            state = groups.get(group_key)
+            if remove:
+                if state is None:
+                    continue
+                state.Remove(value)
+                if state.count == 0:
+                    del groups[group_key]
+            else:
+                if state is None:
+                    state = groups[group_key] = self.__factory()
+                state.Add(value)
+
+    def _Update(self, values: Iterable[Any], remove: bool, before: int, after: int) -> None:
+        # 同期していないビューは次に読むときに再計算する
+        if self.__version != before:
+            return
+        self.__Apply(values, remove)
+        self.__version = after
+
+    def Refresh(self) -> "MaterializedView[TKey, TResult]":
+        """Recompute the view from the whole List."""
+        self.__groups = {}
+        self.__Apply(self.__source, False)
+        self.__version = self.__source.Version
+        return self
+
+    def __Sync(self) -> Dict[Any, _Count]:
+        if self.__version != self.__source.Version:
+            self.Refresh()
+        return self.__groups
+
+    def __getitem__(self, key: TKey) -> Optional[TResult]:
+        """Returns the aggregate of `key` (None when the key has no element)."""
+        state = self.__Sync().get(key)
+        if state is None:
+            return None
+        result: TResult = state.Result()
+        return result
+
+    @property
+    def Value(self) -> Any:
+        """DictionaryC of key -> aggregate, or the aggregate itself without GroupBy."""
+        groups = self.__Sync()
+        if self.__key is None:
+            state = groups.get(_ALL)
+            if state is None:
+                state = self.__factory()
+            return state.Result()
+        from PyLINQ.generics import DictionaryC
+        return DictionaryC._FromDict({k: state.Result() for k, state in groups.items()})
+
+    def Dispose(self) -> None:
+        """Stop following the List."""
+        self.__source.Dematerialize(self)
@@ -0,0 +1,229 @@
+import os
+import pickle
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, Executor, Future,
+                                ProcessPoolExecutor, ThreadPoolExecutor, wait)
+from itertools import chain
+from typing import (TYPE_CHECKING, Any, Callable, Deque, Generic, Iterable,
+                    Iterator, List, Optional, Set, Tuple, TypeVar)
+
+try:
+    # ラムダやクロージャをワーカープロセスへ送るには cloudpickle が必要
+    import cloudpickle as _serializer
+except ImportError:
+    _serializer = pickle
+
+from PyLINQ.enumrable import Enumrable
+
+if TYPE_CHECKING:
+    from PyLINQ.generics import TypedList
+
+T1 = TypeVar("T1")
+TResult = TypeVar("TResult")
+
+_Plan = Tuple[Tuple[Tuple[str, Callable[[Any], Any]], ...], str]
+
+# Plan installed once per worker process by `_Install`
+_installed: Optional[_Plan] = None
+
+
+def _Apply(plan: _Plan, chunk: List[Any]) -> Any:
+    stages, reducer = plan
+    it: Iterator[Any] = iter(chunk)
+    for op, fn in stages:
+        it = filter(fn, it) if op == "where" else map(fn, it)
+    if reducer == "list":
+        return list(it)
+    if reducer == "count":
+        counter = 0
+        for _ in it:
+            counter += 1
+        return counter
+    if reducer == "sum":
+        total = 0
+        counter = 0
+        for val in it:
+            total += val
+            counter += 1
+        return (total, counter)
+    values = list(it)
+    if len(values) == 0:
+        return None
+    return max(values) if reducer == "max" else min(values)
+
+
+def _Install(payload: bytes) -> None:
+    global _installed
+    _installed = pickle.loads(payload)
+
+
+def _RunInstalled(chunk: List[Any]) -> Any:
+    if _installed is None:
+        raise RuntimeError("the plan is not installed in this worker")
+    return _Apply(_installed, chunk)
+
+
+class ParallelEnumerable(Generic[T1]):
+    """## Parallel query like C# PLINQ
+    The source is partitioned into chunks, which are processed on a thread or
+    process pool. The selectors are sent to each worker process only once.
+    Lambdas and closures need cloudpickle for the process pool
+    (`pip install PyLINQ[parallel]`); without it, use `executor="thread"`.\n
+    Usage:
+    `li.AsParallel(degree=8).Where(lambda x: x > 0).Sum(lambda x: x * 2)` \n
+    `li.AsParallel().AsOrdered().Select(score).ToList()` Keep source order \n
+    """
+
+    def __init__(
+        self,
+        source: Iterable[T1],
+        executor: str = "process",
+        degree: Optional[int] = None,
+        chunksize: int = 0,
+    ) -> None:
+        """Create a parallel query over `source`.
+        @source: Any iterable
+        @[optional] executor: "process" or "thread"
+        @[optional] degree: Number of workers (default: number of CPUs)
+        @[optional] chunksize: Elements per batch (0 decides from the source length)
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError("executor should be 'process' or 'thread'")
+        self.__source = source
+        self.__executor = executor
+        self.__degree = degree if degree is not None else (os.cpu_count() or 1)
+        self.__chunksize = chunksize
+        self.__ordered = False
+        self.__stages: Tuple[Tuple[str, Callable[[Any], Any]], ...] = ()
+
+    def __Clone(
+        self, stages: Tuple[Tuple[str, Callable[[Any], Any]], ...], ordered: bool
+    ) -> "ParallelEnumerable[Any]":
+        query: ParallelEnumerable[Any] = ParallelEnumerable(
+            self.__source, self.__executor, self.__degree, self.__chunksize)
+        query.__stages = stages
+        query.__ordered = ordered
+        return query
+
+    def __Partition(self) -> Iterator[List[T1]]:
+        size = self.__chunksize
+        if size <= 0:
+            length = getattr(self.__source, "Length", None)
+            if length is None:
+                try:
+                    length = len(self.__source)  # type: ignore
+                except TypeError:
+                    length = 0
+            # ワーカーあたり 4 バッチ程度に分割して負荷を均す
+            size = max(1, -(-length // (self.__degree * 4))) if length else 1024
+        return Enumrable.Chunk(self.__source, size)
+
+    def __CreateExecutor(self, plan: _Plan) -> Executor:
+        if self.__executor == "thread":
+            return ThreadPoolExecutor(max_workers=self.__degree)
+        try:
+            payload = _serializer.dumps(plan)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(
+                "The selectors cannot be sent to worker processes. "
+                "Install cloudpickle (pip install PyLINQ[parallel]) "
+                "or use executor=\"thread\"") from e
+        return ProcessPoolExecutor(
+            max_workers=self.__degree,
+            initializer=_Install,
+            initargs=(payload,),
+        )
+
+    def __Execute(self, reducer: str, ordered: bool) -> Iterator[Any]:
+        plan: _Plan = (self.__stages, reducer)
+        if self.__executor == "thread":
+            def run(chunk): return _Apply(plan, chunk)
+        else:
+            run = _RunInstalled
+        window = self.__degree * 2
+        with self.__CreateExecutor(plan) as pool:
+            chunks = self.__Partition()
+            if ordered:
+                pending: Deque[Future] = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(run, chunk))
+                    if len(pending) >= window:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            else:
+                running: Set[Future] = set()
+                for chunk in chunks:
+                    running.add(pool.submit(run, chunk))
+                    if len(running) >= window:
+                        done, running = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                for future in chain(*wait(running)):
+                    yield future.result()
+
+    # Options
+    def AsOrdered(self) -> "ParallelEnumerable[T1]":
+        """Merge the results in source order."""
+        return self.__Clone(self.__stages, True)
+
+    def AsUnordered(self) -> "ParallelEnumerable[T1]":
+        """Merge the results in completion order (faster)."""
+        return self.__Clone(self.__stages, False)
+
+    # Deferred operators
+    def Where(self, fn: Callable[[T1], bool]) -> "ParallelEnumerable[T1]":
+        """Only the elements whose `fn` condition returns True are extracted."""
+        return self.__Clone(self.__stages + (("where", fn),), self.__ordered)
+
+    def Select(self, selector: Callable[[T1], TResult]) -> "ParallelEnumerable[TResult]":
+        """Project each element with `selector`."""
+        return self.__Clone(self.__stages + (("select", selector),), self.__ordered)
+
+    # Terminal operators
+    def __iter__(self) -> Iterator[T1]:
+        return chain.from_iterable(self.__Execute("list", self.__ordered))
+
+    def ToList(self) -> "TypedList[T1]":
+        """Execute the query and collect the result into a new TypedList."""
+        from PyLINQ.generics import TypedList
+        return TypedList(self)
+
+    def Count(self) -> int:
+        """Returns the number of elements."""
+        return sum(self.__Execute("count", False))
+
+    def CountOfOn(self, fn: Callable[[T1], bool]) -> int:
+        """Counts and returns the number of `True` returned in the anonymous function `fn`."""
+        return self.Where(fn).Count()
+
+    def Sum(self, fn: Optional[Callable[[T1], int]] = None):
+        """Sum the ints returned by `fn`.
+        @[optional] fn: Anonymous function that specifies a int
+        """
+        query = self if fn is None else self.Select(fn)
+        return sum(total for total, _ in query.__Execute("sum", False))
+
+    def Average(self, selector: Optional[Callable[[T1], int]] = None):
+        """Averages the numbers returned by `selector`.
+        @exception: If the number of elements is 0, ZeroDivisionError will be raised.
+        """
+        query = self if selector is None else self.Select(selector)
+        total = 0
+        counter = 0
+        for part, part_count in query.__Execute("sum", False):
+            total += part
+            counter += part_count
+        if counter == 0:
+            raise ZeroDivisionError
+        return total / counter
+
+    def Max(self, selector: Optional[Callable[[T1], int]] = None):
+        """Returns max value of int selector."""
+        query = self if selector is None else self.Select(selector)
+        return max(part for part in query.__Execute("max", False) if part is not None)
+
+    def Min(self, selector: Optional[Callable[[T1], int]] = None):
+        """Returns min value of int selector."""
+        query = self if selector is None else self.Select(selector)
+        return min(part for part in query.__Execute("min", False) if part is not None)
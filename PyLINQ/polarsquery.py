@@ -0,0 +1,256 @@
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Generic, Iterator,
+                    Optional, TypeVar, Union)
+
+import polars as pl
+
+from PyLINQ.enumrable import Enumerable
+
+if TYPE_CHECKING:
+    from PyLINQ.generics import TypedList
+
+T1 = TypeVar("T1")
+
+
+def _Unwrap(value: Any) -> Any:
+    return value.expr if isinstance(value, _Expr) else value
+
+
+def _Operator(name: str) -> Callable[..., "_Expr"]:
+    def operator(self: "_Expr", *others: Any) -> "_Expr":
+        return _Expr(getattr(self.expr, name)(*map(_Unwrap, others)))
+    operator.__name__ = name
+    return operator
+
+
+class _Expr:
+    """Expression recorded from a selector.\n
+    Only operators are translated. Any other attribute (e.g. `str` methods) raises,
+    so selectors whose meaning polars could change fall back to Python.
+    `==` and `!=` treat null like Python treats None instead of dropping the row.
+    """
+
+    __hash__ = None  # type: ignore
+
+    def __init__(self, expr: pl.Expr) -> None:
+        self.expr = expr
+
+    def __bool__(self) -> bool:
+        raise TypeError("an expression has no truth value")
+
+
+def _Equality(name: str, null: str) -> Callable[..., "_Expr"]:
+    # Python と同じく None 同士は等しく、None と値は等しくないものとして比べる
+    def operator(self: "_Expr", other: Any) -> "_Expr":
+        if other is None:
+            return _Expr(getattr(self.expr, null)())
+        return _Expr(getattr(self.expr, name)(_Unwrap(other)))
+    return operator
+
+
+setattr(_Expr, "__eq__", _Equality("eq_missing", "is_null"))
+setattr(_Expr, "__ne__", _Equality("ne_missing", "is_not_null"))
+
+for _name in (
+    "__lt__", "__le__", "__gt__", "__ge__",
+    "__add__", "__radd__", "__sub__", "__rsub__", "__mul__", "__rmul__",
+    "__truediv__", "__rtruediv__", "__floordiv__", "__rfloordiv__",
+    "__mod__", "__rmod__", "__pow__", "__rpow__",
+    "__and__", "__rand__", "__or__", "__ror__", "__xor__", "__rxor__",
+    "__neg__", "__invert__", "__abs__",
+):
+    setattr(_Expr, _name, _Operator(_name))
+del _name
+
+
+class _ColumnProxy:
+    """Stand-in row passed to a selector to record it as a polars expression.\n
+    `r.title` and `r["title"]` become `pl.col("title")`; `r[Scheme.member]` uses `DBBase.plptr`.
+    """
+
+    def __init__(self, db: Any = None) -> None:
+        self.__db = db
+
+    def __getattr__(self, name: str) -> _Expr:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Expr(pl.col(name))
+
+    def __getitem__(self, column: Any) -> _Expr:
+        if isinstance(column, str):
+            return _Expr(pl.col(column))
+        if self.__db is not None:
+            return _Expr(self.__db.plptr(column))
+        raise KeyError(column)
+
+
+class _Row:
+    """Python row used when a selector cannot be translated (attribute and item access)."""
+
+    def __init__(self, values: Dict[str, Any], db: Any = None) -> None:
+        self.__values = values
+        self.__db = db
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, column: Any) -> Any:
+        if not isinstance(column, str) and self.__db is not None:
+            column = self.__db.plptr(column).meta.output_name()
+        return self.__values[column]
+
+
+def _Translate(fn: Callable[[Any], Any], db: Any) -> Optional[Any]:
+    """Returns the polars expression(s) recorded by `fn`, or None if it cannot be translated.\n
+    `and`/`or`/`not`, `if`, method calls and most builtins raise on a recorded
+    expression, which is how untranslatable selectors are detected.
+    """
+    try:
+        result = fn(_ColumnProxy(db))
+    except Exception:
+        return None
+    if isinstance(result, _Expr):
+        return result.expr
+    if isinstance(result, (tuple, list)) and len(result) > 0 and all(
+            isinstance(expr, _Expr) for expr in result):
+        return [expr.expr for expr in result]
+    if isinstance(result, dict) and len(result) > 0 and all(
+            isinstance(expr, _Expr) for expr in result.values()):
+        return [expr.expr.alias(name) for name, expr in result.items()]
+    return None
+
+
+class PolarsQuery(Generic[T1]):
+    """## LINQ query compiled to a polars LazyFrame
+    Selectors are translated to `pl.col(...)` expressions and run in the polars engine.
+    Selectors that cannot be translated fall back to Python row by row.\n
+    Usage:
+    `PolarsQuery(db.df).Where(lambda r: r.accession_id == x).Select(lambda r: r.title).ToList()` \n
+    """
+
+    def __init__(self, source: Union[pl.DataFrame, pl.LazyFrame], db: Any = None) -> None:
+        """Create a query over a polars frame.
+        @source: DataFrame or LazyFrame
+        @[optional] db: DBBase whose scheme members may be used as `r[Scheme.member]`
+        """
+        self.__frame: pl.LazyFrame = source.lazy()
+        self.__db = db
+
+    def __Next(self, frame: pl.LazyFrame) -> "PolarsQuery[Any]":
+        return PolarsQuery(frame, self.__db)
+
+    def __Rows(self, frame: Optional[pl.DataFrame] = None) -> Iterator[_Row]:
+        if frame is None:
+            frame = self.__frame.collect()
+        return (_Row(row, self.__db) for row in frame.iter_rows(named=True))
+
+    def __iter__(self) -> Iterator[Any]:
+        frame = self.__frame.collect()
+        if frame.width == 1:
+            return iter(frame.to_series().to_list())
+        return frame.iter_rows(named=True)
+
+    # Deferred operators
+    def Where(self, fn: Callable[[Any], Any]) -> "PolarsQuery[T1]":
+        """Only the rows whose `fn` condition returns True are extracted."""
+        expr = _Translate(fn, self.__db)
+        if isinstance(expr, pl.Expr):
+            return self.__Next(self.__frame.filter(expr))
+        frame = self.__frame.collect()
+        mask = pl.Series([bool(fn(row)) for row in self.__Rows(frame)], dtype=pl.Boolean)
+        return self.__Next(frame.filter(mask).lazy())
+
+    def Select(self, selector: Callable[[Any], Any]) -> Union["PolarsQuery[Any]", Enumerable[Any]]:
+        """Project each row with `selector`.\n
+        A tuple, list or dict of expressions selects several columns.
+        @returns: PolarsQuery, or a Python Enumerable when `selector` cannot be translated
+        """
+        expr = _Translate(selector, self.__db)
+        if expr is not None:
+            return self.__Next(self.__frame.select(expr))
+        return Enumerable.Defer(lambda: map(selector, self.__Rows()))
+
+    def OrderBy(self, selector: Callable[[Any], Any]) -> "PolarsQuery[T1]":
+        """Stable sort by the key returned by `selector`."""
+        return self.__Sort(selector, False)
+
+    def OrderByDescending(self, selector: Callable[[Any], Any]) -> "PolarsQuery[T1]":
+        """Stable sort descending by the key returned by `selector`."""
+        return self.__Sort(selector, True)
+
+    def __Sort(self, selector: Callable[[Any], Any], descending: bool) -> "PolarsQuery[T1]":
+        expr = _Translate(selector, self.__db)
+        if isinstance(expr, pl.Expr):
+            return self.__Next(
+                self.__frame.sort(expr, descending=descending, maintain_order=True))
+        frame = self.__frame.collect()
+        keys = [selector(row) for row in self.__Rows(frame)]
+        order = sorted(range(len(keys)), key=keys.__getitem__, reverse=descending)
+        return self.__Next(frame[order].lazy())
+
+    def Take(self, count: int) -> "PolarsQuery[T1]":
+        """Returns the first `count` rows."""
+        return self.__Next(self.__frame.head(max(count, 0)))
+
+    def Skip(self, count: int) -> "PolarsQuery[T1]":
+        """Skip the first `count` rows."""
+        return self.__Next(self.__frame.slice(max(count, 0)))
+
+    # Terminal operators
+    def ToLazy(self) -> pl.LazyFrame:
+        """Returns the compiled LazyFrame."""
+        return self.__frame
+
+    def ToPolars(self) -> pl.DataFrame:
+        """Execute the query and return a DataFrame."""
+        return self.__frame.collect()
+
+    def ToList(self) -> "TypedList[Any]":
+        """Execute the query. A single column yields its values, otherwise row dicts."""
+        from PyLINQ.generics import TypedList
+        return TypedList(self)
+
+    def Count(self) -> int:
+        """Returns the number of rows."""
+        count: int = self.__frame.select(pl.len()).collect().item()
+        return count
+
+    def First(self) -> Any:
+        """Returns the first row (or value for a single column)."""
+        for value in self.Take(1):
+            return value
+        raise IndexError("Index out of range")
+
+    def __Aggregate(self, selector: Optional[Callable[[Any], Any]], name: str) -> Any:
+        if selector is None:
+            return self.__frame.select(getattr(pl.all(), name)()).collect().item()
+        expr = _Translate(selector, self.__db)
+        if isinstance(expr, pl.Expr):
+            frame = self.__frame.select(getattr(expr, name)()).collect()
+            return frame.item()
+        values = [selector(row) for row in self.__Rows()]
+        if name == "sum":
+            return sum(values)
+        if name == "mean":
+            if len(values) == 0:
+                raise ZeroDivisionError
+            return sum(values) / len(values)
+        return max(values) if name == "max" else min(values)
+
+    def Sum(self, selector: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Sum the numbers returned by `selector` (default: the single column)."""
+        return self.__Aggregate(selector, "sum")
+
+    def Average(self, selector: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Averages the numbers returned by `selector` (default: the single column)."""
+        return self.__Aggregate(selector, "mean")
+
+    def Max(self, selector: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Returns the max value of `selector` (default: the single column)."""
+        return self.__Aggregate(selector, "max")
+
+    def Min(self, selector: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Returns the min value of `selector` (default: the single column)."""
+        return self.__Aggregate(selector, "min")
@@ -0,0 +1,267 @@
+import json
+import threading
+import tracemalloc
+from functools import partial, wraps
+from time import perf_counter_ns
+from types import BuiltinFunctionType, FunctionType, MethodType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PyLINQ.enumrable import Enumerable, GroupedEnumerable
+from PyLINQ.generics import DictionaryC, Lookup, TypedList
+
+_TARGETS: Tuple[type, ...] = (TypedList, DictionaryC, Lookup, Enumerable, GroupedEnumerable)
+_SELECTOR_TYPES = (FunctionType, MethodType, BuiltinFunctionType, partial)
+# セレクタ自体をキーに使う演算子 (メモ化・索引)。包むと別のキーになるのでそのまま渡す
+_KEYED_BY_SELECTOR = frozenset((
+    "TypedList.Sum", "TypedList.Max", "TypedList.Min",
+    "TypedList.CreateIndex", "TypedList.DropIndex", "TypedList.WhereEquals",
+))
+
+# 同時に有効にできる Profiler は 1 つだけ
+_active: Optional["Profiler"] = None
+
+
+class OperatorStatistics:
+    """Aggregated measurements of one operator (e.g. `TypedList.Where`)."""
+
+    def __init__(self, name: str) -> None:
+        self.Name = name
+        self.Calls = 0
+        self.ElementsIn = 0
+        self.ElementsOut = 0
+        self.WallTimeNs = 0
+        self.SelfTimeNs = 0
+        self.SelectorCalls = 0
+        self.AllocatedBytes = 0
+        self.PeakBytes = 0
+
+    def ToDict(self) -> Dict[str, Any]:
+        return {
+            "name": self.Name,
+            "calls": self.Calls,
+            "elements_in": self.ElementsIn,
+            "elements_out": self.ElementsOut,
+            "wall_time_ns": self.WallTimeNs,
+            "self_time_ns": self.SelfTimeNs,
+            "selector_calls": self.SelectorCalls,
+            "allocated_bytes": self.AllocatedBytes,
+            "peak_bytes": self.PeakBytes,
+        }
+
+
+class _Frame:
+    __slots__ = ("child_ns", "peak")
+
+    def __init__(self) -> None:
+        self.child_ns = 0
+        self.peak = 0
+
+
+def _Counting(source: Iterable[Any], stats: OperatorStatistics, field: str) -> Iterator[Any]:
+    # 遅延演算子は実行時に流れた要素数を数える
+    counted = 0
+    try:
+        for value in source:
+            counted += 1
+            yield value
+    finally:
+        setattr(stats, field, getattr(stats, field) + counted)
+
+
+def _Size(value: Any) -> Optional[int]:
+    length = getattr(value, "Length", None)
+    if isinstance(length, int):
+        return length
+    if isinstance(value, (list, tuple, dict, set, str)):
+        return len(value)
+    return None
+
+
+class Profiler:
+    """## Opt-in per-operator instrumentation
+    While enabled, the public operators of TypedList / DictionaryC / Lookup /
+    Enumerable / GroupedEnumerable are replaced by recording wrappers.
+    Disabling restores the original methods, so nothing is left on the hot path.\n
+    Lambdas passed while enabled are counted as selector invocations of the
+    operator they were passed to, even when a deferred query runs them later.
+    Selectors used as cache or index keys (`TypedList.Sum`/`Max`/`Min`,
+    `CreateIndex`/`DropIndex`/`WhereEquals`) are passed through uncounted.
+    Enumerable operators count their elements in and out when the query runs.\n
+    Usage:
+    `with Profiler() as prof: run_query()` \n
+    `print(prof.Summary())` \n
+    `prof.ToChromeTrace("trace.json")` Open with chrome://tracing or Perfetto \n
+    """
+
+    def __init__(self, memory: bool = False, trace: bool = True,
+                 targets: Iterable[type] = _TARGETS) -> None:
+        """Create a Profiler (not enabled yet).
+        @[optional] memory: Record allocations with tracemalloc (slow)
+        @[optional] trace: Keep each call as an event for `ToChromeTrace`
+        @[optional] targets: Classes whose operators are instrumented
+        """
+        self.__memory = memory
+        self.__trace = trace
+        self.__targets = tuple(targets)
+        self.__originals: List[Tuple[type, str, Any]] = []
+        self.__stats: Dict[str, OperatorStatistics] = {}
+        self.__events: List[Dict[str, Any]] = []
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__started_tracemalloc = False
+        self.__origin = 0
+
+    def __enter__(self) -> "Profiler":
+        return self.Enable()
+
+    def __exit__(self, *_: Any) -> None:
+        self.Disable()
+
+    @property
+    def Enabled(self) -> bool:
+        return _active is self
+
+    def Enable(self) -> "Profiler":
+        """Install the wrappers."""
+        global _active
+        if _active is not None:
+            raise RuntimeError("another Profiler is already enabled")
+        _active = self
+        if self.__memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+        self.__origin = perf_counter_ns()
+        for cls in self.__targets:
+            for name, attr in list(vars(cls).items()):
+                if not isinstance(attr, FunctionType) or not name[:1].isupper():
+                    continue
+                self.__originals.append((cls, name, attr))
+                setattr(cls, name, self.__Wrap(cls.__name__ + "." + name, attr))
+        return self
+
+    def Disable(self) -> "Profiler":
+        """Restore the original methods."""
+        global _active
+        for cls, name, attr in reversed(self.__originals):
+            setattr(cls, name, attr)
+        self.__originals = []
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+        if _active is self:
+            _active = None
+        return self
+
+    def Reset(self) -> "Profiler":
+        """Discard the recorded measurements."""
+        with self.__lock:
+            self.__stats = {}
+            self.__events = []
+        return self
+
+    def __Statistics(self, name: str) -> OperatorStatistics:
+        stats = self.__stats.get(name)
+        if stats is None:
+            with self.__lock:
+                stats = self.__stats.setdefault(name, OperatorStatistics(name))
+        return stats
+
+    def __Count(self, stats: OperatorStatistics, fn: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(fn)
+        def selector(*args: Any, **kwargs: Any) -> Any:
+            stats.SelectorCalls += 1
+            return fn(*args, **kwargs)
+        return selector
+
+    def __Wrap(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        stats = self.__Statistics(name)
+        profiler = self
+        count = name not in _KEYED_BY_SELECTOR
+
+        @wraps(method)
+        def operator(this: Any, *args: Any, **kwargs: Any) -> Any:
+            if count:
+                args = tuple(
+                    profiler.__Count(stats, arg) if isinstance(arg, _SELECTOR_TYPES) else arg
+                    for arg in args)
+                for key, arg in kwargs.items():
+                    if isinstance(arg, _SELECTOR_TYPES):
+                        kwargs[key] = profiler.__Count(stats, arg)
+            if isinstance(this, Enumerable):
+                source = this
+                this = Enumerable.Defer(lambda: _Counting(source, stats, "ElementsIn"))
+            stack: List[_Frame] = profiler.__local.__dict__.setdefault("stack", [])
+            frame = _Frame()
+            size_in = _Size(this)
+            memory = profiler.__memory and tracemalloc.is_tracing()
+            if memory:
+                current, peak = tracemalloc.get_traced_memory()
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, peak)
+                tracemalloc.reset_peak()
+            stack.append(frame)
+            start = perf_counter_ns()
+            try:
+                result = method(this, *args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                stack.pop()
+                if stack:
+                    stack[-1].child_ns += elapsed
+                stats.Calls += 1
+                stats.WallTimeNs += elapsed
+                stats.SelfTimeNs += elapsed - frame.child_ns
+                if memory:
+                    after, peak = tracemalloc.get_traced_memory()
+                    stats.AllocatedBytes += max(after - current, 0)
+                    stats.PeakBytes = max(stats.PeakBytes, max(peak, frame.peak) - current)
+            size_out = _Size(result)
+            if isinstance(result, Enumerable):
+                query = result
+                result = Enumerable.Defer(lambda: _Counting(query, stats, "ElementsOut"))
+            if size_in is not None:
+                stats.ElementsIn += size_in
+            if size_out is not None:
+                stats.ElementsOut += size_out
+            if profiler.__trace:
+                event = {
+                    "name": name,
+                    "cat": name.split(".")[0],
+                    "ph": "X",
+                    "ts": (start - profiler.__origin) / 1000,
+                    "dur": elapsed / 1000,
+                    "pid": 0,
+                    "tid": threading.get_ident(),
+                    "args": {"in": size_in, "out": size_out},
+                }
+                with profiler.__lock:
+                    profiler.__events.append(event)
+            return result
+
+        return operator
+
+    # Reports
+    def Report(self) -> List[Dict[str, Any]]:
+        """Per-operator measurements, slowest (self time) first."""
+        stats = sorted(self.__stats.values(), key=lambda s: s.SelfTimeNs, reverse=True)
+        return [s.ToDict() for s in stats if s.Calls > 0]
+
+    def Summary(self, top: int = 20) -> str:
+        """Human readable table of the `top` slowest operators."""
+        lines = ["%-36s %8s %12s %12s %12s %12s" % (
+            "operator", "calls", "self ms", "total ms", "elements", "selector")]
+        for row in self.Report()[:top]:
+            lines.append("%-36s %8d %12.3f %12.3f %12d %12d" % (
+                row["name"], row["calls"], row["self_time_ns"] / 1e6,
+                row["wall_time_ns"] / 1e6, row["elements_in"], row["selector_calls"]))
+        return "\n".join(lines)
+
+    def ToJson(self, path: str) -> None:
+        """Save `Report()` as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.Report(), f, indent=2)
+
+    def ToChromeTrace(self, path: str) -> None:
+        """Save the recorded calls in the Chrome trace event format."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.__events, "displayTimeUnit": "ms"}, f)
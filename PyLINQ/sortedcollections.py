@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, islice
+from typing import (Any, Callable, Dict, Generic, Iterable, Iterator, List,
+                    Optional, Tuple, TypeVar, Union)
+
+from PyLINQ.enumrable import Enumerable
+from PyLINQ.generics import KeyValuePair, TypedList
+
+T1 = TypeVar("T1")
+T2 = TypeVar("T2")
+TResult = TypeVar("TResult")
+
+# チャンクの基準長。2 倍を超えたら分割し、1/4 を下回ったら隣と結合する
+_LOAD = 1000
+
+
+def _Identity(value: Any) -> Any:
+    return value
+
+
+class SortedTypedList(Generic[T1]):
+    """## List that keeps its elements sorted by key
+    Elements are stored in sorted chunks of about 1000 elements, so an insert
+    only shifts one chunk and lookups are two binary searches.
+    Elements with equal keys keep their insertion order.\n
+    Usage:
+    `li = SortedTypedList(runs, key=lambda run: run.size)` \n
+    `li.Between(100, 200)` Elements whose key is in [100, 200] \n
+    `li.Rank(150)` Number of elements whose key is less than 150 \n
+    """
+
+    def __init__(self, other: Iterable[T1] = (), key: Optional[Callable[[T1], Any]] = None) -> None:
+        """Create a sorted List.
+        @other: Initial elements (sorted once)
+        @[optional] key: Key selector (default: the element itself)
+        """
+        self.__key: Callable[[T1], Any] = key if key is not None else _Identity
+        self.__Build(sorted(other, key=self.__key))
+
+    def __Build(self, values: List[T1]) -> None:
+        keys = list(map(self.__key, values))
+        self.__keys: List[List[Any]] = [keys[i:i + _LOAD] for i in range(0, len(keys), _LOAD)]
+        self.__items: List[List[T1]] = [values[i:i + _LOAD] for i in range(0, len(values), _LOAD)]
+        self.__maxes: List[Any] = [chunk[-1] for chunk in self.__keys]
+        self.__length = len(values)
+        self.__offsets: Optional[List[int]] = None
+
+    def __Offsets(self) -> List[int]:
+        # 各チャンク先頭の位置。挿入・削除では変わったチャンクより後ろだけずらす
+        if self.__offsets is None:
+            self.__offsets = [0, *accumulate(map(len, self.__keys))]
+        return self.__offsets
+
+    def __Shift(self, chunk: int, delta: int) -> None:
+        offsets = self.__offsets
+        if offsets is not None:
+            offsets[chunk + 1:] = [offset + delta for offset in islice(offsets, chunk + 1, None)]
+
+    def __Locate(self, index: int) -> Tuple[int, int]:
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("Index out of range")
+        offsets = self.__Offsets()
+        chunk = bisect_right(offsets, index) - 1
+        return chunk, index - offsets[chunk]
+
+    def __Left(self, key: Any) -> int:
+        chunk = bisect_left(self.__maxes, key)
+        if chunk == len(self.__maxes):
+            return self.__length
+        return self.__Offsets()[chunk] + bisect_left(self.__keys[chunk], key)
+
+    def __Right(self, key: Any) -> int:
+        chunk = bisect_right(self.__maxes, key)
+        if chunk == len(self.__maxes):
+            return self.__length
+        return self.__Offsets()[chunk] + bisect_right(self.__keys[chunk], key)
+
+    def __Range(self, start: int, stop: int) -> Iterator[T1]:
+        if start >= stop:
+            return iter(())
+        chunk, pos = self.__Locate(start)
+        items = chain(islice(self.__items[chunk], pos, None),
+                      chain.from_iterable(islice(self.__items, chunk + 1, None)))
+        return islice(items, stop - start)
+
+    def __Delete(self, chunk: int, pos: int) -> None:
+        keys = self.__keys[chunk]
+        del keys[pos]
+        del self.__items[chunk][pos]
+        self.__length -= 1
+        self.__Shift(chunk, -1)
+        if not keys:
+            del self.__keys[chunk], self.__items[chunk], self.__maxes[chunk]
+            if self.__offsets is not None:
+                del self.__offsets[chunk + 1]
+            return
+        self.__maxes[chunk] = keys[-1]
+        if len(keys) < _LOAD // 4 and len(self.__keys) > 1:
+            # 小さくなったチャンクは隣と結合する
+            left = chunk - 1 if chunk > 0 else chunk
+            self.__keys[left:left + 2] = [self.__keys[left] + self.__keys[left + 1]]
+            self.__items[left:left + 2] = [self.__items[left] + self.__items[left + 1]]
+            self.__maxes[left:left + 2] = [self.__keys[left][-1]]
+            if self.__offsets is not None:
+                del self.__offsets[left + 1]
+            self.__Split(left)
+
+    def __Split(self, chunk: int) -> None:
+        keys = self.__keys[chunk]
+        if len(keys) <= _LOAD * 2:
+            return
+        items = self.__items[chunk]
+        self.__keys[chunk:chunk + 1] = [keys[:_LOAD], keys[_LOAD:]]
+        self.__items[chunk:chunk + 1] = [items[:_LOAD], items[_LOAD:]]
+        self.__maxes[chunk:chunk + 1] = [keys[_LOAD - 1], keys[-1]]
+        if self.__offsets is not None:
+            self.__offsets.insert(chunk + 1, self.__offsets[chunk] + _LOAD)
+
+    def __Find(self, value: T1) -> int:
+        key = self.__key(value)
+        start = self.__Left(key)
+        for i, item in enumerate(self.__Range(start, self.__Right(key)), start):
+            if item == value:
+                return i
+        return -1
+
+    def __iter__(self) -> Iterator[T1]:
+        return chain.from_iterable(self.__items)
+
+    def __getitem__(self, index: int):
+        if index >= self.__length:
+            return None
+        chunk, pos = self.__Locate(index)
+        return self.__items[chunk][pos]
+
+    def Add(self, value: T1):
+        """Insert `value` at its sorted position (after the elements with an equal key)."""
+        key = self.__key(value)
+        if not self.__maxes:
+            self.__keys.append([key])
+            self.__items.append([value])
+            self.__maxes.append(key)
+            self.__offsets = None
+        else:
+            chunk = min(bisect_right(self.__maxes, key), len(self.__maxes) - 1)
+            keys = self.__keys[chunk]
+            pos = bisect_right(keys, key)
+            keys.insert(pos, key)
+            self.__items[chunk].insert(pos, value)
+            self.__maxes[chunk] = keys[-1]
+            self.__Shift(chunk, 1)
+            self.__Split(chunk)
+        self.__length += 1
+        return self
+
+    def AddRange(self, *values: T1):
+        """Insert values at their sorted positions."""
+        if len(values) > self.__length:
+            # 多数の追加はまとめてソートし直す方が速い
+            self.__Build(sorted(chain(self, values), key=self.__key))
+        else:
+            for value in values:
+                self.Add(value)
+        return self
+
+    def Clear(self):
+        """Clear all values from the List"""
+        self.__Build([])
+        return self
+
+    def Contains(self, value: T1):
+        """Returns where `value` is contained on the List (O(log n))"""
+        return self.__Find(value) >= 0
+
+    def ContainsKey(self, key: Any):
+        """Returns where an element with `key` is contained on the List (O(log n))"""
+        return self.__Left(key) < self.__Right(key)
+
+    def CountOf(self, value: T1):
+        """Returns the number of `values` contained in the List"""
+        key = self.__key(value)
+        return sum(1 for item in self.__Range(self.__Left(key), self.__Right(key)) if item == value)
+
+    def CountKeyOf(self, key: Any):
+        """Returns the number of elements whose key equals `key` (O(log n))"""
+        return self.__Right(key) - self.__Left(key)
+
+    def IndexOf(self, value: T1):
+        """Returns the first index that contains value (-1 when not contained)."""
+        return self.__Find(value)
+
+    def Rank(self, key: Any) -> int:
+        """Returns the number of elements whose key is less than `key`."""
+        return self.__Left(key)
+
+    def ElementAt(self, index: int) -> T1:
+        """Returns the element at `index` (negative counts from the end).
+        @exception: If `index` is out of range, IndexError will be raised.
+        """
+        chunk, pos = self.__Locate(index)
+        return self.__items[chunk][pos]
+
+    def Between(self, lo: Any, hi: Any) -> TypedList[T1]:
+        """Returns the elements whose key is in [`lo`, `hi`] as a new List."""
+        return TypedList(self.__Range(self.__Left(lo), self.__Right(hi)))
+
+    def Remove(self, value: T1):
+        """Remove the element that matches `value`.
+        @exception: If the element isn't contained, ValueError will be raised.
+        """
+        index = self.__Find(value)
+        if index < 0:
+            raise ValueError("value is not contained")
+        self.__Delete(*self.__Locate(index))
+
+    def RemoveAt(self, index: int):
+        """Delete only the element that has designated index"""
+        self.__Delete(*self.__Locate(index))
+
+    def RemoveOn(self, fn: Callable[[T1], bool]):
+        """Delete only the elements that returned True with `fn`"""
+        self.__Build([val for val in self if not fn(val)])
+
+    @property
+    def Length(self):
+        """The length of List"""
+        return self.__length
+
+    @property
+    def Values(self):
+        """Convert value to list[T1]"""
+        return list(self)
+
+    def First(self):
+        """Returns the element with the smallest key."""
+        if self.__length == 0:
+            raise IndexError("Index out of range")
+        return self.__items[0][0]
+
+    def Last(self):
+        """Get the element with the largest key."""
+        if self.__length == 0:
+            return None
+        return self.__items[-1][-1]
+
+    # Extended Methods
+    def AsEnumerable(self) -> Enumerable[T1]:
+        """Returns a lazy query over the elements in key order."""
+        return Enumerable.Defer(lambda: self)
+
+    def ToList(self) -> TypedList[T1]:
+        """Copy the elements (in key order) into a new TypedList."""
+        return TypedList(self)
+
+    def Where(self, fn: Callable[[T1], bool]):
+        """Only the elements whose `fn` condition returns True are extracted (order is kept)."""
+        self.__Build([val for val in self if fn(val) is not False])
+        return self
+
+    def Take(self, count: int):
+        """Keep only the `count` elements with the smallest keys."""
+        self.__Build(list(self.__Range(0, min(max(count, 0), self.__length))))
+        return self
+
+    def Skip(self, count: int):
+        """Delete the `count` elements with the smallest keys."""
+        self.__Build(list(self.__Range(max(count, 0), self.__length)))
+        return self
+
+    def Select(self, selector: Callable[[T1], TResult]) -> TypedList[TResult]:
+        """Project each element with `selector` into a new List (in key order)."""
+        return TypedList(map(selector, self))
+
+    def AllOf(self, fn: Callable[[T1], bool]):
+        """Returns True if all `fn` returns True."""
+        return self.AsEnumerable().AllOf(fn)
+
+    def AnyOf(self, fn: Callable[[T1], bool]):
+        """Returns True if any of `fn` returns True."""
+        return self.AsEnumerable().AnyOf(fn)
+
+    def CountOfOn(self, fn: Callable[[T1], bool]):
+        """Counts and returns the number of `True` returned in the anonymous function `fn`."""
+        return self.AsEnumerable().CountOfOn(fn)
+
+    def FirstOn(self, fn: Callable[[T1], bool]):
+        """Returns the first element (in key order) of which the return value of fn is True."""
+        return self.AsEnumerable().FirstOn(fn)
+
+    def LastOn(self, fn: Callable[[T1], bool]):
+        """The last element (in key order) in the condition that True is returned by `fn`"""
+        for val in chain.from_iterable(map(reversed, reversed(self.__items))):
+            if fn(val):
+                return val
+        return None
+
+    def Sum(self, fn: Callable[[T1], Any]):
+        """Sum the numbers returned by `fn`."""
+        return self.AsEnumerable().Sum(fn)
+
+    def Average(self, selector: Callable[[T1], Any]):
+        """Averages the numbers returned by `selector`."""
+        return self.AsEnumerable().Average(selector)
+
+    def ForEach(self, fn: Callable[[T1], Any]):
+        """Extract the element in key order."""
+        for val in self:
+            fn(val)
+        return self
+
+
+class SortedDictionaryC(Generic[T1, T2]):
+    """## Dictionary that keeps its keys sorted like C# SortedDictionary
+    Key access is a hash lookup; ordered access (rank, ranges, first/last) uses
+    a SortedTypedList of the keys.\n
+    Usage:
+    `dic = SortedDictionaryC[int, str]()` \n
+    `dic.Between(10, 20)` KeyValuePairs whose key is in [10, 20] \n
+    """
+
+    def __init__(self) -> None:
+        """Create a given type sorted Dictionary."""
+        self.__table: Dict[T1, KeyValuePair[T1, T2]] = {}
+        self.__keys: SortedTypedList[T1] = SortedTypedList()
+
+    def __getitem__(self, key: T1):
+        kp = self.__table.get(key)
+        if kp is None:
+            return None
+        return kp.Value
+
+    def __iter__(self) -> Iterator[KeyValuePair[T1, T2]]:
+        table = self.__table
+        return (table[key] for key in self.__keys)
+
+    def Add(self, key: T1, value: T2):
+        """Add value to self object (ignored when `key` is None or already contained)"""
+        if key is None or key in self.__table:
+            return self
+        self.__table[key] = KeyValuePair(key, value)
+        self.__keys.Add(key)
+        return self
+
+    def AddKP(self, kp: KeyValuePair[T1, T2]):
+        if kp is None:
+            return self
+        return self.Add(kp.Key, kp.Value)
+
+    def AddRange(self, *pairs: KeyValuePair[T1, T2]):
+        """Add values to self object"""
+        for pair in pairs:
+            self.Add(pair.Key, pair.Value)
+        return self
+
+    def Clear(self):
+        """Clear all values from the Dictionary"""
+        self.__table = {}
+        self.__keys.Clear()
+
+    def ContainsKey(self, key: T1):
+        """Returns where `key` is contained on the Dictionary"""
+        return key in self.__table
+
+    def ContainsValue(self, value: T2):
+        """Returns where `value` is contained on the Dictionary"""
+        return any(kp.Value == value for kp in self.__table.values())
+
+    def KeyIndexOf(self, key: T1):
+        """Returns the index of `key` in key order (-1 when not contained)."""
+        if key not in self.__table:
+            return -1
+        return self.__keys.Rank(key)
+
+    def Rank(self, key: T1) -> int:
+        """Returns the number of keys less than `key`."""
+        return self.__keys.Rank(key)
+
+    def ElementAt(self, index: int) -> KeyValuePair[T1, T2]:
+        """Returns the KeyValuePair at `index` in key order.
+        @exception: If `index` is out of range, IndexError will be raised.
+        """
+        return self.__table[self.__keys.ElementAt(index)]
+
+    def Between(self, lo: T1, hi: T1) -> TypedList[KeyValuePair[T1, T2]]:
+        """Returns the KeyValuePairs whose key is in [`lo`, `hi`] in key order."""
+        table = self.__table
+        return TypedList([table[key] for key in self.__keys.Between(lo, hi)])
+
+    def Remove(self, key: T1):
+        """Remove the element of `key`."""
+        if self.__table.pop(key, None) is not None:
+            self.__keys.Remove(key)
+
+    def RemoveAt(self, index: int):
+        """Delete only the element that has designated index (in key order)"""
+        if 0 <= index < self.Length:
+            del self.__table[self.__keys.ElementAt(index)]
+            self.__keys.RemoveAt(index)
+
+    @property
+    def Length(self):
+        """The length of Dictionary"""
+        return len(self.__table)
+
+    @property
+    def Keys(self):
+        """Get keys in order"""
+        return self.__keys.ToList()
+
+    @property
+    def Values(self):
+        """Get values in key order"""
+        return TypedList([kp.Value for kp in self])
+
+    @property
+    def PairList(self) -> TypedList[KeyValuePair[T1, T2]]:
+        """Convert to a list of KeyValuePair in key order."""
+        return TypedList(self)
+
+    def First(self) -> KeyValuePair[T1, T2]:
+        """Returns the KeyValuePair with the smallest key."""
+        return self.__table[self.__keys.First()]
+
+    def Last(self) -> Optional[KeyValuePair[T1, T2]]:
+        """Returns the KeyValuePair with the largest key."""
+        if self.Length == 0:
+            return None
+        return self.__table[self.__keys.Last()]
+
+    # Extended Methods
+    def AsEnumerable(self) -> Enumerable[KeyValuePair[T1, T2]]:
+        """Returns a lazy query over the KeyValuePairs in key order."""
+        return Enumerable.Defer(lambda: self)
+
+    def Where(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
+        """Only the elements whose `fn` condition returns True are extracted."""
+        for kp in [kp for kp in self if not fn(kp)]:
+            self.Remove(kp.Key)
+        return self
+
+    def Select(self, fn: Callable[[KeyValuePair[T1, T2]], TResult]) -> TypedList[TResult]:
+        """Project each KeyValuePair with `fn` into a new List (in key order)."""
+        return TypedList(map(fn, self))
+
+    def AllOf(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
+        """Returns True if all `fn` returns True."""
+        return self.AsEnumerable().AllOf(fn)
+
+    def AnyOf(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
+        """Returns True if any of `fn` returns True."""
+        return self.AsEnumerable().AnyOf(fn)
+
+    def CountOfOn(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
+        """Counts and returns the number of `True` returned in the anonymous function `fn`."""
+        return self.AsEnumerable().CountOfOn(fn)
+
+    def FirstOn(self, fn: Callable[[KeyValuePair[T1, T2]], bool]):
+        """Returns the first KeyValuePair (in key order) of which the return value of fn is True."""
+        return self.AsEnumerable().FirstOn(fn)
+
+    def Sum(self, fn: Callable[[KeyValuePair[T1, T2]], Any]):
+        """Sum the numbers returned by `fn`."""
+        return self.AsEnumerable().Sum(fn)
+
+    def ForEach(self, fn: Callable[[KeyValuePair[T1, T2]], Union[None, Any]]):
+        """Extract the KeyValuePairs in key order."""
+        for kp in self:
+            fn(kp)
+        return self
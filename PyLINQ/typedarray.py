@@ -0,0 +1,250 @@
+from typing import (TYPE_CHECKING, Any, Callable, Generic, Iterable, Iterator,
+                    Optional, TypeVar)
+from weakref import WeakSet
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from PyLINQ.generics import TypedList
+
+T1 = TypeVar("T1", int, float, bool)
+TResult = TypeVar("TResult")
+
+# 数値型 (bool, int, uint, float) のみ扱う
+_NUMERIC_KINDS = "biuf"
+
+# 配列を渡すと失敗したセレクタのコード。同じセレクタを二重に呼ばないよう覚えておく
+_SCALAR_SELECTORS: "WeakSet[Any]" = WeakSet()
+
+
+class TypedArray(Generic[T1]):
+    """## Numeric List backed by a contiguous NumPy buffer
+    Selectors receive the whole array, so `Where(lambda x: x > 3)` builds a
+    boolean mask and `Select(lambda x: x * 2)` runs as one vectorized kernel.
+    Selectors that cannot be applied to an array are called per element instead,
+    as are integer selectors whose result overflows int64.\n
+    Usage:
+    `arr = TypedArray[float]([1.0, 2.0])` Create new Array instance \n
+    `arr.Where(lambda x: x > 1).Sum()` \n
+    """
+
+    def __init__(self, other: Iterable[T1] = (), dtype: Any = None) -> None:
+        """Create a given type Array.
+        @other: ndarray (shared without copy when the dtype matches) or any iterable
+        @[optional] dtype: NumPy dtype of the elements
+        """
+        if isinstance(other, np.ndarray):
+            value = np.asarray(other, dtype=dtype)
+        else:
+            if not isinstance(other, (list, tuple)):
+                other = list(other)
+            value = np.array(other, dtype=dtype)
+        if value.ndim != 1:
+            value = value.reshape(-1)
+        if value.size > 0 and value.dtype.kind not in _NUMERIC_KINDS:
+            raise TypeError(
+                "TypedArray supports only int, float and bool, not " + str(value.dtype))
+        self.__value = value
+
+    @staticmethod
+    def FromTypedList(li: "TypedList[T1]", dtype: Any = None) -> "TypedArray[T1]":
+        """Create an Array from the elements of a TypedList."""
+        return TypedArray(li.Values, dtype)
+
+    @staticmethod
+    def FromArrow(array: Any) -> "TypedArray[Any]":
+        """Create an Array that shares the buffer of a numeric pyarrow Array.\n
+        Arrays with nulls or several chunks, and bool arrays (bit-packed), are copied once.
+        """
+        import pyarrow as pa
+        if hasattr(array, "combine_chunks"):
+            array = array.combine_chunks() if array.num_chunks != 1 else array.chunk(0)
+        shared = array.null_count == 0 and not pa.types.is_boolean(array.type)
+        return TypedArray(array.to_numpy(zero_copy_only=shared))
+
+    @staticmethod
+    def FromPolars(series: Any) -> "TypedArray[Any]":
+        """Create an Array that shares the buffer of a numeric polars Series when possible."""
+        return TypedArray(series.to_numpy())
+
+    def ToArrow(self):
+        """Convert to a pyarrow Array that shares this buffer. (Requires pyarrow)"""
+        import pyarrow as pa
+        return pa.array(self.__value)
+
+    def ToPolars(self, name: str = ""):
+        """Convert to a polars Series. (Requires polars)
+        @[optional] name: Series name
+        """
+        import polars as pl
+        return pl.Series(name, self.__value)
+
+    def ToTypedList(self) -> "TypedList[T1]":
+        """Convert to a TypedList of Python scalars."""
+        from PyLINQ.generics import TypedList
+        return TypedList(self.__value.tolist())
+
+    def __iter__(self) -> Iterator[T1]:
+        return iter(self.__value.tolist())
+
+    def __getitem__(self, index: int):
+        if index >= self.Length:
+            return None
+        return self.__value[index].item()
+
+    def __Map(self, fn: Callable[[Any], Any]) -> np.ndarray:
+        code = getattr(fn, "__code__", None)
+        if code not in _SCALAR_SELECTORS:
+            try:
+                result = fn(self.__value)
+            except Exception:
+                result = None
+            exact: Optional[bool] = None
+            if isinstance(result, np.ndarray) and result.shape == self.__value.shape:
+                exact = self.__Exact(fn, result)
+                if exact:
+                    return result
+            if exact is None and code is not None:
+                # 次回からは配列で呼ばずに要素ごとに呼ぶ
+                _SCALAR_SELECTORS.add(code)
+        # ベクトル化できないセレクタは要素ごとに呼ぶ
+        mapped = [fn(val) for val in self.__value.tolist()]
+        if len(mapped) == 0 or not all(type(val) is int for val in mapped):
+            return np.array(mapped)
+        # 整数は float や object に落とさず int64 か uint64 に収める
+        for dtype in (np.int64, np.uint64):
+            try:
+                return np.array(mapped, dtype=dtype)
+            except OverflowError:
+                pass
+        raise OverflowError("the selector results do not fit in a 64-bit integer")
+
+    def __Exact(self, fn: Callable[[Any], Any], result: np.ndarray) -> Optional[bool]:
+        # 整数の配列演算は溢れても例外にならず折り返すため、float64 で計算した結果と比べる
+        # (None: float64 では計算できず確かめられない)
+        if self.__value.dtype.kind not in "iu" or result.dtype.kind not in "biu":
+            return True
+        try:
+            with np.errstate(all="ignore"):
+                shadow = fn(self.__value.astype(np.float64))
+        except Exception:
+            return None
+        if not isinstance(shadow, np.ndarray) or shadow.shape != result.shape:
+            return None
+        return bool(np.isclose(result, shadow, rtol=1e-9, atol=0).all())
+
+    def Add(self, value: T1):
+        """Add value to self object  \n
+        ** Reallocates the buffer (O(n)); prefer AddRange for many values **
+        """
+        self.__value = np.append(self.__value, value)
+        return self
+
+    def AddRange(self, *values: T1):
+        """Add values to self object"""
+        self.__value = np.concatenate((self.__value, np.asarray(values)))
+        return self
+
+    def Contains(self, value: T1):
+        """Returns where `value` is contained on the Array"""
+        return bool((self.__value == value).any())
+
+    def CountOf(self, value: T1):
+        """Returns the number of `values` contained in the Array"""
+        return int(np.count_nonzero(self.__value == value))
+
+    def CountOfOn(self, fn: Callable[[Any], Any]):
+        """Counts the elements of the mask returned by `fn`.\n
+        [Usage]\n
+        `instance.CountOfOn(lambda x: x > 100)`
+        """
+        return int(np.count_nonzero(self.__Map(fn)))
+
+    def Copy(self):
+        """Copy this object."""
+        return TypedArray(self.__value.copy())
+
+    def IndexOf(self, value: T1):
+        """Returns the first index that contains value (-1 when not contained)."""
+        hits = np.flatnonzero(self.__value == value)
+        return int(hits[0]) if hits.size > 0 else -1
+
+    def First(self):
+        """Returns the first element."""
+        if self.Length == 0:
+            raise IndexError("Index out of range")
+        return self.__value[0].item()
+
+    def Last(self):
+        """Get the last element."""
+        if self.Length == 0:
+            return None
+        return self.__value[-1].item()
+
+    def AllOf(self, fn: Callable[[Any], Any]):
+        """Returns True if all of the mask returned by `fn` is True."""
+        return bool(np.all(self.__Map(fn)))
+
+    def AnyOf(self, fn: Callable[[Any], Any]):
+        """Returns True if any of the mask returned by `fn` is True."""
+        return bool(np.any(self.__Map(fn)))
+
+    def Average(self, selector: Optional[Callable[[Any], Any]] = None):
+        """Averages the numbers returned by `selector`.
+        @exception: If the number of elements is 0, ZeroDivisionError will be raised.
+        """
+        if self.Length == 0:
+            raise ZeroDivisionError
+        values = self.__value if selector is None else self.__Map(selector)
+        return values.mean().item()
+
+    def Max(self, selector: Optional[Callable[[Any], Any]] = None):
+        """Returns max value of the selector."""
+        values = self.__value if selector is None else self.__Map(selector)
+        return values.max().item()
+
+    def Min(self, selector: Optional[Callable[[Any], Any]] = None):
+        """Returns min value of the selector."""
+        values = self.__value if selector is None else self.__Map(selector)
+        return values.min().item()
+
+    def Sum(self, fn: Optional[Callable[[Any], Any]] = None):
+        """Sum the numbers returned by `fn`."""
+        values = self.__value if fn is None else self.__Map(fn)
+        return values.sum().item()
+
+    def OrderBy(self, selector: Optional[Callable[[Any], Any]] = None):
+        """Stable sort by the keys returned by `selector`."""
+        if selector is None:
+            self.__value = np.sort(self.__value, kind="stable")
+        else:
+            self.__value = self.__value[np.argsort(self.__Map(selector), kind="stable")]
+        return self
+
+    def Where(self, fn: Callable[[Any], Any]):
+        """Only the elements whose mask returned by `fn` is True are extracted."""
+        self.__value = self.__value[self.__Map(fn).astype(bool)]
+        return self
+
+    def Select(self, selector: Callable[[Any], Any]) -> "TypedArray[Any]":
+        """Apply `selector` to the whole Array and return a new Array."""
+        return TypedArray(self.__Map(selector))
+
+    def Reverse(self):
+        """Reverse the elements"""
+        self.__value = self.__value[::-1]
+
+    @property
+    def Length(self):
+        """The length of Array"""
+        return int(self.__value.size)
+
+    @property
+    def Values(self):
+        """Convert value to list[T1]"""
+        return self.__value.tolist()
+
+    @property
+    def Buffer(self) -> np.ndarray:
+        """The underlying ndarray (not copied)."""
+        return self.__value
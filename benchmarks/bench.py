@@ -0,0 +1,322 @@
+"""PyLINQ operator benchmarks.
+
+Each case runs the PyLINQ operator and the equivalent built-in / itertools code
+on the same input at growing sizes (1e3 ... 1e7), recording the best wall time
+(perf_counter) and the peak allocation (tracemalloc, measured in a separate run).
+The log-log slope of time against size is fitted per case, so an operator that
+scales like O(n^2) shows up as a slope near 2.
+
+Usage:
+    python benchmarks/bench.py                           # 1e3 .. 1e6, print only
+    python benchmarks/bench.py --max-size 1e7 -o new.json
+    python benchmarks/bench.py -k DictionaryC --compare old.json
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tracemalloc
+from itertools import dropwhile, groupby, islice, takewhile
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PyLINQ.enumrable import Enumerable, Enumrable  # noqa: E402
+from PyLINQ.generics import DictionaryC, KeyValuePair, TypedList  # noqa: E402
+
+# 1 サイズあたりの時間がこれを超えたら以降のサイズは測らない
+_TIME_BUDGET = 2.0
+# 傾きがこれを超えたら超線形として報告する
+_SLOPE_LIMIT = 1.3
+_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[int], Any]
+    pylinq: Callable[[Any], Any]
+    baseline: Optional[Callable[[Any], Any]]
+    # 線形を期待しない (n log n 等) ケースの許容傾き
+    slope: float = _SLOPE_LIMIT
+    # 組み込み側の入力 (既定は setup)。.Values のコピーを計測に含めないため素の list を渡す
+    baseline_setup: Optional[Callable[[int], Any]] = None
+
+
+def _ints(n: int) -> List[int]:
+    # 再現性のため乱数ではなく決定的な並びを使う
+    return [(i * 7919) % n for i in range(n)]
+
+
+def _list(n: int) -> TypedList[int]:
+    return TypedList(_ints(n))
+
+
+def _dict(n: int) -> DictionaryC[int, int]:
+    dic: DictionaryC[int, int] = DictionaryC()
+    for i in range(n):
+        dic.Add(i, i)
+    return dic
+
+
+def _pairs(n: int) -> List[KeyValuePair[int, int]]:
+    return [KeyValuePair(i, i) for i in range(n)]
+
+
+def _dict_add(pairs: List[KeyValuePair[int, int]]) -> DictionaryC[int, int]:
+    dic: DictionaryC[int, int] = DictionaryC()
+    for kp in pairs:
+        dic.Add(kp.Key, kp.Value)
+    return dic
+
+
+def _except(first: Any, second: List[int]) -> List[int]:
+    exclude = set(second)
+    return [x for x in dict.fromkeys(first) if x not in exclude]
+
+
+def _intersect(first: Any, second: List[int]) -> List[int]:
+    include = set(second)
+    return [x for x in dict.fromkeys(first) if x in include]
+
+
+def _exhaust(it: Any) -> None:
+    for _ in it:
+        pass
+
+
+CASES: List[Case] = [
+    # TypedList
+    Case("TypedList.Add", _ints, lambda s: TypedList().AddRangeOn(lambda: s),
+         lambda s: [].extend(s)),
+    Case("TypedList.Contains(miss)", _list, lambda s: s.Contains(-1),
+         lambda s: -1 in s, baseline_setup=_ints),
+    Case("TypedList.CountOf", _list, lambda s: s.CountOf(0),
+         lambda s: s.count(0), baseline_setup=_ints),
+    Case("TypedList.IndexOf(miss)", _list, lambda s: s.IndexOf(-1), None),
+    Case("TypedList.Where", _list, lambda s: s.Where(lambda x: x % 2 == 0),
+         lambda s: [x for x in s if x % 2 == 0]),
+    Case("TypedList.Select", _list, lambda s: s.Select(lambda x: x * 2),
+         lambda s: list(map(lambda x: x * 2, s))),
+    Case("TypedList.Sum", _list, lambda s: s.Sum(lambda x: x),
+         lambda s: sum(s)),
+    Case("TypedList.Max", _list, lambda s: s.Max(lambda x: x),
+         lambda s: max(s)),
+    Case("TypedList.Average", _list, lambda s: s.Average(lambda x: x),
+         lambda s: sum(s) / len(s), baseline_setup=_ints),
+    Case("TypedList.OrderBy", _list, lambda s: s.OrderBy(lambda x: x),
+         lambda s: sorted(s, key=lambda x: x), 1.4),
+    Case("TypedList.OrderByDescending", _list, lambda s: s.OrderByDescending(lambda x: x),
+         lambda s: sorted(s, key=lambda x: x, reverse=True), 1.4),
+    Case("TypedList.Distinct", _list, lambda s: s.Distinct(),
+         lambda s: list(dict.fromkeys(s))),
+    Case("TypedList.Except", lambda n: (_list(n), list(range(0, n, 2))),
+         lambda s: s[0].Except(*s[1]),
+         lambda s: _except(*s)),
+    Case("TypedList.Union", lambda n: (_list(n), list(range(n))),
+         lambda s: s[0].Union(s[1]),
+         lambda s: list(dict.fromkeys([*s[0], *s[1]]))),
+    Case("TypedList.Intersect", lambda n: (_list(n), list(range(0, n, 2))),
+         lambda s: s[0].Intersect(s[1]),
+         lambda s: _intersect(*s)),
+    Case("TypedList.Take", _list, lambda s: s.Take(10),
+         lambda s: list(islice(s, 10))),
+    Case("TypedList.TakeWhile", _list, lambda s: s.TakeWhile(lambda x: x < 100),
+         lambda s: list(takewhile(lambda x: x < 100, s))),
+    Case("TypedList.SkipWhile", _list, lambda s: s.SkipWhile(lambda x: x < 100),
+         lambda s: list(dropwhile(lambda x: x < 100, s))),
+    Case("TypedList.Reverse", _list, lambda s: s.Reverse(),
+         lambda s: s.reverse(), baseline_setup=_ints),
+    Case("TypedList.RemoveAt(0) x100", _list,
+         lambda s: [s.RemoveAt(0) for _ in range(100)], None),
+    Case("TypedList.GroupBy.Count", _list,
+         lambda s: s.GroupBy(lambda x: x % 100).Count(),
+         lambda s: {k: len(list(g)) for k, g in
+                    groupby(sorted(s, key=lambda x: x % 100), key=lambda x: x % 100)}, 1.4),
+    Case("TypedList.ToDictionary", _list, lambda s: s.ToDictionary(lambda x: x),
+         lambda s: {x: x for x in s}),
+    Case("TypedList.Chunk", _list, lambda s: s.Chunk(64),
+         lambda s: [s[i:i + 64] for i in range(0, len(s), 64)], baseline_setup=_ints),
+    # DictionaryC
+    Case("DictionaryC.Add", _pairs, _dict_add,
+         lambda s: {kp.Key: kp for kp in s}),
+    Case("DictionaryC.ContainsKey", _dict,
+         lambda s: [s.ContainsKey(i) for i in range(0, s.Length, 97)],
+         None),
+    Case("DictionaryC.__getitem__", _dict,
+         lambda s: [s[i] for i in range(0, s.Length, 97)], None),
+    Case("DictionaryC.Remove x100", _dict,
+         lambda s: [s.Remove(i) for i in range(100)], None),
+    Case("DictionaryC.Where", _dict, lambda s: s.Where(lambda kp: kp.Value % 2 == 0),
+         None),
+    Case("DictionaryC.Select", _dict, lambda s: s.Select(lambda kp: kp.Value),
+         None),
+    Case("DictionaryC.PairList", _dict, lambda s: s.PairList, None),
+    # Enumrable / Enumerable
+    Case("Enumrable.OrderBy", _ints, lambda s: Enumrable.OrderBy(s, lambda x: x),
+         lambda s: sorted(s, key=lambda x: x), 1.4),
+    Case("Enumrable.Join", lambda n: (_ints(n), list(range(n))),
+         lambda s: _exhaust(Enumrable.Join(s[0], s[1], lambda x: x, lambda y: y,
+                                           lambda x, y: (x, y))),
+         lambda s: [(x, x) for x in _intersect(*s)]),
+    Case("Enumerable.Where.Select", _ints,
+         lambda s: Enumerable(s).Where(lambda x: x % 2 == 0).Select(lambda x: x * 2).ToList(),
+         lambda s: [x * 2 for x in s if x % 2 == 0]),
+    Case("Enumerable.Skip.Take", _ints,
+         lambda s: Enumerable(s).Skip(len(s) // 2).Take(10).ToList(),
+         lambda s: list(islice(s, len(s) // 2, len(s) // 2 + 10))),
+    Case("Enumerable.Distinct", _ints, lambda s: Enumerable(s).Distinct().ToList(),
+         lambda s: list(dict.fromkeys(s))),
+    Case("Enumerable.Count", _ints, lambda s: Enumerable(s).Where(lambda x: x > 0).Count(),
+         lambda s: sum(1 for x in s if x > 0)),
+    Case("Enumerable.Max", _ints, lambda s: Enumerable(s).Max(lambda x: x),
+         lambda s: max(s)),
+    Case("Enumerable.First", _ints, lambda s: Enumerable(s).FirstOn(lambda x: x > len(s) // 2),
+         lambda s: next(x for x in s if x > len(s) // 2)),
+]
+
+
+def _time(fn: Callable[[Any], Any], setup: Callable[[int], Any], n: int, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        # 破壊的な演算子があるので計測ごとに入力を作り直す
+        state = setup(n)
+        gc.collect()
+        start = perf_counter()
+        fn(state)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _peak(fn: Callable[[Any], Any], setup: Callable[[int], Any], n: int) -> int:
+    state = setup(n)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(state)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _slope(points: List[Dict[str, Any]], key: str) -> Optional[float]:
+    """Least-squares slope of log(time) against log(n)."""
+    # 極端に短い計測はタイマー精度に支配されるので除く
+    points = [p for p in points if p[key] is not None and p[key] > 1e-4]
+    if len(points) < 2:
+        return None
+    xs = [math.log(p["n"]) for p in points]
+    ys = [math.log(p[key]) for p in points]
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    if var == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+def run_case(case: Case, sizes: List[int], repeat: int, memory: bool) -> Dict[str, Any]:
+    points: List[Dict[str, Any]] = []
+    baseline_setup = case.baseline_setup or case.setup
+    for n in sizes:
+        point: Dict[str, Any] = {"n": n}
+        point["time"] = _time(case.pylinq, case.setup, n, repeat)
+        point["baseline_time"] = (
+            _time(case.baseline, baseline_setup, n, repeat) if case.baseline else None)
+        if memory:
+            point["peak"] = _peak(case.pylinq, case.setup, n)
+            point["baseline_peak"] = (
+                _peak(case.baseline, baseline_setup, n) if case.baseline else None)
+        points.append(point)
+        if point["time"] > _TIME_BUDGET:
+            break
+    slope = _slope(points, "time")
+    return {
+        "name": case.name,
+        "points": points,
+        "slope": slope,
+        "baseline_slope": _slope(points, "baseline_time"),
+        "superlinear": slope is not None and slope > case.slope,
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Returns the cases that got slower than `threshold` times the previous run."""
+    before = {
+        (result["name"], p["n"]): p["time"]
+        for result in previous["results"] for p in result["points"]}
+    messages = []
+    for result in current["results"]:
+        for p in result["points"]:
+            old = before.get((result["name"], p["n"]))
+            if old and p["time"] > old * threshold:
+                messages.append("%s n=%d: %.3gs -> %.3gs (x%.2f)" % (
+                    result["name"], p["n"], old, p["time"], p["time"] / old))
+    return messages
+
+
+def _report(result: Dict[str, Any]) -> None:
+    for p in result["points"]:
+        ratio = ""
+        if p["baseline_time"]:
+            ratio = " (x%.2f of baseline)" % (p["time"] / p["baseline_time"])
+        peak = " peak=%dKiB" % (p["peak"] // 1024) if "peak" in p else ""
+        print("  n=%-9d %.6fs%s%s" % (p["n"], p["time"], ratio, peak))
+    if result["slope"] is not None:
+        flag = "  <-- superlinear" if result["superlinear"] else ""
+        print("  slope=%.2f%s" % (result["slope"], flag))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="keyword", default="", help="only run cases containing this text")
+    parser.add_argument("--max-size", type=float, default=1e6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc runs")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="previous JSON result to diff against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [n for n in _SIZES if n <= args.max_size]
+    results = []
+    for case in CASES:
+        if args.keyword not in case.name:
+            continue
+        print(case.name)
+        result = run_case(case, sizes, args.repeat, not args.no_memory)
+        _report(result)
+        results.append(result)
+
+    current = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print("saved", args.output)
+
+    failed = False
+    superlinear = [r["name"] for r in results if r["superlinear"]]
+    if superlinear:
+        print("superlinear:", ", ".join(superlinear))
+        failed = True
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        for message in regressions:
+            print("regression:", message)
+        failed = failed or len(regressions) > 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -122,6 +122,14 @@ class DBBase(metaclass=ABCMeta):
                 break
         return pl.col(tname)
 
+    def query(self):
+        """Returns a LINQ query over df that is compiled to polars expressions.
+        Scheme members can be used as `r[Scheme.member]` (resolved with plptr).
+        """
+        from PyLINQ.polarsquery import PolarsQuery
+
+        return PolarsQuery(self.df, self)
+
     def gets(self, col: List[Scheme]):
         expr: List[str] = []
         for _c in col.values():
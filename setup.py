@@ -3,5 +3,8 @@ from setuptools import find_packages, setup
 setup(
     name="PyLINQ",
     version='0.1',
-    packages=find_packages()
+    packages=find_packages(),
+    extras_require={
+        "parallel": ["cloudpickle"],
+    },
 )
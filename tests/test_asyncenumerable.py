@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from PyLINQ.asyncenumerable import AsyncEnumerable
+
+
+class _Tracker:
+    def __init__(self, delays):
+        self.delays = delays
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self.cancelled = []
+
+    async def fetch(self, value):
+        self.started.append(value)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delays[value])
+        except asyncio.CancelledError:
+            self.cancelled.append(value)
+            raise
+        finally:
+            self.running -= 1
+        if value < 0:
+            raise ValueError(value)
+        return value * 10
+
+
+def test_selectawait_ordered_keeps_source_order():
+    tracker = _Tracker({0: 0.03, 1: 0.01, 2: 0.02})
+    query = AsyncEnumerable(range(3)).SelectAwait(tracker.fetch, max_concurrency=3)
+    assert asyncio.run(query.ToListAsync()).Values == [0, 10, 20]
+
+
+def test_selectawait_unordered_yields_in_completion_order():
+    tracker = _Tracker({0: 0.03, 1: 0.01, 2: 0.02})
+    query = AsyncEnumerable(range(3)).SelectAwait(tracker.fetch, max_concurrency=3, ordered=False)
+    assert asyncio.run(query.ToListAsync()).Values == [10, 20, 0]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_selectawait_respects_max_concurrency(ordered):
+    tracker = _Tracker({i: 0.001 * (i % 3) for i in range(10)})
+    query = AsyncEnumerable(range(10)).SelectAwait(tracker.fetch, max_concurrency=2, ordered=ordered)
+    assert sorted(asyncio.run(query.ToListAsync()).Values) == [i * 10 for i in range(10)]
+    assert tracker.peak == 2
+
+
+def test_selectawait_take_stops_and_cancels_pending_calls():
+    tracker = _Tracker({i: 0.01 if i < 2 else 1.0 for i in range(100)})
+
+    async def run():
+        query = AsyncEnumerable(range(100)).SelectAwait(tracker.fetch, max_concurrency=4)
+        result = await query.Take(2).ToListAsync()
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()).Values == [0, 10]
+    assert len(tracker.started) <= 6
+    assert tracker.running == 0
+    assert sorted(tracker.cancelled) == [i for i in tracker.started if i >= 2]
+
+
+def test_selectawait_propagates_errors_and_cancels_pending_calls():
+    tracker = _Tracker({0: 0.5, -1: 0.01, 2: 0.5})
+    query = AsyncEnumerable([0, -1, 2]).SelectAwait(tracker.fetch, max_concurrency=3, ordered=False)
+
+    async def run():
+        try:
+            await query.ToListAsync()
+        finally:
+            await asyncio.sleep(0)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    assert sorted(tracker.cancelled) == [0, 2]
+    assert tracker.running == 0
+
+
+def test_selectawait_rejects_zero_concurrency():
+    with pytest.raises(ValueError):
+        AsyncEnumerable([1]).SelectAwait(asyncio.sleep, max_concurrency=0)
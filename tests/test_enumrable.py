@@ -0,0 +1,311 @@
+import pytest
+
+from PyLINQ.enumrable import (Enumerable, Enumrable, EqualityComparer, SortStatistics,
+                              _Fuse)
+from PyLINQ.generics import TypedList
+
+
+def _pair(a, b):
+    return (a, b)
+
+
+def test_join_sorted_keys_of_different_types():
+    joined = TypedList([1, 2]).Join(["a", "b"], lambda x: x, lambda y: y, _pair)
+    assert joined.Values == []
+
+
+def test_join_mixed_key_types_matches_hash_join():
+    outer = [1, 2, "a", "b"]
+    inner = ["a", 2, "b"]
+    joined = list(Enumrable.Join(outer, inner, lambda x: x, lambda y: y, _pair))
+    assert joined == [(2, 2), ("a", "a"), ("b", "b")]
+
+
+def test_join_sorted_keys_uses_merge_order():
+    joined = TypedList([1, 2, 2, 3]).Join([2, 2, 3, 4], lambda x: x, lambda y: y, _pair)
+    assert joined.Values == [(2, 2), (2, 2), (2, 2), (2, 2), (3, 3)]
+
+
+def test_skip_take_window():
+    query = Enumerable(range(100)).Where(lambda x: x % 2 == 0).Skip(5).Take(3)
+    assert query.ToList().Values == [10, 12, 14]
+
+
+def test_orderby_is_stable():
+    rows = [("b", 1), ("a", 2), ("b", 0), ("a", 1)]
+    assert Enumrable.OrderBy(rows, lambda r: r[0]) == [("a", 2), ("a", 1), ("b", 1), ("b", 0)]
+
+
+def test_orderby_statistics_count_key_selector_calls():
+    statistics = SortStatistics()
+    Enumrable.OrderBy(list(range(50, 0, -1)), lambda x: x, statistics)
+    assert statistics.Elements == 50
+    assert statistics.KeySelectorCalls == 50
+
+
+def test_orderbykeys_statistics_count_each_key():
+    statistics = SortStatistics()
+    ordered = Enumrable.OrderByKeys(
+        [(1, "a"), (0, "b"), (1, "c")],
+        ((lambda r: r[0], False), (lambda r: r[1], True)),
+        statistics)
+    assert ordered == [(0, "b"), (1, "c"), (1, "a")]
+    assert statistics.KeySelectorCalls == 6
+
+
+def _unfused(source, plan):
+    out = []
+    for value in source:
+        for op, fn in plan:
+            if op == "where" and not fn(value):
+                break
+            if op == "notnone" and value is None:
+                break
+            if op == "select":
+                value = fn(value)
+        else:
+            out.append(value)
+    return out
+
+
+@pytest.mark.parametrize("plan", [
+    (("where", lambda x: x % 2 == 0), ("select", lambda x: x * 3)),
+    (("select", lambda x: x - 5), ("where", lambda x: x > 0), ("select", str)),
+    (("select", lambda x: None if x % 3 == 0 else x), ("notnone", None), ("select", lambda x: -x)),
+    (("select", lambda x: x + 1), ("select", lambda x: x * 2), ("where", lambda x: x % 4 == 0),
+     ("notnone", None)),
+])
+def test_fused_pipeline_matches_unfused(plan):
+    query = Enumerable(range(20))
+    for op, fn in plan:
+        query = {"where": query.Where, "select": query.Select}[op](fn) if fn else query.NotNone()
+    assert query.ToList().Values == _unfused(range(20), plan)
+
+
+def test_fused_shape_is_shared_by_different_selectors():
+    first = Enumerable(range(10)).Where(lambda x: x > 5).Select(lambda x: x * 10)
+    second = Enumerable(range(10)).Where(lambda x: x < 2).Select(lambda x: -x)
+    assert first.ToList().Values == [60, 70, 80, 90]
+    assert second.ToList().Values == [0, -1]
+    assert _Fuse(("where", "select")) is _Fuse(("where", "select"))
+
+
+def test_fused_closures_keep_their_own_values():
+    queries = [Enumerable(range(5)).Where(lambda x, k=k: x >= k).Select(lambda x, k=k: x * k)
+               for k in range(3)]
+
+    def below(n):
+        return Enumerable(range(5)).Where(lambda x: x < n).Select(lambda x: x + n)
+
+    limits = [below(1), below(2)]
+    assert [q.ToList().Values for q in queries] == [[0, 0, 0, 0, 0], [1, 2, 3, 4], [4, 6, 8]]
+    assert [q.ToList().Values for q in limits] == [[1], [2, 3]]
+
+
+def test_set_operators_keep_first_appearance_order():
+    query = Enumerable([3, 1, 3, 2, 1])
+    assert query.Distinct().ToList().Values == [3, 1, 2]
+    assert query.Union([4, 2, 5]).ToList().Values == [3, 1, 2, 4, 5]
+    assert query.Intersect([2, 3, 9]).ToList().Values == [3, 2]
+    assert query.Except([1]).ToList().Values == [3, 2]
+
+
+def test_set_operators_by_key_and_comparer():
+    rows = [{"id": 1, "v": "a"}, {"id": 2, "v": "b"}, {"id": 1, "v": "c"}]
+    by_id = EqualityComparer(lambda a, b: a["id"] == b["id"], lambda a: hash(a["id"]))
+    assert [r["v"] for r in Enumerable(rows).Distinct(by_id)] == ["a", "b"]
+    assert [r["v"] for r in Enumerable(rows).DistinctBy(lambda r: r["id"])] == ["a", "b"]
+    assert [r["v"] for r in Enumerable(rows).ExceptBy([2], lambda r: r["id"])] == ["a"]
+    assert [r["v"] for r in Enumerable(rows).Intersect([{"id": 2}], by_id)] == ["b"]
+
+
+def test_fromjsonlines_streams_and_skips_blank_lines(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"id": 1}\n\n{"id": 2}\n{"id": 3}\n', encoding="utf-8")
+    query = Enumerable.FromJsonLines(str(path))
+    assert query.Select(lambda r: r["id"]).ToList().Values == [1, 2, 3]
+    assert query.Where(lambda r: r["id"] > 1).First() == {"id": 2}
+
+
+def test_fromcsv_rows_as_dicts_or_lists(tmp_path):
+    path = tmp_path / "rows.tsv"
+    path.write_text("id\tname\n1\ta\n2\tb\n", encoding="utf-8")
+    assert [r["name"] for r in Enumerable.FromCsv(str(path), delimiter="\t")] == ["a", "b"]
+    assert Enumerable.FromCsv(str(path), header=False, delimiter="\t").ToList().Values == [
+        ["id", "name"], ["1", "a"], ["2", "b"]]
+
+
+def test_fromparquetbatches_reads_columns_across_batches(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "rows.parquet")
+    pq.write_table(pa.table({"id": list(range(5)), "name": list("abcde")}), path)
+    query = Enumerable.FromParquetBatches(path, batch_size=2, columns=["id"])
+    assert query.ToList().Values == [{"id": i} for i in range(5)]
+    assert query.Skip(3).Select(lambda r: r["id"]).ToList().Values == [3, 4]
+
+
+def test_chunk_splits_lists_and_iterators():
+    assert list(Enumrable.Chunk([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+    assert Enumerable(iter(range(5))).Chunk(3).ToList().Values == [[0, 1, 2], [3, 4]]
+    assert TypedList([1, 2, 3]).Chunk(3).Values == [[1, 2, 3]]
+    with pytest.raises(ValueError):
+        Enumerable([1]).Chunk(0)
+
+
+def test_selectbatch_calls_once_per_batch():
+    sizes = []
+
+    def double(batch):
+        sizes.append(len(batch))
+        return [x * 2 for x in batch]
+
+    assert Enumerable(range(7)).SelectBatch(double, size=3).ToList().Values == [0, 2, 4, 6, 8, 10, 12]
+    assert sizes == [3, 3, 1]
+
+
+def test_selectbatch_as_array_returns_python_scalars():
+    pytest.importorskip("numpy")
+    values = TypedList([1, 2, 3]).SelectBatch(lambda xs: xs * 10, size=2, as_array=True).Values
+    assert values == [10, 20, 30]
+    assert all(type(value) is int for value in values)
+
+
+def test_foreachbatch_and_tojsonlines(tmp_path):
+    batches = []
+    Enumerable(range(5)).ForEachBatch(batches.append, size=2)
+    assert batches == [[0, 1], [2, 3], [4]]
+    path = str(tmp_path / "out.jsonl")
+    Enumerable(range(3)).ToJsonLines(path, lambda x: {"v": x}, size=2)
+    assert Enumerable.FromJsonLines(path).ToList().Values == [{"v": 0}, {"v": 1}, {"v": 2}]
+
+
+_ROWS = [(3, "a"), (1, "b"), (3, "c"), (2, "d"), (1, "e"), (3, "f")]
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 4, 6, 10])
+def test_topby_matches_stable_sort_then_take(count):
+    by_key = lambda r: r[0]  # noqa: E731
+    assert Enumrable.TopBy(_ROWS, count, by_key) == sorted(_ROWS, key=by_key, reverse=True)[:count]
+    assert Enumrable.TopBy(_ROWS, count, by_key, False) == sorted(_ROWS, key=by_key)[:count]
+    assert Enumerable(_ROWS).TopBy(count, by_key).ToList().Values == \
+        Enumerable(_ROWS).OrderByDescending(by_key).ToList().Values[:count]
+    assert Enumerable(_ROWS).BottomBy(count, by_key).ToList().Values == \
+        sorted(_ROWS, key=by_key)[:count]
+
+
+def test_orderby_take_uses_the_same_order_as_topby():
+    query = Enumerable(iter(_ROWS)).OrderBy(lambda r: r[0]).ThenByDescending(lambda r: r[1]).Take(3)
+    assert query.ToList().Values == [(1, "e"), (1, "b"), (2, "d")]
+    assert Enumerable(_ROWS).OrderByDescending(lambda r: r[0]).Take(2).ToList().Values == [
+        (3, "a"), (3, "c")]
+
+
+def test_typedlist_topby_bottomby_maxby_minby():
+    assert TypedList(_ROWS).TopBy(2, lambda r: r[0]).Values == [(3, "a"), (3, "c")]
+    assert TypedList(_ROWS).BottomBy(3, lambda r: r[0]).Values == [(1, "b"), (1, "e"), (2, "d")]
+    assert TypedList(_ROWS).MaxBy(lambda r: r[0]) == (3, "a")
+    assert TypedList(_ROWS).MinBy(lambda r: r[0]) == (1, "b")
+    assert Enumerable(_ROWS).MaxBy(lambda r: r[0]) == (3, "a")
+    with pytest.raises(ValueError):
+        Enumerable([]).MinBy(lambda r: r)
+
+
+@pytest.fixture
+def spilled(monkeypatch):
+    import tempfile
+
+    from PyLINQ import enumrable
+    files = []
+    create = tempfile.TemporaryFile
+
+    def record(*args, **kwargs):
+        f = create(*args, **kwargs)
+        files.append(f)
+        return f
+
+    monkeypatch.setattr(enumrable.tempfile, "TemporaryFile", record)
+    return files
+
+
+_UNSORTED = [((i * 37) % 11, i) for i in range(60)]
+
+
+@pytest.mark.parametrize("run_size", [1, 3, 7, 60, 1000])
+@pytest.mark.parametrize("descending", [False, True])
+def test_orderbyexternal_is_stable_across_runs(run_size, descending, spilled):
+    ordered = list(Enumrable.OrderByExternal(
+        _UNSORTED, lambda r: r[0], run_size=run_size, descending=descending))
+    assert ordered == sorted(_UNSORTED, key=lambda r: r[0], reverse=descending)
+    assert (len(spilled) > 0) == (run_size <= len(_UNSORTED))
+    assert all(f.closed for f in spilled)
+
+
+def test_orderbyexternal_multi_pass_merge(monkeypatch, spilled):
+    from PyLINQ import enumrable
+    monkeypatch.setattr(enumrable, "_MERGE_FANIN", 2)
+    ordered = Enumerable(_UNSORTED).OrderByExternal(lambda r: r[0], run_size=4).ToList().Values
+    assert ordered == sorted(_UNSORTED, key=lambda r: r[0])
+    assert len(spilled) > len(_UNSORTED) // 4
+    assert all(f.closed for f in spilled)
+
+
+def test_orderbyexternal_closes_files_after_partial_enumeration(tmp_path, spilled):
+    it = Enumrable.OrderByExternal(_UNSORTED, lambda r: r[0], run_size=5, temp_dir=str(tmp_path))
+    assert next(it) == (0, 0)
+    assert len(spilled) == 12
+    assert not any(f.closed for f in spilled)
+    it.close()
+    assert all(f.closed for f in spilled)
+    assert list(tmp_path.iterdir()) == []
+    first = Enumerable(_UNSORTED).OrderByExternal(lambda r: r[0], run_size=5).First()
+    assert first == (0, 0)
+    assert all(f.closed for f in spilled)
+
+
+def test_orderbyexternal_rejects_empty_runs():
+    with pytest.raises(ValueError):
+        Enumrable.OrderByExternal([1], lambda x: x, run_size=0)
+
+
+_PEOPLE = [("b", 2, "x"), ("a", 1, "y"), ("b", 1, "z"), ("a", 2, "w"), ("b", 2, "v"), ("a", 1, "u")]
+
+
+def _reference(rows, keys):
+    # 後ろのキーから安定ソートを重ねたものが複合キーの並び
+    ordered = list(rows)
+    for selector, descending in reversed(keys):
+        ordered.sort(key=selector, reverse=descending)
+    return ordered
+
+
+@pytest.mark.parametrize("first_desc", [False, True])
+@pytest.mark.parametrize("second_desc", [False, True])
+def test_thenby_mixed_directions_are_stable(first_desc, second_desc):
+    first, second = (lambda r: r[0]), (lambda r: r[1])
+    expected = _reference(_PEOPLE, [(first, first_desc), (second, second_desc)])
+    query = Enumerable(_PEOPLE)
+    query = query.OrderByDescending(first) if first_desc else query.OrderBy(first)
+    query = query.ThenByDescending(second) if second_desc else query.ThenBy(second)
+    assert query.ToList().Values == expected
+    li = TypedList(_PEOPLE)
+    li = li.OrderByDescending(first) if first_desc else li.OrderBy(first)
+    li = li.ThenByDescending(second) if second_desc else li.ThenBy(second)
+    assert li.Values == expected
+
+
+def test_thenby_three_keys_with_strings_descending():
+    keys = [(lambda r: r[1], True), (lambda r: r[0], False), (lambda r: r[2], True)]
+    query = Enumerable(_PEOPLE).OrderByDescending(keys[0][0]).ThenBy(keys[1][0]).ThenByDescending(
+        keys[2][0])
+    assert query.ToList().Values == _reference(_PEOPLE, keys)
+    assert query.ToList().Values[:2] == [("a", 2, "w"), ("b", 2, "x")]
+
+
+def test_thenby_requires_orderby():
+    with pytest.raises(TypeError):
+        Enumerable(_PEOPLE).ThenBy(lambda r: r[0])
+    li = TypedList(_PEOPLE).OrderBy(lambda r: r[0])
+    li.Add(("c", 0, "t"))
+    with pytest.raises(TypeError):
+        li.ThenBy(lambda r: r[1])
@@ -0,0 +1,321 @@
+import pytest
+
+from PyLINQ.enumrable import Enumerable
+from PyLINQ.generics import DictionaryC, TypedList
+
+
+def _dictionary():
+    dic = DictionaryC[str, int]()
+    for i, key in enumerate("abcd"):
+        dic.Add(key, i)
+    return dic
+
+
+def test_pairlist_is_rebuilt_after_in_place_filter():
+    dic = _dictionary()
+    dic.PairList.Where(lambda kp: kp.Key == "a")
+    assert dic.PairList.Length == 4
+    dic.KeyValuePairs.OrderByDescending(lambda kp: kp.Value)
+    assert [kp.Key for kp in dic.PairList] == ["a", "b", "c", "d"]
+
+
+def test_pairlist_is_reused_until_modified():
+    dic = _dictionary()
+    pairs = dic.PairList
+    assert dic.PairList is pairs
+    assert dic.KeyValuePairs is pairs
+    dic.Add("e", 4)
+    assert dic.PairList is not pairs
+
+
+def test_copy_does_not_share_pairs():
+    dic = _dictionary()
+    other = dic.Copy()
+    other.FirstOn(lambda kp: kp.Key == "a").Value = 100
+    assert dic["a"] == 0
+    assert other["a"] == 100
+    assert [kp.Key for kp in other.PairList] == ["a", "b", "c", "d"]
+
+
+def test_pairlist_follows_modifications():
+    dic = _dictionary()
+    assert dic.PairList.Length == 4
+    dic.Remove("a")
+    dic.Add("e", 4)
+    assert [kp.Key for kp in dic.PairList] == ["b", "c", "d", "e"]
+
+
+def test_asparallel_reads_all_pairs():
+    dic = _dictionary()
+    dic.PairList.Where(lambda kp: kp.Key == "a")
+    assert dic.AsParallel("thread").Count() == 4
+
+
+def test_groupby_keeps_none_key():
+    li = TypedList([{"s": "h"}, {"s": None}, {"s": "h"}])
+    grouped = li.GroupBy(lambda r: r["s"])
+    counts = grouped.Count()
+    assert counts.Length == 2
+    assert counts["h"] == 2
+    assert counts[None] == 1
+    assert counts.ContainsKey(None)
+    assert grouped.Sum(lambda r: 1)[None] == 1
+    assert grouped.Max(lambda r: 1)[None] == 1
+    assert grouped[None].Length == 1
+
+
+
+def test_grouping_follows_source_mutation():
+    li = TypedList([1, 2, 3])
+    grouped = li.GroupBy(lambda x: x % 2)
+    assert grouped[1].Values == [1, 3]
+    li.Add(5)
+    li.Remove(2)
+    assert grouped[1].Values == [1, 3, 5]
+    assert grouped[0].Length == 0
+    assert [g.Key for g in grouped] == [1]
+    assert grouped.Count()[1] == 3
+
+
+def test_enumerable_grouping_is_built_per_execution():
+    source = [1, 2, 3]
+    query = Enumerable(source).GroupBy(lambda x: x % 2, result=lambda k, g: (k, g.Length))
+    assert query.ToList().Values == [(1, 2), (0, 1)]
+    source.append(4)
+    assert query.ToList().Values == [(1, 2), (0, 2)]
+    grouped = Enumerable(source).GroupBy(lambda x: x % 2)
+    source.append(6)
+    assert grouped[0].Values == [2, 4, 6]
+
+
+def test_todictionary_keeps_none_key():
+    dic = TypedList([1, 2, None]).ToDictionary(lambda x: x)
+    assert dic.Length == 3
+    assert dic.ContainsKey(None)
+    assert [kp.Key for kp in dic.PairList] == [1, 2, None]
+
+
+def test_todictionary_duplicate_key_raises():
+    with pytest.raises(KeyError):
+        TypedList([None, None]).ToDictionary(lambda x: x)
+
+
+class _CountingKey:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        return value % 5
+
+
+INDEX_MUTATIONS = {
+    "Add": lambda li: li.Add(12),
+    "AddRange": lambda li: li.AddRange(3, 8),
+    "Insert": lambda li: li.Insert(2, 40, 41),
+    "Insert(head)": lambda li: li.Insert(0, 7),
+    "Insert(tail)": lambda li: li.Insert(li.Length, 7),
+    "Insert(negative)": lambda li: li.Insert(-2, 7, 9),
+    "Remove": lambda li: li.Remove(3),
+    "RemoveAt": lambda li: li.RemoveAt(1),
+    "RemoveAt(last)": lambda li: li.RemoveAt(li.Length - 1),
+    "RemoveAt(negative)": lambda li: li.RemoveAt(-3),
+    "RemoveOn": lambda li: li.RemoveOn(lambda x: x % 3 == 0),
+    "RemoveRange": lambda li: li.RemoveRange(2, 4),
+    "Set": lambda li: li.Set(lambda x, i: x + i % 2),
+}
+
+
+def _index_list():
+    return TypedList([3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8])
+
+
+@pytest.mark.parametrize("mutation", INDEX_MUTATIONS.values(), ids=INDEX_MUTATIONS.keys())
+def test_index_consistent_after_mutation(mutation):
+    li = _index_list()
+    key = _CountingKey()
+    index = li.CreateIndex(key)
+    identity = li.CreateIndex()
+    index.Keys
+    identity.Keys
+    mutation(li)
+    calls = key.calls
+    values = li.Values
+    for k in range(5):
+        assert index.Positions(k) == [i for i, v in enumerate(values) if v % 5 == k]
+    for v in set(values) | {0, 100}:
+        assert identity.Positions(v) == [i for i, x in enumerate(values) if x == v]
+        assert li.Contains(v) == (v in values)
+        assert li.CountOf(v) == values.count(v)
+        assert li.IndexOf(v) == (values.index(v) if v in values else -1)
+    # 索引はその場で更新され、参照で作り直されない
+    assert key.calls == calls
+    assert sorted(index.Keys) == sorted({v % 5 for v in values})
+
+
+def test_stale_index_scans_then_rebuilds():
+    li = _index_list()
+    key = _CountingKey()
+    index = li.CreateIndex(key)
+    assert index.CountOf(0) == 3
+    li.Reverse()
+    values = li.Values
+    calls = key.calls
+    for k in (0, 3, 1):
+        assert index.Positions(k) == [i for i, v in enumerate(values) if v % 5 == k]
+    # 1 回目は走査、2 回目で作り直し、以降は O(1)
+    assert key.calls == calls + 2 * li.Length
+    index.Contains(4)
+    assert key.calls == calls + 2 * li.Length
+
+
+def test_remove_tail_with_index_is_incremental():
+    li = TypedList(list(range(50000)))
+    key = _CountingKey()
+    li.CreateIndex(key).Keys
+    li.CreateIndex()
+    assert li.Contains(5)
+    calls = key.calls
+    for _ in range(200):
+        li.RemoveAt(li.Length - 1)
+        assert li.Contains(5)
+    assert key.calls == calls + 200
+    assert li.Length == 49800
+    assert not li.Contains(49900)
+    assert li.IndexOf(49799) == 49799
+
+
+def test_typedlist_from_iterables():
+    assert TypedList(x * 2 for x in range(3)).Values == [0, 2, 4]
+    assert TypedList({"a": 1, "b": 2}.keys()).Values == ["a", "b"]
+    assert TypedList().Length == 0
+
+
+def test_removerange_default_end():
+    li = TypedList([0, 1, 2, 3, 4])
+    li.RemoveRange(2)
+    assert li.Values == [0, 1]
+    assert li.IndexOf(1) == 1
+    assert li.LastIndexOf(0, 0, 1) == 0
+
+
+def test_typedlist_can_be_iterated_repeatedly_and_nested():
+    li = TypedList([1, 2, 3])
+    assert list(li) == [1, 2, 3]
+    assert list(li) == [1, 2, 3]
+    assert [(a, b) for a in li for b in li][:4] == [(1, 1), (1, 2), (1, 3), (2, 1)]
+
+
+def test_snapshot_is_independent_of_later_changes():
+    li = TypedList([1, 2, 3])
+    seen = []
+    for value in li.Snapshot():
+        seen.append(value)
+        li.Add(value * 10)
+    assert seen == [1, 2, 3]
+    assert li.Values == [1, 2, 3, 10, 20, 30]
+
+
+def test_typedlist_set_operators_modify_in_place():
+    li = TypedList([3, 1, 3, 2, 1])
+    assert li.Distinct() is li
+    assert li.Values == [3, 1, 2]
+    assert li.Union([4, 3]).Values == [3, 1, 2, 4]
+    assert li.Intersect([4, 1, 7]).Values == [1, 4]
+    assert TypedList([1, 2, 2, 3]).Except(2, 9).Values == [1, 3]
+    assert TypedList([5, 4, 5]).Unique == [5, 4]
+
+
+def _value(x):
+    return 0 if x is None else x
+
+
+_MUTATIONS = {
+    "Add": lambda li: li.Add(7),
+    "AddOn": lambda li: li.AddOn(lambda: 7),
+    "AddRange": lambda li: li.AddRange(7, 8),
+    "AddRangeOn": lambda li: li.AddRangeOn(lambda: [7, 8]),
+    "Clear": lambda li: li.Clear(),
+    "CopyTo": lambda li: TypedList([9]).CopyTo(li),
+    "Except": lambda li: li.Except(3),
+    "ExceptBy": lambda li: li.ExceptBy([3], _value),
+    "Distinct": lambda li: li.Distinct(),
+    "DistinctBy": lambda li: li.DistinctBy(lambda x: _value(x) % 2),
+    "Union": lambda li: li.Union([7]),
+    "Intersect": lambda li: li.Intersect([1, 3]),
+    "Insert": lambda li: li.Insert(1, 7),
+    "OrderBy": lambda li: li.OrderBy(_value).Take(2),
+    "ThenBy": lambda li: li.OrderBy(lambda x: 0).ThenBy(_value).Take(2),
+    "Remove": lambda li: li.Remove(3),
+    "RemoveOn": lambda li: li.RemoveOn(lambda x: _value(x) > 2),
+    "RemoveAt": lambda li: li.RemoveAt(0),
+    "RemoveRange": lambda li: li.RemoveRange(0, 1),
+    "Reverse": lambda li: li.Reverse(),
+    "NotNone": lambda li: li.NotNone(),
+    "Take": lambda li: li.Take(2),
+    "Skip": lambda li: li.Skip(2),
+    "TakeWhile": lambda li: li.TakeWhile(lambda x: _value(x) > 1),
+    "SkipWhile": lambda li: li.SkipWhile(lambda x: _value(x) > 1),
+    "Where": lambda li: li.Where(lambda x: _value(x) > 2),
+    "Set": lambda li: li.Set(lambda x, i: i * 10),
+}
+
+
+@pytest.mark.parametrize("name", sorted(_MUTATIONS))
+def test_memoized_aggregates_follow_every_mutation(name):
+    li = TypedList([3, 1, None, 3, 2])
+    assert li.Sum(_value) == 9
+    assert li.Max(_value) == 3
+    _MUTATIONS[name](li)
+    values = [_value(x) for x in li]
+    assert li.Sum(_value) == sum(values)
+    if values:
+        assert li.Max(_value) == max(values)
+        assert li.Min(_value) == min(values)
+    assert li.Unique == list(dict.fromkeys(li))
+
+
+def test_memoized_aggregate_is_reused_until_modified():
+    calls = []
+
+    def key(x):
+        calls.append(x)
+        return x
+
+    li = TypedList([1, 2, 3])
+    assert li.Sum(key) == li.Sum(key) == 6
+    assert len(calls) == 3
+    assert li.Cached("big", lambda l: l.CountOfOn(lambda x: x > 1)) == 2
+    assert li.Cached("big", lambda l: -1) == 2
+    li.ClearCache()
+    assert li.Sum(key) == 6
+    assert len(calls) == 6
+
+
+def test_memo_respects_cache_capacity():
+    calls = []
+
+    def key(x):
+        calls.append(x)
+        return x
+
+    li = TypedList([1, 2, 3])
+    li.CacheCapacity = 0
+    li.Sum(key)
+    li.Sum(key)
+    assert len(calls) == 6
+
+
+@pytest.mark.parametrize("start, end", [
+    (0, None), (-3, None), (-100, None), (2, -1), (-4, -2), (5, 2), (0, 100), (-1, None),
+])
+def test_indexof_with_identity_index_normalises_bounds(start, end):
+    values = [1, 2, 1, 3, 1, 2]
+    plain = TypedList(values)
+    indexed = TypedList(values)
+    indexed.CreateIndex()
+    for value in (1, 2, 3):
+        assert indexed.IndexOf(value, start, end) == plain.IndexOf(value, start, end)
+        assert indexed.LastIndexOf(value, start, end) == plain.LastIndexOf(value, start, end)
+    assert indexed.IndexOf(1, -3) == 4
+    assert indexed.CreateIndex().LastIndexOf(2, -5, -1) == 1
@@ -0,0 +1,74 @@
+import pytest
+
+from PyLINQ.generics import TypedList
+from PyLINQ.materialized import MaterializedView
+
+QUERIES = {
+    "count": lambda q: q.GroupBy(lambda r: r[0]).Count(),
+    "sum": lambda q: q.GroupBy(lambda r: r[0]).Sum(lambda r: r[1]),
+    "average": lambda q: q.GroupBy(lambda r: r[0]).Average(lambda r: r[1]),
+    "max": lambda q: q.GroupBy(lambda r: r[0]).Max(lambda r: r[1]),
+    "min": lambda q: q.GroupBy(lambda r: r[0]).Min(lambda r: r[1]),
+    "where": lambda q: q.Where(lambda r: r[1] > 1).Select(lambda r: r[1]).Sum(),
+}
+
+MUTATIONS = {
+    "Add": lambda li: li.Add(("h", 7)),
+    "AddRange": lambda li: li.AddRange(("m", 5), (None, 2)),
+    "Insert": lambda li: li.Insert(1, ("h", 0), ("x", 9)),
+    "Remove": lambda li: li.Remove(("h", 3)),
+    "RemoveAt": lambda li: li.RemoveAt(0),
+    "RemoveAt(last)": lambda li: li.RemoveAt(li.Length - 1),
+}
+
+
+def _rows():
+    return TypedList([("h", 1), ("m", 2), ("h", 3), (None, 4), ("m", 6)])
+
+
+def _items(value):
+    # グループの順序は更新の経路によって変わるので辞書で比べる
+    if hasattr(value, "PairList"):
+        return {kp.Key: kp.Value for kp in value.PairList}
+    return value
+
+
+class _Counting:
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        return self.fn(value)
+
+
+@pytest.mark.parametrize("query", QUERIES.values(), ids=QUERIES.keys())
+@pytest.mark.parametrize("mutation", MUTATIONS.values(), ids=MUTATIONS.keys())
+def test_incremental_matches_refresh(query, mutation):
+    li = _rows()
+    view = li.Materialize(query)
+    view.Value
+    mutation(li)
+    expected = MaterializedView(li, query).Refresh().Value
+    assert _items(view.Value) == _items(expected)
+
+
+@pytest.mark.parametrize("mutation", MUTATIONS.values(), ids=MUTATIONS.keys())
+def test_incremental_reads_only_changed_elements(mutation):
+    li = _rows()
+    key = _Counting(lambda r: r[0])
+    view = li.Materialize(lambda q: q.GroupBy(key).Count())
+    view.Value
+    before = key.calls
+    mutation(li)
+    view.Value
+    assert key.calls - before <= 2
+
+
+def test_none_group_is_kept():
+    li = _rows()
+    view = li.Materialize(lambda q: q.GroupBy(lambda r: r[0]).Count())
+    assert view[None] == 1
+    assert view.Value.Length == 3
+    assert view.Value[None] == 1
@@ -0,0 +1,25 @@
+import pickle
+
+import pytest
+
+import PyLINQ.parallel as parallel
+from PyLINQ.generics import TypedList
+
+
+def test_process_pool_with_lambda():
+    pytest.importorskip("cloudpickle")
+    li = TypedList(list(range(100)))
+    assert li.AsParallel(degree=2).Where(lambda x: x % 2 == 0).Sum(lambda x: x) == 2450
+
+
+def test_lambda_without_cloudpickle_raises_clear_error(monkeypatch):
+    monkeypatch.setattr(parallel, "_serializer", pickle)
+    li = TypedList(list(range(10)))
+    with pytest.raises(TypeError, match="cloudpickle"):
+        li.AsParallel(degree=2).Where(lambda x: x > 0).Count()
+
+
+def test_thread_pool_without_cloudpickle(monkeypatch):
+    monkeypatch.setattr(parallel, "_serializer", pickle)
+    li = TypedList(list(range(10)))
+    assert li.AsParallel("thread", degree=2).Where(lambda x: x > 4).Count() == 5
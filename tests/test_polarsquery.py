@@ -0,0 +1,48 @@
+import warnings
+
+import pytest
+
+pl = pytest.importorskip("polars")
+
+from PyLINQ.polarsquery import PolarsQuery  # noqa: E402
+
+
+def _frame():
+    return pl.DataFrame({"id": ["a", "b", None], "size": [1, 2, 3]})
+
+
+def _python(query, fn):
+    # lambda の中で関数を呼ぶと翻訳されず Python で評価される
+    return query.Where(lambda r: bool(fn(r)))
+
+
+@pytest.mark.parametrize("fn", [
+    lambda r: r.id != "a",
+    lambda r: r.id == "a",
+    lambda r: r.id == None,  # noqa: E711
+    lambda r: r.id != None,  # noqa: E711
+    lambda r: None == r.id,  # noqa: E711
+    lambda r: "b" != r.id,
+])
+def test_where_null_matches_python(fn):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        compiled = PolarsQuery(_frame()).Where(fn).Select(lambda r: r.size).ToList().Values
+    fallback = _python(PolarsQuery(_frame()), fn).Select(lambda r: r.size).ToList().Values
+    assert compiled == fallback
+
+
+def test_where_ne_keeps_null_rows():
+    query = PolarsQuery(_frame()).Where(lambda r: r.id != "a")
+    assert query.Count() == 2
+    assert query.Select(lambda r: r.size).ToList().Values == [2, 3]
+
+
+def test_where_eq_none():
+    query = PolarsQuery(_frame()).Where(lambda r: r.id == None)  # noqa: E711
+    assert query.Select(lambda r: r.size).ToList().Values == [3]
+
+
+def test_select_eq_with_null_column():
+    query = PolarsQuery(_frame()).Select(lambda r: r.id == "b")
+    assert query.ToList().Values == [False, True, False]
@@ -0,0 +1,58 @@
+from PyLINQ.generics import TypedList
+from PyLINQ.profiling import Profiler
+
+
+def _report(profiler):
+    return {row["name"]: row for row in profiler.Report()}
+
+
+def test_lazy_operators_count_elements_when_executed():
+    li = TypedList(list(range(10)))
+    with Profiler(trace=False) as profiler:
+        query = li.AsEnumerable().Where(lambda x: x % 2 == 0).Select(lambda x: x * 10)
+        assert query.ToList().Values == [0, 20, 40, 60, 80]
+    report = _report(profiler)
+    assert report["Enumerable.Where"]["elements_in"] == 10
+    assert report["Enumerable.Where"]["elements_out"] == 5
+    assert report["Enumerable.Where"]["selector_calls"] == 10
+    assert report["Enumerable.Select"]["elements_in"] == 5
+    assert report["Enumerable.Select"]["elements_out"] == 5
+    assert report["Enumerable.ToList"]["elements_out"] == 5
+
+
+def test_eager_operators_count_elements():
+    with Profiler(trace=False) as profiler:
+        TypedList([1, 2, 3, 4]).Where(lambda x: x > 2)
+    row = _report(profiler)["TypedList.Where"]
+    assert row["calls"] == 1
+    assert row["elements_in"] == 4
+    assert row["elements_out"] == 2
+    assert row["selector_calls"] == 4
+
+
+def test_selectors_used_as_keys_keep_their_identity():
+    calls = []
+
+    def key(x):
+        calls.append(x)
+        return x
+
+    li = TypedList([1, 2, 3])
+    with Profiler(trace=False):
+        assert li.Sum(key) == 6
+        assert li.Sum(key) == 6
+        index = li.CreateIndex(key)
+        assert li.CreateIndex(key) is index
+        assert li.WhereEquals(2, key).Values == [2]
+        li.DropIndex(key)
+        assert li.CreateIndex(key) is not index
+    assert calls[:3] == [1, 2, 3]
+    assert len(calls) == 6
+
+
+def test_disable_restores_the_operators():
+    where = TypedList.Where
+    profiler = Profiler().Enable()
+    assert TypedList.Where is not where
+    profiler.Disable()
+    assert TypedList.Where is where
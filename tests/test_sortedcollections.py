@@ -0,0 +1,90 @@
+import random
+from bisect import bisect_left, insort_right
+
+import pytest
+
+from PyLINQ import sortedcollections
+from PyLINQ.sortedcollections import SortedDictionaryC, SortedTypedList
+
+
+@pytest.fixture(params=[8, 1000], ids=["load8", "load1000"])
+def load(request, monkeypatch):
+    monkeypatch.setattr(sortedcollections, "_LOAD", request.param)
+    return request.param
+
+
+def _check(li, expected):
+    assert li.Length == len(expected)
+    assert li.Values == expected
+    for index in range(0, len(expected), max(len(expected) // 50, 1)):
+        assert li.ElementAt(index) == expected[index]
+        assert li.Rank(expected[index]) == bisect_left(expected, expected[index])
+    if expected:
+        assert li.ElementAt(-1) == expected[-1]
+
+
+def test_sorted_list_matches_reference_through_adds_and_removes(load):
+    rng = random.Random(load)
+    li = SortedTypedList()
+    expected = []
+    for step in range(load * 12):
+        if expected and rng.random() < 0.4:
+            if rng.random() < 0.5:
+                value = rng.choice(expected)
+                li.Remove(value)
+                expected.remove(value)
+            else:
+                index = rng.randrange(len(expected))
+                li.RemoveAt(index)
+                del expected[index]
+        else:
+            value = rng.randrange(load * 5)
+            li.Add(value)
+            insort_right(expected, value)
+        # 位置の問い合わせを挟み、ずらした先頭位置が使われるようにする
+        if step % 7 == 0:
+            _check(li, expected)
+    _check(li, expected)
+    while expected:
+        li.RemoveAt(0)
+        del expected[0]
+        if len(expected) % 5 == 0:
+            _check(li, expected)
+
+
+def test_sorted_list_queries(load):
+    li = SortedTypedList([5, 1, 4, 1, 3], key=lambda x: -x)
+    assert li.Values == [5, 4, 3, 1, 1]
+    assert li.Between(-4, -1).Values == [4, 3, 1, 1]
+    assert li.CountKeyOf(-1) == 2
+    assert li.ContainsKey(-3) and not li.ContainsKey(-2)
+    assert li.IndexOf(3) == 2
+    assert li.First() == 5 and li.Last() == 1
+
+
+def test_sorted_list_equal_keys_keep_insertion_order(load):
+    li = SortedTypedList(key=lambda row: row[0])
+    for i in range(load * 3):
+        li.Add((i % 2, i))
+    assert [row[1] for row in li if row[0] == 0] == list(range(0, load * 3, 2))
+
+
+def test_sorted_dictionary(load):
+    dic = SortedDictionaryC()
+    keys = list(range(load * 3))
+    random.Random(1).shuffle(keys)
+    for key in keys:
+        dic.Add(key, str(key))
+    dic.Add(None, "none")
+    dic.Add(0, "duplicate")
+    assert dic.Length == len(keys)
+    assert dic[0] == "0"
+    assert dic.Keys.Values == sorted(keys)
+    assert dic.Rank(load) == load
+    assert dic.ElementAt(load).Key == load
+    assert [kp.Key for kp in dic.Between(1, 3)] == [1, 2, 3]
+    dic.Remove(1)
+    dic.RemoveAt(0)
+    assert dic.First().Key == 2
+    assert dic.KeyIndexOf(2) == 0 and dic.KeyIndexOf(1) == -1
+    assert dic.Last().Key == load * 3 - 1
@@ -0,0 +1,64 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+
+from PyLINQ.typedarray import TypedArray  # noqa: E402
+
+
+def test_fromarrow_bool():
+    array = TypedArray.FromArrow(pa.array([True, False, True]))
+    assert array.Buffer.tolist() == [True, False, True]
+
+
+def test_fromarrow_chunked_bool():
+    array = TypedArray.FromArrow(pa.chunked_array([[True], [False]]))
+    assert array.Buffer.tolist() == [True, False]
+
+
+def test_fromarrow_shares_numeric_buffer():
+    source = pa.array([1, 2, 3], type=pa.int64())
+    array = TypedArray.FromArrow(source)
+    assert array.Buffer.tolist() == [1, 2, 3]
+    assert not array.Buffer.flags.owndata
+
+
+def test_fromarrow_with_nulls_is_copied():
+    array = TypedArray.FromArrow(pa.array([1.0, None, 3.0]))
+    assert array.Length == 3
+    assert np.isnan(array.Buffer[1])
+
+
+def test_vectorized_kernels():
+    array = TypedArray([3, 1, 4, 1, 5])
+    assert array.Copy().Where(lambda x: x > 2).Buffer.tolist() == [3, 4, 5]
+    assert array.Select(lambda x: x * 2).Buffer.tolist() == [6, 2, 8, 2, 10]
+    assert array.Sum(lambda x: x * x) == 52
+    assert array.CountOfOn(lambda x: x == 1) == 2
+    assert array.Copy().OrderBy(lambda x: -x).Buffer.tolist() == [5, 4, 3, 1, 1]
+
+
+def test_scalar_selector_falls_back_per_element():
+    array = TypedArray([1, 2, 3])
+    assert array.Select(lambda x: x.bit_length()).Buffer.tolist() == [1, 2, 2]
+
+
+def test_scalar_selector_is_not_called_on_the_array_again():
+    calls = []
+
+    def selector(x):
+        calls.append(x)
+        return x.bit_length()
+
+    TypedArray([1, 2, 3]).Select(selector)
+    calls.clear()
+    TypedArray([1, 2, 3]).Select(selector)
+    assert calls == [1, 2, 3]
+
+
+def test_int64_overflow_is_not_wrapped():
+    big = TypedArray([2 ** 62, 1])
+    assert big.Max(lambda x: x * 3) == 3 * 2 ** 62
+    assert big.Copy().Where(lambda x: x * 4 > 0).Length == 2
+    with pytest.raises(OverflowError):
+        TypedArray([2 ** 62]).Select(lambda x: x * 4)